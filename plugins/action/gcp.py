@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: Raphaël de Gail
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""Action plugin of the GCP modules.
+
+When the GCP_WORKER environment variable is true, tasks running on the
+controller through the local connection (e.g. delegate_to: localhost) are
+served by the persistent worker of gcp_worker instead of a new interpreter.
+Every other task, and every task the worker cannot serve, runs as usual.
+"""
+
+from __future__ import (absolute_import, division, print_function)
+
+__metaclass__ = type
+
+import os
+
+from ansible.module_utils.parsing.convert_bool import boolean
+from ansible.plugins.action import ActionBase
+from ansible.utils.display import Display
+from ansible.utils.unsafe_proxy import wrap_var
+from ansible.utils.vars import merge_hash
+from ansible.vars.clean import remove_internal_keys
+from ansible_collections.raphaeldegail.googlecloudy.plugins.module_utils import gcp_worker
+
+display = Display()
+
+
+class ActionModule(ActionBase):
+
+    _supports_check_mode = True
+    _supports_async = True
+
+    def run(self, tmp=None, task_vars=None):
+        result = super(ActionModule, self).run(tmp, task_vars)
+        del tmp  # tmp no longer has any effect
+
+        wrap_async = self._task.async_val and not self._connection.has_native_async
+
+        data = None
+        if self._use_worker(wrap_async):
+            data = self._execute_in_worker(task_vars)
+        if data is None:
+            data = self._execute_module(task_vars=task_vars, wrap_async=wrap_async)
+        result = merge_hash(result, data)
+
+        if not wrap_async:
+            # remove a temporary path we created
+            self._remove_tmp_path(self._connection._shell.tmpdir)
+
+        return result
+
+    def _use_worker(self, wrap_async):
+        """Tells whether the task can run in the worker.
+
+        The worker runs on the controller with its own environment, so that
+        asynchronous, privileged or remote tasks, and tasks setting their own
+        environment, are left to the usual execution.
+        """
+        return (
+            boolean(os.environ.get('GCP_WORKER', False), strict=False)
+            and self._connection.transport == 'local'
+            and not wrap_async
+            and not self._play_context.become
+            and not any(self._task.environment or [])
+        )
+
+    def _execute_in_worker(self, task_vars):
+        """Runs the module of the task in the worker.
+
+        Returns:
+            dict, the result of the module, or None if the worker could not be reached.
+        """
+        module_name = self._task.action
+        module_args = self._task.args.copy()
+        self._update_module_args(module_name, module_args, task_vars)
+        try:
+            res = gcp_worker.call(
+                module_name.rpartition('.')[2],
+                module_args,
+                directory=os.environ.get('GCP_WORKER_DIR'),
+                idle_timeout=float(os.environ.get('GCP_WORKER_IDLE_TIMEOUT', gcp_worker.DEFAULT_IDLE_TIMEOUT))
+            )
+        except (OSError, ValueError) as inst:
+            display.vvv('GCP worker unavailable, running %s as usual: %s' % (module_name, inst))
+            return None
+
+        data = self._parse_returned_data(res)
+        remove_internal_keys(data)
+        return wrap_var(data)
@@ -60,6 +60,31 @@ options:
         - This should not be set unless you know what you're doing.
         - This only alters the User Agent string for any API requests.
         type: str
+    transport:
+        description:
+        - The HTTP transport used for the API calls.
+        - C(live) calls the APIs.
+        - C(record) calls the APIs and appends every request and response to the I(cassette).
+          Request headers, and thus credentials, are never recorded.
+        - C(replay) serves the responses recorded in the I(cassette), without any network access or credentials.
+        - This should not be set unless you know what you're doing.
+        type: str
+        choices:
+        - live
+        - record
+        - replay
+        default: live
+    cassette:
+        description:
+        - The path of the cassette file used by the C(record) and C(replay) transports.
+        - Interactions are stored as JSON lines, compressed when the path ends with C(.gz).
+        type: path
+    replay_scale:
+        description:
+        - The factor applied to the recorded response times when the transport is C(replay).
+        - C(0) serves the responses immediately.
+        type: float
+        default: 1.0
 notes:
   - for authentication, you can set service_account_file using the
     c(GCP_SERVICE_ACCOUNT_FILE) env variable.
@@ -70,6 +95,8 @@ notes:
   - For authentication, you can set auth_kind using the C(GCP_AUTH_KIND) env
     variable.
   - For authentication, you can set scopes using the C(GCP_SCOPES) env variable.
+  - You can set transport, cassette and replay_scale using the C(GCP_TRANSPORT),
+    C(GCP_CASSETTE) and C(GCP_REPLAY_SCALE) env variables.
   - Environment variables values will only be used if the playbook values are
     not set.
   - The I(service_account_email) and I(service_account_file) options are
@@ -197,4 +224,16 @@ options:
         - '3'
         default: '1'
         type: str
+    journal_ttl:
+        description:
+        - The time, in seconds, during which the journal of the applied policies is trusted.
+        - The journal records, for each resource, a hash of the declared policy and the etag of the policy once applied.
+          When the declaration is unchanged since then, only the etag of the policy is read, and the policy is neither
+          read in full nor compared if the etag is unchanged too.
+        - The journal is kept in the on-disk cache of the host running the module. A policy changed outside of the
+          module changes its etag, and is then read and compared as usual.
+        - When the journal applies, the declared bindings are returned instead of the policy read.
+        - 0 disables the journal.
+        default: 0
+        type: int
 '''
@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: Raphaël de Gail
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""On-disk cache shared by the runs of the modules on a host.
+
+Entries are stored per namespace in a JSON file, along with the time they
+were stored, under ~/.ansible/gcp_cache or the directory given by the
+GCP_CACHE_DIR environment variable. Writes hold an exclusive lock and
+replace the file at once, so concurrent tasks never read a partial file.
+
+The same files hold the journal of the IAM policies applied by the modules,
+which lets a converge skip reading and comparing a policy nobody changed.
+"""
+
+from __future__ import (absolute_import, division, print_function)
+
+__metaclass__ = type
+
+import fcntl
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+DEFAULT_DIRECTORY = os.path.join('~', '.ansible', 'gcp_cache')
+
+JOURNAL_NAMESPACE = 'iam_journal'
+
+
+def cache_directory():
+    """Returns the directory of the cache files."""
+    return os.path.expanduser(os.environ.get('GCP_CACHE_DIR') or DEFAULT_DIRECTORY)
+
+
+class DiskCache(object):
+    """A namespace of the on-disk cache.
+
+    Attributes:
+        path: str, the path of the file of the namespace.
+        ttl: float, the time during which an entry is served, in seconds.
+    """
+    def __init__(self, namespace, ttl, directory=None):
+        """Initializes the instance based on attributes.
+
+        Args:
+            namespace: str, the name of the namespace.
+            ttl: float, the time during which an entry is served, in seconds, 0 to disable the cache.
+            directory: str, the directory of the cache files.
+        """
+        self.path = os.path.join(directory or cache_directory(), '%s.json' % namespace)
+        self.ttl = ttl
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def lookup(self, keys):
+        """Returns the fresh entries of some keys.
+
+        Args:
+            keys: list, the keys.
+
+        Returns:
+            dict, the values of the keys found, by key.
+        """
+        if self.ttl <= 0:
+            return {}
+        entries = self._load()
+        now = time.time()
+        return dict(
+            (key, entries[key]['value']) for key in keys
+            if key in entries and now - entries[key]['time'] < self.ttl
+        )
+
+    def store(self, values):
+        """Stores entries, dropping the expired ones.
+
+        The cache only saves requests: failing to write it is not an error.
+
+        Args:
+            values: dict, the values by key.
+        """
+        if self.ttl <= 0 or not values:
+            return
+        directory = os.path.dirname(self.path)
+        try:
+            os.makedirs(directory, mode=0o700, exist_ok=True)
+            with open(self.path + '.lock', 'a') as lock:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+                now = time.time()
+                entries = dict(
+                    (key, entry) for key, entry in self._load().items()
+                    if now - entry.get('time', 0) < self.ttl
+                )
+                entries.update((key, {'time': now, 'value': value}) for key, value in values.items())
+                fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.%s.' % os.path.basename(self.path))
+                with os.fdopen(fd, 'w') as f:
+                    json.dump(entries, f, sort_keys=True)
+                os.replace(temp_path, self.path)
+        except OSError:
+            pass
+
+
+def fingerprint(value):
+    """Returns a stable hash of a JSON value."""
+    return hashlib.sha256(json.dumps(value, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+class PolicyJournal(object):
+    """The last policy applied to a resource, as seen by the modules of a host.
+
+    An entry records the fingerprint of the declared policy and the etag of
+    the policy once it matched the declaration. While both are unchanged, the
+    policy of the resource is known to match the declaration.
+
+    Attributes:
+        cache: DiskCache, the namespace holding the journal.
+        resource: str, the URL of the resource holding the policy.
+        fingerprint: str, the fingerprint of the declared policy.
+    """
+    def __init__(self, resource, desired, ttl, directory=None):
+        """Initializes the instance based on attributes.
+
+        Args:
+            resource: str, the URL of the resource holding the policy.
+            desired: dict, the declared policy request.
+            ttl: float, the time during which an entry is trusted, in seconds, 0 to disable the journal.
+            directory: str, the directory of the cache files.
+        """
+        self.cache = DiskCache(JOURNAL_NAMESPACE, ttl, directory)
+        self.resource = resource
+        self.fingerprint = fingerprint(desired)
+
+    def unchanged(self, probe):
+        """Checks whether the policy still matches the declaration applied last.
+
+        Args:
+            probe: callable, returns the current etag of the policy. Only called when
+                the declaration is the one journaled.
+
+        Returns:
+            str, the etag of the policy if it is unchanged, None otherwise.
+        """
+        entry = self.cache.lookup([self.resource]).get(self.resource)
+        if not entry or entry.get('fingerprint') != self.fingerprint:
+            return None
+        etag = probe()
+        return etag if etag and etag == entry.get('etag') else None
+
+    def record(self, etag):
+        """Records the etag of the policy once it matches the declaration.
+
+        Args:
+            etag: str, the etag of the policy.
+        """
+        if etag:
+            self.cache.store({self.resource: {'fingerprint': self.fingerprint, 'etag': etag}})
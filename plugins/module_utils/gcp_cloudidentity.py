@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: Raphaël de Gail
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""Walks of the nested Cloud Identity groups.
+
+The graph of the groups is held as the direct members of every group, by
+group resource name, each member being a [member key, membership type]
+pair. Groups are members of other groups under their email, hence the
+names of the groups, by email, to follow them.
+"""
+
+from __future__ import (absolute_import, division, print_function)
+
+__metaclass__ = type
+
+API = 'https://cloudidentity.googleapis.com/v1'
+
+DIRECT = 'DIRECT'
+INDIRECT = 'INDIRECT'
+DIRECT_AND_INDIRECT = 'DIRECT_AND_INDIRECT'
+
+GROUP = 'GROUP'
+
+
+def merge_relations(current, relation):
+    """Returns the relation of a member reached through one more path.
+
+    Args:
+        current: str, the relation found so far, None when not found yet.
+        relation: str, the relation of the new path.
+
+    Returns:
+        str, the merged relation.
+    """
+    if current in (None, relation):
+        return relation
+    return DIRECT_AND_INDIRECT
+
+
+def transitive_members(memberships, names, group):
+    """Returns the members of a group, direct or through nested groups.
+
+    Args:
+        memberships: dict, the direct members of the groups, by group name.
+        names: dict, the names of the groups, by email.
+        group: str, the resource name of the group.
+
+    Returns:
+        dict, the relation of every member to the group, by member key.
+    """
+    relations = {}
+    seen = set([group])
+    stack = [(group, DIRECT)]
+    while stack:
+        current, relation = stack.pop()
+        for member, kind in memberships.get(current, []):
+            relations[member] = merge_relations(relations.get(member), relation)
+            nested = names.get(member) if kind == GROUP else None
+            if nested and nested not in seen:
+                seen.add(nested)
+                stack.append((nested, INDIRECT))
+    return relations
+
+
+def parent_groups(memberships):
+    """Returns the groups every member directly belongs to.
+
+    Args:
+        memberships: dict, the direct members of the groups, by group name.
+
+    Returns:
+        dict, the names of the groups, by member key.
+    """
+    parents = {}
+    for group, members in memberships.items():
+        for member, kind in members:
+            parents.setdefault(member, []).append(group)
+    return parents
+
+
+def transitive_groups(parents, emails, member):
+    """Returns the groups a member belongs to, directly or through nested groups.
+
+    Args:
+        parents: dict, the groups every member directly belongs to, as returned by parent_groups.
+        emails: dict, the emails of the groups, by name.
+        member: str, the member key.
+
+    Returns:
+        dict, the relation of the member to every group, by group name.
+    """
+    relations = {}
+    seen = set([member])
+    stack = [(member, DIRECT)]
+    while stack:
+        current, relation = stack.pop()
+        for group in parents.get(current, []):
+            relations[group] = merge_relations(relations.get(group), relation)
+            email = emails.get(group)
+            if email and email not in seen:
+                seen.add(email)
+                stack.append((email, INDIRECT))
+    return relations
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: Raphaël de Gail
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+
+__metaclass__ = type
+
+from ansible_collections.raphaeldegail.googlecloudy.plugins.module_utils.gcp_utils import (
+    return_if_object,
+    GcpSession
+)
+from ansible_collections.raphaeldegail.googlecloudy.plugins.module_utils.gcp_cache import (
+    DiskCache
+)
+
+API = 'https://iam.googleapis.com/v1'
+
+PERMISSIONS_NAMESPACE = 'iam_permissions'
+
+# The largest page size accepted by permissions.queryTestablePermissions.
+PERMISSIONS_PAGE_SIZE = 1000
+
+NOT_SUPPORTED = 'NOT_SUPPORTED'
+
+
+def full_resource_name(resource):
+    """Returns the full resource name of an organization or a project.
+
+    Args:
+        resource: str, the resource name, like organizations/1234 or projects/tokyo-rain-123.
+
+    Returns:
+        str, the full resource name.
+    """
+    return '//cloudresourcemanager.googleapis.com/%s' % resource
+
+
+def permission_catalog(module, resource, ttl):
+    """Returns the permissions which custom roles of a resource may include.
+
+    The catalog counts thousands of permissions over several pages: it is
+    kept in the on-disk cache, shared by the runs of a host.
+
+    Args:
+        module: AnsibleModule, the ansible module.
+        resource: str, the resource name of the organization or project hosting the roles.
+        ttl: float, the time during which the cached catalog is served, in seconds.
+
+    Returns:
+        set, the names of the permissions supported in custom roles.
+    """
+    name = full_resource_name(resource)
+    cache = DiskCache(PERMISSIONS_NAMESPACE, ttl)
+    cached = cache.lookup([name])
+    if name in cached:
+        return set(cached[name])
+    auth = GcpSession(module, 'iam')
+    permissions = auth.search(
+        '%s/permissions:queryTestablePermissions' % API,
+        return_if_object,
+        data={'fullResourceName': name, 'pageSize': PERMISSIONS_PAGE_SIZE},
+        array_name='permissions'
+    )
+    catalog = sorted(
+        permission['name'] for permission in permissions
+        if permission.get('customRolesSupportLevel') != NOT_SUPPORTED
+    )
+    cache.store({name: catalog})
+    return set(catalog)
+
+
+def permission_changes(declared, current):
+    """Diffs the permissions of a role as sets.
+
+    Args:
+        declared: list, the declared permissions.
+        current: list, the permissions of the role.
+
+    Returns:
+        tuple, the sorted permissions added and removed.
+    """
+    declared, current = set(declared or []), set(current or [])
+    return sorted(declared - current), sorted(current - declared)
@@ -0,0 +1,338 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: Raphaël de Gail
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+
+__metaclass__ = type
+
+import time
+
+from ansible_collections.raphaeldegail.googlecloudy.plugins.module_utils.gcp_utils import (
+    return_if_object,
+    GcpSession
+)
+
+API = 'https://cloudresourcemanager.googleapis.com/v3'
+
+API_V1 = 'https://cloudresourcemanager.googleapis.com/v1'
+
+IAM_API = 'https://iam.googleapis.com/v1'
+
+BILLING_API = 'https://cloudbilling.googleapis.com/v1'
+
+ACTIVE = 'ACTIVE'
+
+FOLDERS_PAGE_SIZE = 1000
+
+TAGS_PAGE_SIZE = 300
+
+# Seconds during which a listed parent is served from the index. The index
+# lives as long as the process, which spans many tasks in the controller
+# worker, and must not outlive changes made outside of the run.
+FOLDER_INDEX_TTL = 60
+
+# Child folders of each listed parent, by display name, along with the time
+# they were listed.
+_FOLDER_INDEX = {}
+
+# The API serving the IAM policy of each type of resource.
+IAM_POLICY_APIS = {
+    'organizations': API_V1,
+    'folders': API,
+    'projects': API_V1,
+    'tagKeys': API,
+}
+
+# The latest policy version, which holds the conditional bindings.
+POLICY_VERSION = 3
+
+# Namespaced names of the tag keys, by resource name. Both are immutable, so
+# the mapping holds as long as the process.
+_TAG_KEY_NAMES = {}
+
+
+def split_folder_path(path):
+    """Splits a folder path into its root resource and folder display names.
+
+    Args:
+        path: str, the path, like organizations/1234/Platform/Prod/Data or folders/5678/Data.
+
+    Returns:
+        tuple, the root resource name and the list of display names.
+    """
+    segments = [segment for segment in path.strip('/').split('/') if segment]
+    if len(segments) < 2 or segments[0] not in ('organizations', 'folders'):
+        raise ValueError("Folder path '%s' must start with organizations/{id} or folders/{id}" % path)
+    return '/'.join(segments[:2]), segments[2:]
+
+
+def folder_index(module, parent):
+    """Returns the child folders of a parent, by display name.
+
+    The children are listed with folders.list, which unlike folders:search
+    immediately reflects the folders just created. A display name held by
+    both an active and a deleted folder maps to the active one.
+
+    Args:
+        module: AnsibleModule, the ansible module.
+        parent: str, the resource name of the parent organization or folder.
+
+    Returns:
+        dict, the child folders, including the deleted ones, by display name.
+    """
+    listed = _FOLDER_INDEX.get(parent)
+    if listed and time.time() - listed[0] < FOLDER_INDEX_TTL:
+        return listed[1]
+
+    auth = GcpSession(module, 'resourcemanager')
+    folders = auth.list(
+        '%s/folders' % API,
+        return_if_object,
+        params={'parent': parent, 'pageSize': FOLDERS_PAGE_SIZE, 'showDeleted': 'true'},
+        array_name='folders'
+    )
+    index = {}
+    for folder in folders:
+        if folder.get('state', ACTIVE) == ACTIVE or folder.get('displayName') not in index:
+            index[folder.get('displayName')] = folder
+    _FOLDER_INDEX[parent] = (time.time(), index)
+    return index
+
+
+def find_folder(module, parent, display_name):
+    """Returns the folder with an exact display name under a parent.
+
+    Args:
+        module: AnsibleModule, the ansible module.
+        parent: str, the resource name of the parent organization or folder.
+        display_name: str, the display name of the folder.
+
+    Returns:
+        dict, the active folder, or None if there is none, the deleted folders being as good as absent.
+    """
+    folder = folder_index(module, parent).get(display_name)
+    if folder and folder.get('state', ACTIVE) == ACTIVE:
+        return folder
+    return None
+
+
+def list_folders(module, parent):
+    """Lists the active folders directly under a parent.
+
+    Args:
+        module: AnsibleModule, the ansible module.
+        parent: str, the resource name of the parent organization or folder.
+
+    Returns:
+        list, the active child folders.
+    """
+    return [folder for folder in folder_index(module, parent).values() if folder.get('state', ACTIVE) == ACTIVE]
+
+
+def index_folder(folder):
+    """Records a created, updated or deleted folder in the index of its parent, if listed.
+
+    Args:
+        folder: dict, the folder resource.
+    """
+    listed = _FOLDER_INDEX.get(folder.get('parent'))
+    if listed:
+        for display_name, indexed in list(listed[1].items()):
+            if indexed.get('name') == folder.get('name'):
+                del listed[1][display_name]
+        listed[1][folder.get('displayName')] = folder
+
+
+def resolve_folder_path(module, path):
+    """Resolves the existing folders along a path.
+
+    Each level is looked up in the index of its parent, so the parents
+    shared by several paths are listed only once.
+
+    Args:
+        module: AnsibleModule, the ansible module.
+        path: str, the path, like organizations/1234/Platform/Prod/Data.
+
+    Returns:
+        list, the active folders along the path, from the root, up to the deepest existing one.
+    """
+    root, names = split_folder_path(path)
+    folders = []
+    parent = root
+    for name in names:
+        folder = find_folder(module, parent, name)
+        if folder is None:
+            break
+        folders.append(folder)
+        parent = folder['name']
+    return folders
+
+
+def get_namespaced(module, collection, namespaced_name):
+    """Returns a tag key or a tag value by its namespaced name.
+
+    A missing tag is reported as denied, to not disclose its existence, so a
+    denied lookup falls back to the list of the tags of the parent, which
+    tells a missing tag from a denied one.
+
+    Args:
+        module: AnsibleModule, the ansible module.
+        collection: str, either tagKeys or tagValues.
+        namespaced_name: str, the namespaced name, like 1234/env or 1234/env/prod.
+
+    Returns:
+        dict, the tag key or value, or None if there is none.
+    """
+    auth = GcpSession(module, 'resourcemanager')
+    response = auth.get('%s/%s/namespaced' % (API, collection), params={'name': namespaced_name})
+    if response.status_code == 404:
+        return None
+    if response.status_code != 403:
+        return return_if_object(module, response)['result']
+
+    parent, short_name = namespaced_name.rsplit('/', 1)
+    if collection == 'tagValues':
+        key = get_namespaced(module, 'tagKeys', parent)
+        if key is None:
+            return None
+        parent = key['name']
+    elif parent.isdigit():
+        parent = 'organizations/%s' % parent
+    else:
+        parent = 'projects/%s' % parent
+    return find_short_name(module, collection, parent, short_name)
+
+
+def find_short_name(module, collection, parent, short_name):
+    """Returns a tag key or a tag value by its short name, from the list of its parent.
+
+    Args:
+        module: AnsibleModule, the ansible module.
+        collection: str, either tagKeys or tagValues.
+        parent: str, the resource name of the parent, like organizations/1234 or tagKeys/5678.
+        short_name: str, the short name of the tag.
+
+    Returns:
+        dict, the tag key or value, or None if there is none.
+    """
+    auth = GcpSession(module, 'resourcemanager')
+    tags = auth.list(
+        '%s/%s' % (API, collection),
+        return_if_object,
+        params={'parent': parent, 'pageSize': TAGS_PAGE_SIZE},
+        array_name=collection
+    )
+    for tag in tags:
+        if tag.get('shortName') == short_name:
+            return tag
+    return None
+
+
+def find_tag_key(module, parent, short_name):
+    """Returns the tag key with a short name under a parent.
+
+    The key is fetched by its namespaced name. Only projects given by
+    number, which cannot be namespaced, are scanned through the list of
+    their tag keys.
+
+    Args:
+        module: AnsibleModule, the ansible module.
+        parent: str, the resource name of the parent organization or project.
+        short_name: str, the short name of the tag key.
+
+    Returns:
+        dict, the tag key, or None if there is none.
+    """
+    parent_type, parent_id = parent.split('/', 1)
+    if not (parent_type == 'projects' and parent_id.isdigit()):
+        return get_namespaced(module, 'tagKeys', '%s/%s' % (parent_id, short_name))
+    return find_short_name(module, 'tagKeys', parent, short_name)
+
+
+def tag_key_namespaced_name(module, name):
+    """Returns the namespaced name of a tag key.
+
+    Args:
+        module: AnsibleModule, the ansible module.
+        name: str, the resource name of the tag key, like tagKeys/5678.
+
+    Returns:
+        str, the namespaced name of the tag key, or None if it does not exist.
+    """
+    if name not in _TAG_KEY_NAMES:
+        auth = GcpSession(module, 'resourcemanager')
+        key = return_if_object(module, auth.get('%s/%s' % (API, name)), allow_not_found=True)['result']
+        if not key:
+            return None
+        _TAG_KEY_NAMES[name] = key['namespacedName']
+    return _TAG_KEY_NAMES[name]
+
+
+def find_tag_value(module, parent, short_name):
+    """Returns the tag value with a short name under a tag key.
+
+    Args:
+        module: AnsibleModule, the ansible module.
+        parent: str, the tag key, either by resource name like tagKeys/5678 or by namespaced name like 1234/env.
+        short_name: str, the short name of the tag value.
+
+    Returns:
+        dict, the tag value, or None if there is none.
+    """
+    if parent.startswith('tagKeys/'):
+        parent = tag_key_namespaced_name(module, parent)
+        if parent is None:
+            return None
+    return get_namespaced(module, 'tagValues', '%s/%s' % (parent, short_name))
+
+
+def get_ancestry(module, project_id):
+    """Returns the ancestry of a project, from the project up to its organization.
+
+    Args:
+        module: AnsibleModule, the ansible module.
+        project_id: str, the ID or number of the project.
+
+    Returns:
+        list, the resource names of the project and its ancestors, like projects/demo, folders/5678 or organizations/1234.
+    """
+    auth = GcpSession(module, 'resourcemanager')
+    response = return_if_object(module, auth.post('%s/projects/%s:getAncestry' % (API_V1, project_id), {}))['result']
+    return [
+        '%ss/%s' % (ancestor['resourceId']['type'], ancestor['resourceId']['id'])
+        for ancestor in response.get('ancestor', [])
+    ]
+
+
+def get_iam_policy(module, resource, fields=None):
+    """Returns the IAM policy of an organization, a folder, a project, a tag key, a service account or a billing account.
+
+    Args:
+        module: AnsibleModule, the ansible module.
+        resource: str, the resource name, like organizations/1234, projects/demo or
+            projects/demo/serviceAccounts/ci@demo.iam.gserviceaccount.com.
+        fields: str, the fields of the policy to return, such as etag, all by default.
+
+    Returns:
+        dict, the policy, with its conditional bindings.
+    """
+    auth = GcpSession(module, 'resourcemanager')
+    params = {'fields': fields} if fields else {}
+    if '/serviceAccounts/' in resource:
+        # The IAM API takes the policy options as query parameters.
+        params['options.requestedPolicyVersion'] = POLICY_VERSION
+        response = auth.post('%s/%s:getIamPolicy' % (IAM_API, resource), params=params)
+    elif resource.startswith('billingAccounts/'):
+        # The billing API reads the policy with a GET.
+        params['options.requestedPolicyVersion'] = POLICY_VERSION
+        response = auth.full_get('%s/%s:getIamPolicy' % (BILLING_API, resource), params=params)
+    else:
+        api = IAM_POLICY_APIS[resource.split('/')[0]]
+        response = auth.post(
+            '%s/%s:getIamPolicy' % (api, resource),
+            {'options': {'requestedPolicyVersion': POLICY_VERSION}},
+            params=params or None
+        )
+    return return_if_object(module, response)['result'] or {}
@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: Raphaël de Gail
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import (absolute_import, division, print_function)
+
+__metaclass__ = type
+
+import gzip
+import hashlib
+import json
+import threading
+import time
+import weakref
+
+# Replay sessions are shared by every GcpSession of a module run, so that the
+# cassette is read once and consumed in order across calls. Every run, such
+# as every task served by the controller worker, replays the cassette anew.
+_REPLAY_SESSIONS = weakref.WeakKeyDictionary()
+_REPLAY_LOCK = threading.Lock()
+
+
+def open_cassette(path, mode):
+    """Opens a cassette file, compressed if its name ends with .gz.
+
+    Args:
+        path: str, the path of the cassette.
+        mode: str, the text mode to open the file with.
+
+    Returns:
+        file, the opened cassette.
+    """
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+def interaction_key(method, url, params=None, data=None, json_body=None):
+    """Returns the key identifying a request in a cassette.
+
+    Args:
+        method: str, the HTTP method.
+        url: str, the URL of the request.
+        params: dict, the query-parameters of the request.
+        data: obj, the raw body of the request.
+        json_body: obj, the JSON body of the request.
+
+    Returns:
+        tuple, the method, the full URL and a digest of the body.
+    """
+    import requests
+
+    full_url = requests.Request(method, url, params=params).prepare().url
+    if json_body is not None:
+        body = json.dumps(json_body, sort_keys=True, separators=(',', ':'))
+    else:
+        body = data if isinstance(data, (str, bytes)) else json.dumps(data, sort_keys=True)
+    if isinstance(body, str):
+        body = body.encode('utf-8')
+    digest = hashlib.sha1(body).hexdigest()[:16] if body and body != b'null' else ''
+    return method.upper(), full_url, digest
+
+
+class RecordingSession(object):
+    """Calls the APIs through a live session and records every interaction.
+
+    Each interaction is appended as one JSON line to the cassette, without
+    the request headers so that no credential is ever written to disk.
+
+    Attributes:
+        session: requests.Session, the live session.
+        cassette: str, the path of the cassette.
+    """
+    _lock = threading.Lock()
+
+    def __init__(self, session, cassette):
+        """Initializes the instance based on attributes.
+
+        Args:
+            session: requests.Session, the live session.
+            cassette: str, the path of the cassette.
+        """
+        self.session = session
+        self.cassette = cassette
+
+    def request(self, method, url, **kwargs):
+        """Sends the request and records it along with its response.
+
+        Args:
+            method: str, the HTTP method.
+            url: str, the URL to call for the request.
+            **kwargs: Arbitrary keyword arguments of requests.Session.request.
+
+        Returns:
+            requests.Response, the response from the request.
+        """
+        start = time.time()
+        response = self.session.request(method, url, **kwargs)
+        elapsed = time.time() - start
+        key = interaction_key(method, url, kwargs.get('params'), kwargs.get('data'), kwargs.get('json'))
+        entry = {
+            'm': key[0],
+            'u': key[1],
+            'b': key[2],
+            's': response.status_code,
+            'c': response.headers.get('Content-Type'),
+            'r': response.text,
+            't': round(elapsed, 4),
+        }
+        with self._lock:
+            with open_cassette(self.cassette, 'a') as f:
+                f.write(json.dumps(entry, separators=(',', ':')) + '\n')
+        return response
+
+
+class ReplaySession(object):
+    """Serves the interactions recorded in a cassette, without network access.
+
+    Requests are matched on method, URL and body first, then on method and
+    URL only. Identical requests are served in their recorded order, which
+    replays operation polling and pagination faithfully.
+
+    Attributes:
+        cassette: str, the path of the cassette.
+        scale: float, the factor applied to the recorded response times.
+    """
+    def __init__(self, cassette, scale=1.0):
+        """Initializes the instance based on attributes.
+
+        Args:
+            cassette: str, the path of the cassette.
+            scale: float, the factor applied to the recorded response times, 0 to answer immediately.
+        """
+        self.cassette = cassette
+        self.scale = scale
+        self._lock = threading.Lock()
+        self._exact = {}
+        self._loose = {}
+        with open_cassette(cassette, 'r') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                self._exact.setdefault((entry['m'], entry['u'], entry['b']), []).append(entry)
+                self._loose.setdefault((entry['m'], entry['u']), []).append(entry)
+
+    def request(self, method, url, **kwargs):
+        """Returns the recorded response of a request.
+
+        Args:
+            method: str, the HTTP method.
+            url: str, the URL to call for the request.
+            **kwargs: Arbitrary keyword arguments of requests.Session.request.
+
+        Returns:
+            requests.Response, the recorded response.
+
+        Raises:
+            requests.exceptions.ConnectionError: no interaction was recorded for the request.
+        """
+        import requests
+
+        key = interaction_key(method, url, kwargs.get('params'), kwargs.get('data'), kwargs.get('json'))
+        with self._lock:
+            entry = self._next(self._exact.get(key)) or self._next(self._loose.get(key[:2]))
+        if entry is None:
+            raise requests.exceptions.ConnectionError('No interaction recorded in %s for %s %s' % (self.cassette, key[0], key[1]))
+        if self.scale:
+            time.sleep(entry['t'] * self.scale)
+        return self._response(entry, method, key[1], kwargs)
+
+    def _next(self, entries):
+        """Pops the next unused entry, keeping the last one to serve repeated calls."""
+        if not entries:
+            return None
+        while len(entries) > 1 and entries[0].get('used'):
+            entries.pop(0)
+        entry = entries.pop(0) if len(entries) > 1 else entries[0]
+        entry['used'] = True
+        return entry
+
+    def _response(self, entry, method, url, kwargs):
+        import requests
+
+        response = requests.Response()
+        response.status_code = entry['s']
+        response.url = url
+        response.encoding = 'utf-8'
+        response._content = (entry['r'] or '').encode('utf-8')
+        if entry.get('c'):
+            response.headers['Content-Type'] = entry['c']
+        response.request = requests.Request(
+            method, url, json=kwargs.get('json'), data=kwargs.get('data'), headers=kwargs.get('headers')
+        ).prepare()
+        return response
+
+
+def replay_session(module, cassette, scale):
+    """Returns the replay session of a cassette, shared within the module run.
+
+    Args:
+        module: AnsibleModule, the ansible module.
+        cassette: str, the path of the cassette.
+        scale: float, the factor applied to the recorded response times.
+
+    Returns:
+        ReplaySession, the replay session.
+    """
+    with _REPLAY_LOCK:
+        sessions = _REPLAY_SESSIONS.setdefault(module, {})
+        if (cassette, scale) not in sessions:
+            try:
+                sessions[(cassette, scale)] = ReplaySession(cassette, scale)
+            except (OSError, ValueError) as inst:
+                module.fail_json(msg='Unable to read the cassette %s: %s' % (cassette, inst))
+        return sessions[(cassette, scale)]
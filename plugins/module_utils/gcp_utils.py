@@ -7,29 +7,53 @@ from __future__ import (absolute_import, division, print_function)
 
 __metaclass__ = type
 
+import collections
 import os
+import sys
 import json
 import time
-
-try:
-    import requests
-    HAS_REQUESTS = True
-except ImportError:
-    HAS_REQUESTS = False
-
-try:
-    import google.auth
-    import google.auth.compute_engine
-    from google.oauth2 import service_account, credentials as oauth2
-    from google.auth.transport.requests import AuthorizedSession
-    HAS_GOOGLE_LIBRARIES = True
-except ImportError:
-    HAS_GOOGLE_LIBRARIES = False
+import tempfile
+import threading
+import contextvars
+import importlib.util
 
 from ansible.module_utils.basic import AnsibleModule, env_fallback
 from ansible.module_utils._text import to_text
 
 
+def has_library(name):
+    """Checks whether a library is installed, without importing it.
+
+    The HTTP and Google libraries are only imported when a request is sent,
+    which keeps them out of tasks failing validation or exiting early.
+
+    Args:
+        name: str, the full name of the library.
+
+    Returns:
+        bool, True if the library can be imported.
+    """
+    try:
+        return importlib.util.find_spec(name) is not None
+    except ImportError:
+        return False
+
+
+HAS_REQUESTS = has_library('requests')
+HAS_GOOGLE_LIBRARIES = has_library('google.auth') and has_library('google.oauth2')
+
+# Default number of parallel requests issued by the modules
+DEFAULT_CONCURRENCY = 10
+
+# Authorized sessions are shared within the process, per credentials, so that
+# connections and access tokens are reused across requests and, in the
+# controller worker, across tasks. Only the sessions used last are kept, as
+# access tokens given by the tasks change over the life of the worker.
+MAX_SESSIONS = 16
+_SESSIONS = collections.OrderedDict()
+_SESSIONS_LOCK = threading.Lock()
+
+
 def remove_nones(obj):
     """Remove empty values in complex object.
 
@@ -223,6 +247,93 @@ def return_if_object(module, response, err_path=('error', 'message'), allow_not_
     return full_result
 
 
+def run_concurrently(function, items, max_workers=DEFAULT_CONCURRENCY):
+    """Applies a function to items in parallel threads.
+
+    Each call runs in a copy of the calling context, so that the output of a
+    module served by the controller worker is kept. The first exception
+    raised by a call, including the exit of a failing module, is raised
+    again once the pending calls are cancelled.
+
+    Args:
+        function: func, the function to apply to each item.
+        items: list, the items.
+        max_workers: int, the maximum number of parallel calls.
+
+    Returns:
+        list, the results of the calls, in the order of the items.
+    """
+    items = list(items)
+    if len(items) <= 1 or max_workers <= 1:
+        return [function(item) for item in items]
+
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+        futures = [executor.submit(contextvars.copy_context().run, function, item) for item in items]
+        try:
+            return [future.result() for future in futures]
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+
+
+class RateLimiter(object):
+    """Spaces the calls shared by threads to a maximum rate.
+
+    Attributes:
+        interval: float, the time between two calls, in seconds, 0 for no limit.
+    """
+    def __init__(self, rate):
+        """Initializes the instance based on attributes.
+
+        Args:
+            rate: float, the maximum number of calls per second, 0 for no limit.
+        """
+        self.interval = 1.0 / rate if rate > 0 else 0
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def wait(self):
+        """Blocks until the next call is allowed."""
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        time.sleep(start - now)
+
+
+def write_lines(module, items, path):
+    """Writes items to a JSON Lines file as they come.
+
+    The items go to a temporary file next to the destination, which then
+    replaces it.
+
+    Args:
+        module: AnsibleModule, the ansible module.
+        items: iterable, the items.
+        path: str, the path of the file.
+
+    Returns:
+        int, the number of items written.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.%s.' % os.path.basename(path))
+    count = 0
+    try:
+        with os.fdopen(fd, 'w') as f:
+            for item in items:
+                f.write(json.dumps(item, sort_keys=True) + '\n')
+                count += 1
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+    module.atomic_move(temp_path, path)
+    return count
+
+
 def list_differences(request, response):
     """List the differences between two objects.
 
@@ -243,6 +354,34 @@ def list_differences(request, response):
     return difference
 
 
+def update_mask(request, response, maps=(), prefix=''):
+    """List the field paths of a request differing from a response.
+
+    Nested messages are compared field by field, so that only the paths of
+    the changed fields are named, unless the response lacks the message as a
+    whole. Fields missing from the response are taken as their empty value,
+    like the API omits them.
+
+    Args:
+        request: dict, the request object.
+        response: dict, the response object.
+        maps: tuple, the paths of the fields holding maps, compared as a whole.
+        prefix: str, the path of the objects compared.
+
+    Returns:
+        list, the paths of the differing fields, like ['description', 'oidc.allowedAudiences'].
+    """
+    paths = []
+    for key, value in request.items():
+        path = prefix + key
+        current = response.get(key)
+        if isinstance(value, dict) and isinstance(current, dict) and path not in maps:
+            paths.extend(update_mask(value, current, maps, path + '.'))
+        elif value != (type(value)() if current is None else current):
+            paths.append(path)
+    return paths
+
+
 class GcpSession(object):
     """Handles all authentication and HTTP sessions for GCP API calls.
 
@@ -340,18 +479,35 @@ class GcpSession(object):
         Returns:
             dict, the list response from the API.
         """
-        resp = callback(self.module, self.full_get(url, params, **kwargs))['result']
-        items = resp.get(array_name) if resp.get(array_name) else []
-        while resp.get(pageToken):
-            if params:
-                params['pageToken'] = resp.get(pageToken)
-            else:
-                params = {'pageToken': resp[pageToken]}
+        return list(self.iterate(url, callback, params, array_name, pageToken, **kwargs))
+
+    def iterate(self, url, callback, params=None, array_name='items',
+                pageToken='nextPageToken', **kwargs):
+        """Iterates over the items of an API with a LIST format.
+
+        The pages are requested as the items are consumed, so that only the
+        current page is held in memory.
 
+        Args:
+            url: str, the URL to call for the request.
+            callback: func, the function to decode the response.
+            params: dict, query-parameters for the request.
+            array_name: str, the resource name to look for the list in the API
+                response.
+            pageToken: str, the name of the token to follow the page ordering.
+            **kwargs: Arbitrary keyword arguments.
+
+        Yields:
+            dict, the items of the list.
+        """
+        params = dict(params or {})
+        while True:
             resp = callback(self.module, self.full_get(url, params, **kwargs))['result']
-            if resp.get(array_name):
-                items = items + resp.get(array_name)
-        return items
+            for item in resp.get(array_name) or []:
+                yield item
+            if not resp.get(pageToken):
+                return
+            params['pageToken'] = resp[pageToken]
 
     def search(self, url, callback, data=None, array_name='items', pageToken='nextPageToken', **kwargs):
         """Calls for an API with a SEARCH format.
@@ -368,7 +524,7 @@ class GcpSession(object):
         Returns:
             dict, the list response from the API.
         """
-        resp = callback(self.module, self.full_post(url, data, **kwargs))['result']
+        resp = callback(self.module, self.full_post(url, json=data, **kwargs))['result']
         items = resp.get(array_name) if resp.get(array_name) else []
         while resp.get(pageToken):
             if data:
@@ -376,7 +532,7 @@ class GcpSession(object):
             else:
                 data = {'pageToken': resp[pageToken]}
 
-            resp = callback(self.module, self.full_post(url, data, **kwargs))['result']
+            resp = callback(self.module, self.full_post(url, json=data, **kwargs))['result']
             if resp.get(array_name):
                 items = items + resp.get(array_name)
         return items
@@ -392,36 +548,16 @@ class GcpSession(object):
         Returns:
             requests.Response, the response from the request.
         """
-        kwargs['headers'] = self._set_headers(kwargs.get('headers'))
-        try:
-            return self.session().get(url, params=params, **kwargs)
-        except getattr(requests.exceptions, 'RequestException') as inst:
-            # Only log the message to avoid logging any sensitive info.
-            self.module.fail_json(msg=inst.message)
+        return self._request('GET', url, params=params, **kwargs)
 
     def full_post(self, url, data=None, json=None, **kwargs):
-        kwargs['headers'] = self._set_headers(kwargs.get('headers'))
-
-        try:
-            return self.session().post(url, data=data, json=json, **kwargs)
-        except getattr(requests.exceptions, 'RequestException') as inst:
-            self.module.fail_json(msg=inst.message)
+        return self._request('POST', url, data=data, json=json, **kwargs)
 
     def full_put(self, url, data=None, **kwargs):
-        kwargs['headers'] = self._set_headers(kwargs.get('headers'))
-
-        try:
-            return self.session().put(url, data=data, **kwargs)
-        except getattr(requests.exceptions, 'RequestException') as inst:
-            self.module.fail_json(msg=inst.message)
+        return self._request('PUT', url, data=data, **kwargs)
 
     def full_patch(self, url, data=None, **kwargs):
-        kwargs['headers'] = self._set_headers(kwargs.get('headers'))
-
-        try:
-            return self.session().patch(url, data=data, **kwargs)
-        except getattr(requests.exceptions, 'RequestException') as inst:
-            self.module.fail_json(msg=inst.message)
+        return self._request('PATCH', url, data=data, **kwargs)
 
     def full_delete(self, url, **kwargs):
         """Implement the DELETE method for the sessions request.
@@ -430,15 +566,31 @@ class GcpSession(object):
             url: str, the URL to call for the request.
             **kwargs: Arbitrary keyword arguments.
 
+        Returns:
+            requests.Response, the response from the request.
+        """
+        return self._request('DELETE', url, **kwargs)
+
+    def _request(self, method, url, **kwargs):
+        """Sends a request through the transport of the session.
+
+        Args:
+            method: str, the HTTP method.
+            url: str, the URL to call for the request.
+            **kwargs: Arbitrary keyword arguments.
+
         Returns:
             requests.Response, the response from the request.
         """
         kwargs['headers'] = self._set_headers(kwargs.get('headers'))
+        session = self.session()
 
+        import requests
         try:
-            return self.session().delete(url, **kwargs)
+            return session.request(method, url, **kwargs)
         except getattr(requests.exceptions, 'RequestException') as inst:
-            self.module.fail_json(msg=inst.message)
+            # Only log the message to avoid logging any sensitive info.
+            self.module.fail_json(msg=to_text(inst))
 
     def _set_headers(self, headers):
         """Generates all basic HTTP headers.
@@ -453,11 +605,35 @@ class GcpSession(object):
     def session(self):
         """Generates an HTTP session.
 
+        The session depends on the transport: live sessions call the APIs,
+        recording sessions also append every interaction to the cassette and
+        replay sessions serve the cassette without credentials nor network.
+
         Returns:
             requests.Session, the HTTP session.
         """
-        return AuthorizedSession(
-            self._credentials())
+        transport = self.module.params.get('transport') or 'live'
+        if transport == 'replay':
+            from ansible_collections.raphaeldegail.googlecloudy.plugins.module_utils.gcp_transport import replay_session
+            return replay_session(self.module, self.module.params['cassette'], self.module.params.get('replay_scale', 1.0))
+
+        key = self._credentials_key()
+        with _SESSIONS_LOCK:
+            session = _SESSIONS.get(key)
+            if session is not None:
+                _SESSIONS.move_to_end(key)
+        if session is None:
+            from google.auth.transport.requests import AuthorizedSession
+            session = AuthorizedSession(self._credentials())
+            with _SESSIONS_LOCK:
+                session = _SESSIONS.setdefault(key, session)
+                # The sessions evicted are left to the requests still using them.
+                while len(_SESSIONS) > MAX_SESSIONS:
+                    _SESSIONS.popitem(last=False)
+        if transport == 'record':
+            from ansible_collections.raphaeldegail.googlecloudy.plugins.module_utils.gcp_transport import RecordingSession
+            return RecordingSession(session, self.module.params['cassette'])
+        return session
 
     def _validate(self):
         """Verify if module has proper dependencies.
@@ -484,14 +660,44 @@ class GcpSession(object):
                 msg='Supplying access_token requires auth_kind set to accesstoken'
             )
 
+        if self.module.params.get('transport') in ('record', 'replay') and not self.module.params.get('cassette'):
+            self.module.fail_json(
+                msg='A cassette must be supplied when transport is %s' % self.module.params['transport']
+            )
+
+    def _credentials_key(self):
+        """Returns the key identifying the credentials of the module.
+
+        Returns:
+            tuple, the authentication parameters of the module.
+        """
+        params = self.module.params
+        return (
+            params['auth_kind'],
+            params.get('service_account_email'),
+            params.get('service_account_file'),
+            json.dumps(params.get('service_account_contents'), sort_keys=True),
+            params.get('access_token'),
+            tuple(params.get('scopes') or []),
+        )
+
     def _credentials(self):
+        """Loads the credentials selected by auth_kind.
+
+        Only the credential class of the selected kind is imported.
+
+        Returns:
+            google.auth.credentials.Credentials, the credentials.
+        """
         cred_type = self.module.params['auth_kind']
 
         if cred_type == 'application':
+            import google.auth
             credentials, project_id = google.auth.default(scopes=self.module.params['scopes'])
             return credentials
 
         if cred_type == 'serviceaccount':
+            from google.oauth2 import service_account
             service_account_file = self.module.params.get('service_account_file')
             service_account_contents = self.module.params.get('service_account_contents')
             if service_account_file is not None:
@@ -517,9 +723,10 @@ class GcpSession(object):
             return svc_acct_creds.with_scopes(self.module.params['scopes'])
 
         if cred_type == 'machineaccount':
+            from google.auth import compute_engine
             email = self.module.params['service_account_email']
             email = email if email is not None else "default"
-            return google.auth.compute_engine.Credentials(email)
+            return compute_engine.Credentials(email)
 
         if cred_type == 'accesstoken':
             access_token = self.module.params['access_token']
@@ -527,6 +734,7 @@ class GcpSession(object):
                 self.module.fail_json(
                     msg='An access token must be supplied when auth_kind is accesstoken'
                 )
+            from google.oauth2 import credentials as oauth2
             return oauth2.Credentials(access_token, scopes=self.module.params['scopes'])
 
         self.module.fail_json(msg="Credential type '%s' not implemented" % cred_type)
@@ -606,24 +814,63 @@ class GcpModule(AnsibleModule):
                 env_type=dict(
                     required=False,
                     fallback=(env_fallback, ['GCP_ENV_TYPE']),
-                    type='str')
+                    type='str'),
+                transport=dict(
+                    required=False,
+                    default='live',
+                    fallback=(env_fallback, ['GCP_TRANSPORT']),
+                    choices=['live', 'record', 'replay'],
+                    type='str'),
+                cassette=dict(
+                    required=False,
+                    fallback=(env_fallback, ['GCP_CASSETTE']),
+                    type='path'),
+                replay_scale=dict(
+                    required=False,
+                    default=1.0,
+                    fallback=(env_fallback, ['GCP_REPLAY_SCALE']),
+                    type='float')
             )
         )
 
+        self._exit_lock = threading.Lock()
+        self._exited = False
+
         mutual = kwargs.get('mutually_exclusive', [])
 
-        kwargs['mutually_exclusive'] = mutual.append(
+        kwargs['mutually_exclusive'] = mutual + [
             ['service_account_email', 'service_account_file', 'service_account_contents']
-        )
+        ]
 
         AnsibleModule.__init__(self, *args, **kwargs)
 
+    def exit_json(self, **kwargs):
+        """Returns from the module, unless it has already exited from another thread."""
+        self._exit_once()
+        AnsibleModule.exit_json(self, **kwargs)
+
+    def fail_json(self, msg, **kwargs):
+        """Fails the module, unless it has already exited from another thread.
+
+        Concurrent requests may fail together: only the first failure is
+        reported, the other threads just exit.
+        """
+        self._exit_once()
+        AnsibleModule.fail_json(self, msg, **kwargs)
+
+    def _exit_once(self):
+        with self._exit_lock:
+            if self._exited:
+                sys.exit(1)
+            self._exited = True
+
     def raise_for_status(self, response):
         """Raises an HTTP exception from the response, if any.
 
         Args:
             response: requests.Response, the response to parse.
         """
+        import requests
         try:
             response.raise_for_status()
         except getattr(requests.exceptions, 'RequestException'):
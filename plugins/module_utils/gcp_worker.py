@@ -0,0 +1,348 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: Raphaël de Gail
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""Persistent controller-side worker running the collection modules.
+
+The worker is a long-lived process listening on a Unix socket. Each request
+holds the name and arguments of a module, whose main() is run in a thread of
+the worker with its arguments, standard output, warnings and deprecations
+kept per context. Imports, authorized sessions and access tokens thus stay
+warm between tasks.
+
+A worker only serves clients running the same collection code with the same
+GCP environment: both are hashed into the name of its socket. It exits after
+being idle for a while.
+"""
+
+from __future__ import (absolute_import, division, print_function)
+
+__metaclass__ = type
+
+import contextvars
+import fcntl
+import hashlib
+import importlib
+import io
+import json
+import os
+import re
+import socket
+import socketserver
+import subprocess
+import sys
+import threading
+import time
+import traceback
+
+from ansible.module_utils import basic
+from ansible.module_utils.common import warnings
+
+WORKER_MODULE = 'ansible_collections.raphaeldegail.googlecloudy.plugins.module_utils.gcp_worker'
+MODULES_PACKAGE = 'ansible_collections.raphaeldegail.googlecloudy.plugins.modules'
+DEFAULT_DIRECTORY = os.path.join('~', '.ansible', 'gcp_worker')
+DEFAULT_IDLE_TIMEOUT = 300
+START_TIMEOUT = 30
+
+# Environment variables read by the modules or the HTTP libraries, which the
+# worker inherits once when it starts.
+ENVIRONMENT_PREFIXES = ('GCP_', 'GOOGLE_', 'HTTP_PROXY', 'HTTPS_PROXY', 'NO_PROXY', 'REQUESTS_CA_BUNDLE', 'CURL_CA_BUNDLE')
+
+# Arguments and output of the module run by the current request. Context
+# variables follow the module into the threads it starts with a copy of its
+# context, see gcp_utils.run_concurrently.
+_ARGS = contextvars.ContextVar('gcp_worker_args')
+_STDOUT = contextvars.ContextVar('gcp_worker_stdout')
+_WARNINGS = contextvars.ContextVar('gcp_worker_warnings')
+_DEPRECATIONS = contextvars.ContextVar('gcp_worker_deprecations')
+
+
+def collection_root():
+    """Returns the root directory of the collection."""
+    return os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def fingerprint(environ=None):
+    """Hashes the collection code and the GCP environment.
+
+    Args:
+        environ: dict, the environment variables, the ones of the process by default.
+
+    Returns:
+        str, the fingerprint.
+    """
+    environ = os.environ if environ is None else environ
+    digest = hashlib.sha1()
+    for name in sorted(environ):
+        if name.upper().startswith(ENVIRONMENT_PREFIXES):
+            digest.update(('%s=%s\n' % (name, environ[name])).encode('utf-8'))
+    plugins = os.path.join(collection_root(), 'plugins')
+    for directory in ('module_utils', 'modules'):
+        for name in sorted(os.listdir(os.path.join(plugins, directory))):
+            if name.endswith('.py'):
+                stat = os.stat(os.path.join(plugins, directory, name))
+                digest.update(('%s/%s:%d:%d\n' % (directory, name, stat.st_mtime_ns, stat.st_size)).encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+
+def socket_path(directory=None):
+    """Returns the socket path of the worker matching this process.
+
+    Args:
+        directory: str, the directory holding the sockets.
+
+    Returns:
+        str, the path of the socket.
+    """
+    directory = os.path.expanduser(directory or DEFAULT_DIRECTORY)
+    return os.path.join(directory, 'worker-%s.sock' % fingerprint())
+
+
+class _ContextArgs(object):
+    """Stands for the module arguments buffer of AnsibleModule.
+
+    AnsibleModule decodes the process-wide _ANSIBLE_ARGS buffer: this object
+    decodes to the arguments of the module running in the current context.
+    """
+    def decode(self, encoding='utf-8'):
+        return _ARGS.get()
+
+
+class _ContextStream(object):
+    """Redirects the writes of the module running in the current context."""
+    def __init__(self, default):
+        self.default = default
+
+    def write(self, text):
+        return _STDOUT.get(self.default).write(text)
+
+    def flush(self):
+        _STDOUT.get(self.default).flush()
+
+
+class _ContextList(object):
+    """Stands for a process-wide list of Ansible, such as the warnings.
+
+    The items appended go to the list of the module running in the current
+    context, so that they are neither returned by later tasks nor by the
+    tasks running alongside.
+    """
+    def __init__(self, variable):
+        self.variable = variable
+        self.default = []
+
+    def append(self, item):
+        self.variable.get(self.default).append(item)
+
+    def __iter__(self):
+        return iter(self.variable.get(self.default))
+
+    def __len__(self):
+        return len(self.variable.get(self.default))
+
+
+def _keep_cwd(module):
+    """Stands for AnsibleModule._set_cwd, which may change the directory of the whole worker.
+
+    The worker runs from its own directory, which stays readable.
+
+    Args:
+        module: AnsibleModule, the ansible module.
+
+    Returns:
+        str, the current directory, None if unreadable.
+    """
+    try:
+        return os.getcwd()
+    except OSError:
+        return None
+
+
+def isolate():
+    """Replaces the process-wide state of Ansible modules with per-context state."""
+    basic._ANSIBLE_ARGS = _ContextArgs()
+    sys.stdout = _ContextStream(sys.stdout)
+    warnings._global_warnings = _ContextList(_WARNINGS)
+    warnings._global_deprecations = _ContextList(_DEPRECATIONS)
+    basic.AnsibleModule._set_cwd = _keep_cwd
+
+
+def run_module(name, args):
+    """Runs the main function of a module of the collection.
+
+    Args:
+        name: str, the short name of the module.
+        args: dict, the arguments of the module, including the internal ones.
+
+    Returns:
+        dict, the return code, the standard output and the standard error of the module.
+    """
+    if not re.match(r'^gcp_\w+$', name):
+        return {'rc': 1, 'stdout': '', 'stderr': 'Unknown module %s' % name}
+    _ARGS.set(json.dumps({'ANSIBLE_MODULE_ARGS': args}))
+    stdout = io.StringIO()
+    _STDOUT.set(stdout)
+    _WARNINGS.set([])
+    _DEPRECATIONS.set([])
+    rc, stderr = 0, ''
+    try:
+        importlib.import_module('%s.%s' % (MODULES_PACKAGE, name)).main()
+    except SystemExit as inst:
+        rc = inst.code if isinstance(inst.code, int) else int(inst.code is not None)
+    except Exception:
+        rc, stderr = 1, traceback.format_exc()
+    return {'rc': rc, 'stdout': stdout.getvalue(), 'stderr': stderr}
+
+
+class WorkerHandler(socketserver.StreamRequestHandler):
+    """Runs the module requested on a connection, one JSON line each way."""
+    def handle(self):
+        self.server.touch(1)
+        try:
+            request = json.loads(self.rfile.readline())
+            response = run_module(request['module'], request['args'])
+            self.wfile.write((json.dumps(response) + '\n').encode('utf-8'))
+        finally:
+            self.server.touch(-1)
+
+
+class WorkerServer(socketserver.ThreadingUnixStreamServer):
+    """Serves modules until idle for longer than the idle timeout.
+
+    Attributes:
+        idle_timeout: float, the idle time after which the worker exits, in seconds.
+    """
+    daemon_threads = True
+
+    def __init__(self, path, idle_timeout):
+        """Initializes the instance based on attributes.
+
+        Args:
+            path: str, the path of the socket.
+            idle_timeout: float, the idle time after which the worker exits, in seconds.
+        """
+        socketserver.ThreadingUnixStreamServer.__init__(self, path, WorkerHandler)
+        self.idle_timeout = idle_timeout
+        self._lock = threading.Lock()
+        self._active = 0
+        self._last_activity = time.time()
+
+    def touch(self, active):
+        with self._lock:
+            self._active += active
+            self._last_activity = time.time()
+
+    def idle(self):
+        with self._lock:
+            return not self._active and time.time() - self._last_activity > self.idle_timeout
+
+    def watch(self):
+        """Shuts the server down once idle."""
+        while not self.idle():
+            time.sleep(min(self.idle_timeout, 1.0))
+        self.shutdown()
+
+
+def _connect(path):
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+def serve(path, idle_timeout=DEFAULT_IDLE_TIMEOUT):
+    """Runs a worker on a socket, unless another one already listens on it.
+
+    Args:
+        path: str, the path of the socket.
+        idle_timeout: float, the idle time after which the worker exits, in seconds.
+    """
+    directory = os.path.dirname(path)
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    with open(path + '.lock', 'a') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            _connect(path).close()
+            return
+        except OSError:
+            pass
+        if os.path.exists(path):
+            os.unlink(path)
+        umask = os.umask(0o177)
+        try:
+            server = WorkerServer(path, idle_timeout)
+        finally:
+            os.umask(umask)
+
+    os.chdir(directory)
+    isolate()
+    threading.Thread(target=server.watch, daemon=True).start()
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        if os.path.exists(path):
+            os.unlink(path)
+
+
+def start(path, idle_timeout=DEFAULT_IDLE_TIMEOUT):
+    """Starts a worker in the background, detached from this process.
+
+    Args:
+        path: str, the path of the socket.
+        idle_timeout: float, the idle time after which the worker exits, in seconds.
+    """
+    env = dict(os.environ)
+    collections_path = os.path.dirname(os.path.dirname(os.path.dirname(collection_root())))
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [collections_path, env.get('PYTHONPATH')]))
+    subprocess.Popen(
+        [sys.executable, '-m', WORKER_MODULE, path, str(idle_timeout)],
+        env=env, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        close_fds=True, start_new_session=True
+    )
+
+
+def call(name, args, directory=None, idle_timeout=DEFAULT_IDLE_TIMEOUT):
+    """Runs a module in the worker, starting the worker if needed.
+
+    Args:
+        name: str, the short name of the module.
+        args: dict, the arguments of the module, including the internal ones.
+        directory: str, the directory holding the sockets.
+        idle_timeout: float, the idle time after which a started worker exits, in seconds.
+
+    Returns:
+        dict, the return code, the standard output and the standard error of the module.
+
+    Raises:
+        OSError: the worker could not be reached.
+    """
+    path = socket_path(directory)
+    try:
+        sock = _connect(path)
+    except OSError:
+        start(path, idle_timeout)
+        deadline = time.time() + START_TIMEOUT
+        while True:
+            try:
+                sock = _connect(path)
+                break
+            except OSError:
+                if time.time() > deadline:
+                    raise
+                time.sleep(0.05)
+
+    with sock:
+        sock.sendall((json.dumps({'module': name, 'args': args}) + '\n').encode('utf-8'))
+        line = sock.makefile('rb').readline()
+    if not line:
+        raise OSError('The GCP worker at %s closed the connection' % path)
+    return json.loads(line)
+
+
+if __name__ == '__main__':
+    serve(sys.argv[1], float(sys.argv[2]))
@@ -120,6 +120,9 @@ from ansible_collections.raphaeldegail.googlecloudy.plugins.module_utils.gcp_uti
     GcpSession,
     GcpModule
 )
+from ansible_collections.raphaeldegail.googlecloudy.plugins.module_utils.gcp_cache import (
+    PolicyJournal
+)
 
 ################################################################################
 # Main
@@ -150,6 +153,7 @@ def main():
                 )
             ),
             policy_version=dict(default="1", choices=["1", "2", "3"], type='str'),
+            journal_ttl=dict(default=0, type='int'),
             billing_account_id=dict(required=True, type='str')
         )
     )
@@ -157,6 +161,13 @@ def main():
     if not module.params['scopes']:
         module.params['scopes'] = ['https://www.googleapis.com/auth/cloud-billing']
 
+    journal = PolicyJournal(self_link(module), resource_to_request(module), module.params['journal_ttl'])
+    etag = journal.unchanged(lambda: fetch_resource(module, f'{self_link(module)}:getIamPolicy?fields=etag', False)['result'].get('etag'))
+    if etag:
+        result = dict(resource_to_request(module)['policy'], etag=etag)
+        result.update({'changed': False})
+        module.exit_json(**result)
+
     fetch = fetch_resource(module, f'{self_link(module)}:getIamPolicy', False)['result']
     changed = False
 
@@ -166,6 +177,8 @@ def main():
         fetch = fetch_resource(module, f'{self_link(module)}:getIamPolicy', False)['result']
         changed = True
 
+    journal.record(fetch.get('etag'))
+
     fetch.update({'changed': changed})
     fetch.update({'diff': difference} if difference else {})
 
@@ -0,0 +1,223 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright: Raphaël de Gail
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+################################################################################
+# Documentation
+################################################################################
+
+ANSIBLE_METADATA = {'metadata_version': '1.1', 'status': ["preview"], 'supported_by': 'community'}
+
+DOCUMENTATION = '''
+---
+module: gcp_billing_accounts_info
+description:
+- Gets every billing account visible to the caller, along with its IAM policy and the number of projects linked to it.
+- The billing accounts are listed page by page and handled in batches, the policies and project counts of a batch
+  being read in parallel.
+- With I(output_file), each billing account is written to a JSON Lines file once its batch is read, rather than
+  returned, so that the accounts of large resellers are not held in memory.
+short_description: Gets the inventory of the GCP billing accounts
+extends_documentation_fragment:
+- raphaeldegail.googlecloudy.gcp
+options:
+  include_subaccounts:
+    description:
+    - Whether the subaccounts of the reseller billing accounts should be included.
+    default: true
+    type: bool
+  policies:
+    description:
+    - Whether the IAM policy of every billing account should be read.
+    - The caller must have the billing.accounts.getIamPolicy permission on the accounts.
+    default: true
+    type: bool
+  project_counts:
+    description:
+    - Whether the projects linked to every billing account should be counted.
+    default: true
+    type: bool
+  output_file:
+    description:
+    - The path of a file to write the billing accounts to, one JSON object per line, instead of returning them.
+    - The file is written by the host running the module, that is the controller when the module runs
+      locally or in the controller worker.
+    - The file is replaced once all the billing accounts are written.
+    - In check mode, the billing accounts are counted but the file is not written.
+    type: path
+  concurrency:
+    description:
+    - The maximum number of parallel requests.
+    default: 10
+    type: int
+'''
+
+EXAMPLES = '''
+- name: Gets the billing accounts for a chargeback audit
+  raphaeldegail.googlecloudy.gcp_billing_accounts_info:
+    output_file: /var/lib/audit/billing.jsonl
+    auth_kind: serviceaccount
+    service_account_file: "/tmp/auth.pem"
+  delegate_to: localhost
+'''
+
+RETURN = '''
+accounts:
+  description:
+  - The billing accounts, as returned by the API, with their C(policy) and C(projectCount).
+  - Not returned when I(output_file) is given.
+  returned: success
+  type: list
+  elements: dict
+  sample:
+  - name: billingAccounts/012345-567890-ABCDEF
+    displayName: My billing account
+    open: true
+    masterBillingAccount: ''
+    policy:
+      bindings:
+      - role: roles/billing.admin
+        members:
+        - user:jane@example.com
+    projectCount: 12
+count:
+  description:
+  - The number of billing accounts.
+  returned: success
+  type: int
+output_file:
+  description:
+  - The path of the file the billing accounts were written to.
+  returned: when I(output_file) is given
+  type: str
+'''
+
+API = 'https://cloudbilling.googleapis.com/v1'
+
+# The billing accounts whose details are read and written together.
+BATCH_SIZE = 500
+
+# The largest page size accepted by billingAccounts.list and billingAccounts.projects.list.
+PAGE_SIZE = 100
+
+################################################################################
+# Imports
+################################################################################
+
+from ansible_collections.raphaeldegail.googlecloudy.plugins.module_utils.gcp_utils import (
+    return_if_object,
+    run_concurrently,
+    write_lines,
+    GcpSession,
+    GcpModule,
+    DEFAULT_CONCURRENCY
+)
+from ansible_collections.raphaeldegail.googlecloudy.plugins.module_utils.gcp_resourcemanager import (
+    get_iam_policy
+)
+
+################################################################################
+# Main
+################################################################################
+
+
+def main():
+    """Main function"""
+
+    module = GcpModule(
+        argument_spec=dict(
+            include_subaccounts=dict(default=True, type='bool'),
+            policies=dict(default=True, type='bool'),
+            project_counts=dict(default=True, type='bool'),
+            output_file=dict(type='path'),
+            concurrency=dict(default=DEFAULT_CONCURRENCY, type='int')
+        ),
+        supports_check_mode=True
+    )
+
+    if not module.params['scopes']:
+        module.params['scopes'] = ['https://www.googleapis.com/auth/cloud-billing']
+
+    accounts = describe_accounts(module)
+    if module.params['output_file']:
+        if module.check_mode:
+            count = sum(1 for item in accounts)
+        else:
+            count = write_lines(module, accounts, module.params['output_file'])
+        result = {'count': count, 'output_file': module.params['output_file']}
+    else:
+        accounts = list(accounts)
+        result = {'accounts': accounts, 'count': len(accounts)}
+
+    result.update({'changed': False})
+
+    module.exit_json(**result)
+
+
+def list_accounts(module):
+    """Iterates over the billing accounts visible to the caller.
+
+    Args:
+        module: AnsibleModule, the ansible module.
+
+    Returns:
+        generator, the billing accounts.
+    """
+    auth = GcpSession(module, 'billing')
+    for account in auth.iterate('%s/billingAccounts' % API, return_if_object, params={'pageSize': PAGE_SIZE}, array_name='billingAccounts'):
+        if module.params['include_subaccounts'] or not account.get('masterBillingAccount'):
+            yield account
+
+
+def describe_accounts(module):
+    """Iterates over the billing accounts with their details, read in parallel batch by batch.
+
+    Args:
+        module: AnsibleModule, the ansible module.
+
+    Returns:
+        generator, the billing accounts with their details.
+    """
+    batch = []
+    for account in list_accounts(module):
+        batch.append(account)
+        if len(batch) == BATCH_SIZE:
+            for described in run_concurrently(lambda item: describe(module, item), batch, module.params['concurrency']):
+                yield described
+            batch = []
+    for described in run_concurrently(lambda item: describe(module, item), batch, module.params['concurrency']):
+        yield described
+
+
+def describe(module, account):
+    """Returns a billing account along with its policy and project count.
+
+    Args:
+        module: AnsibleModule, the ansible module.
+        account: dict, the billing account.
+
+    Returns:
+        dict, the billing account with its details.
+    """
+    account = dict(account)
+    if module.params['policies']:
+        account['policy'] = get_iam_policy(module, account['name'])
+    if module.params['project_counts']:
+        auth = GcpSession(module, 'billing')
+        account['projectCount'] = sum(1 for project in auth.iterate(
+            '%s/%s/projects' % (API, account['name']),
+            return_if_object,
+            params={'pageSize': PAGE_SIZE, 'fields': 'nextPageToken,projectBillingInfo(projectId)'},
+            array_name='projectBillingInfo'
+        ))
+    return account
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,239 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright: Raphaël de Gail
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+################################################################################
+# Documentation
+################################################################################
+
+ANSIBLE_METADATA = {'metadata_version': '1.1', 'status': ["preview"], 'supported_by': 'community'}
+
+DOCUMENTATION = '''
+---
+module: gcp_billing_associations
+description:
+- Links many projects to a billing account, or unlinks them, at once.
+- The projects linked to the billing account are listed once, then only the projects to link or unlink
+  are updated, in parallel.
+- The current authenticated user must have ownership privileges for both the projects and the billing account.
+short_description: Links many GCP projects to a billing account
+extends_documentation_fragment:
+- raphaeldegail.googlecloudy.gcp
+options:
+  billing_account_id:
+    description:
+    - The resource ID of the billing account.
+    - For example, 012345-567890-ABCDEF.
+    required: true
+    type: str
+  projects:
+    description:
+    - The IDs of the projects.
+    - A project linked to another billing account is moved to this one.
+    default: []
+    type: list
+    elements: str
+  state:
+    description:
+    - Whether the projects should be linked to the billing account.
+    - With C(absent), the projects linked to the billing account are unlinked, which disables billing on them.
+    choices:
+    - present
+    - absent
+    default: present
+    type: str
+  exclusive:
+    description:
+    - Whether the projects linked to the billing account which are not declared should be unlinked.
+    - Only applies when I(state=present).
+    - Requires a non-empty I(projects), as no declared project would unlink every project of the account.
+    default: false
+    type: bool
+  concurrency:
+    description:
+    - The maximum number of parallel requests.
+    default: 10
+    type: int
+  rate_limit:
+    description:
+    - The maximum number of projects linked or unlinked per second, to stay within the quota of the billing API.
+    - 0 does not limit the rate.
+    default: 0
+    type: float
+'''
+
+EXAMPLES = '''
+- name: Links new projects to a billing account
+  raphaeldegail.googlecloudy.gcp_billing_associations:
+    billing_account_id: 012345-567890-ABCDEF
+    projects:
+    - tokyo-rain-123
+    - paris-sun-456
+    rate_limit: 5
+    auth_kind: serviceaccount
+    service_account_file: "/tmp/auth.pem"
+'''
+
+RETURN = '''
+projects:
+  description:
+  - The result of every declared or unlinked project.
+  returned: success
+  type: list
+  elements: dict
+  contains:
+    project_id:
+      description:
+      - The ID of the project.
+      returned: success
+      type: str
+    action:
+      description:
+      - The change made to the project, C(link) or C(unlink), or null when unchanged.
+      returned: success
+      type: str
+    billing_info:
+      description:
+      - The billing information of the project, as returned by the API.
+      - Empty for a project absent and not linked.
+      returned: success
+      type: dict
+linked:
+  description:
+  - The number of projects linked to the billing account once done.
+  returned: success
+  type: int
+'''
+
+API = 'https://cloudbilling.googleapis.com/v1'
+
+# The largest page size accepted by billingAccounts.projects.list.
+PROJECTS_PAGE_SIZE = 100
+
+################################################################################
+# Imports
+################################################################################
+
+from ansible_collections.raphaeldegail.googlecloudy.plugins.module_utils.gcp_utils import (
+    return_if_object,
+    run_concurrently,
+    GcpSession,
+    GcpModule,
+    RateLimiter,
+    DEFAULT_CONCURRENCY
+)
+
+################################################################################
+# Main
+################################################################################
+
+
+def main():
+    """Main function"""
+
+    module = GcpModule(
+        argument_spec=dict(
+            billing_account_id=dict(required=True, type='str'),
+            projects=dict(default=[], type='list', elements='str'),
+            state=dict(default='present', choices=['present', 'absent'], type='str'),
+            exclusive=dict(default=False, type='bool'),
+            concurrency=dict(default=DEFAULT_CONCURRENCY, type='int'),
+            rate_limit=dict(default=0, type='float')
+        ),
+        supports_check_mode=True
+    )
+
+    if module.params['state'] == 'present' and module.params['exclusive'] and not module.params['projects']:
+        module.fail_json(msg='exclusive requires at least one project, to not unlink every project of the billing account')
+
+    if not module.params['scopes']:
+        module.params['scopes'] = ['https://www.googleapis.com/auth/cloud-billing']
+
+    linked = dict((info['projectId'], info) for info in list_projects(module))
+    results = plan(module, linked)
+
+    if not module.check_mode:
+        changes = [result for result in results if result['action']]
+        limiter = RateLimiter(module.params['rate_limit'])
+        infos = run_concurrently(lambda result: apply(module, limiter, result), changes, module.params['concurrency'])
+        for result, info in zip(changes, infos):
+            result['billing_info'] = info
+
+    count = len(linked) + sum(1 if result['action'] == 'link' else -1 for result in results if result['action'])
+    result = {'projects': results, 'linked': count}
+    result.update({'changed': any(project['action'] for project in results)})
+
+    module.exit_json(**result)
+
+
+def plan(module, linked):
+    """Diffs the declared projects with the projects linked to the billing account.
+
+    Args:
+        module: AnsibleModule, the ansible module.
+        linked: dict, the billing information of the projects linked to the billing account, by project ID.
+
+    Returns:
+        list, the result of every project, with the action to apply.
+    """
+    declared = list(dict.fromkeys(module.params['projects']))
+    results = []
+    for project in declared:
+        current = linked.get(project)
+        result = {'project_id': project, 'action': None, 'billing_info': current or {}}
+        if module.params['state'] == 'absent':
+            if current:
+                result['action'] = 'unlink'
+        elif not current:
+            result['action'] = 'link'
+        results.append(result)
+    if module.params['state'] == 'present' and module.params['exclusive']:
+        # The list keeps the declared order, the set tells the declared projects apart.
+        declared_set = set(declared)
+        results.extend(
+            {'project_id': project, 'action': 'unlink', 'billing_info': info}
+            for project, info in sorted(linked.items())
+            if project not in declared_set
+        )
+    return results
+
+
+def apply(module, limiter, result):
+    """Links or unlinks a project.
+
+    Args:
+        module: AnsibleModule, the ansible module.
+        limiter: RateLimiter, the limiter shared by the updates.
+        result: dict, the result of the project, holding the action.
+
+    Returns:
+        dict, the billing information of the project, as returned by the update.
+    """
+    account = 'billingAccounts/%s' % module.params['billing_account_id'] if result['action'] == 'link' else ''
+    limiter.wait()
+    auth = GcpSession(module, 'billing')
+    return return_if_object(module, auth.put(self_link(result['project_id']), {'billingAccountName': account}))['result']
+
+
+def list_projects(module):
+    auth = GcpSession(module, 'billing')
+    return auth.list(
+        "{api}/billingAccounts/{billing_account_id}/projects".format(api=API, **module.params),
+        return_if_object,
+        params={'pageSize': PROJECTS_PAGE_SIZE},
+        array_name='projectBillingInfo'
+    )
+
+
+def self_link(project):
+    return "{api}/projects/{project}/billingInfo".format(api=API, project=project)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,494 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright: Raphaël de Gail
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+################################################################################
+# Documentation
+################################################################################
+
+ANSIBLE_METADATA = {'metadata_version': '1.1', 'status': ["preview"], 'supported_by': 'community'}
+
+DOCUMENTATION = '''
+---
+module: gcp_cloudidentity_transitive_membership_info
+description:
+- Answers many transitive membership questions at once, nested groups included.
+- Tells whether members belong to groups, lists the members of groups and lists the groups of members.
+- The transitive membership methods of the Cloud Identity API answer the questions, in parallel.
+- Where these methods are not available, as without Cloud Identity Premium, the graph of the groups is
+  built from their direct memberships, listed in parallel and cached on disk for I(cache_ttl) seconds,
+  and walked locally.
+short_description: Gets the transitive memberships of GCP Cloud Identity groups
+extends_documentation_fragment:
+- raphaeldegail.googlecloudy.gcp
+options:
+  queries:
+    description:
+    - The memberships to check.
+    default: []
+    type: list
+    elements: dict
+    suboptions:
+      member:
+        description:
+        - The email of the member, a user, a service account or a group.
+        required: true
+        type: str
+      group:
+        description:
+        - The email of the group, or its resource name like groups/03abc123.
+        required: true
+        type: str
+  groups:
+    description:
+    - The groups to list the members of, by email or resource name.
+    default: []
+    type: list
+    elements: str
+  members:
+    description:
+    - The emails of the members to list the groups of.
+    - Only the groups with the discussion forum label are returned by the transitive membership methods.
+    default: []
+    type: list
+    elements: str
+  customer:
+    description:
+    - The customer whose groups are walked to find the groups of I(members) from the graph of the groups.
+    - For example, customers/C0123abc.
+    - Required when I(members) are given and the graph of the groups is used.
+    type: str
+  mode:
+    description:
+    - How the questions are answered.
+    - C(api) uses the transitive membership methods, C(graph) the graph of the groups.
+    - C(auto) uses the transitive membership methods, or the graph of the groups when they are not available.
+    choices:
+    - auto
+    - api
+    - graph
+    default: auto
+    type: str
+  cache_ttl:
+    description:
+    - The time, in seconds, during which the cached memberships and names of the groups are used.
+    - 0 lists the memberships on every run.
+    default: 300
+    type: int
+  concurrency:
+    description:
+    - The maximum number of parallel requests.
+    default: 10
+    type: int
+'''
+
+EXAMPLES = '''
+- name: Checks the access of the on-call engineers
+  raphaeldegail.googlecloudy.gcp_cloudidentity_transitive_membership_info:
+    queries:
+    - member: jane@example.com
+      group: prod-admins@example.com
+    - member: john@example.com
+      group: prod-admins@example.com
+    members:
+    - jane@example.com
+    customer: customers/C0123abc
+    auth_kind: serviceaccount
+    service_account_file: "/tmp/auth.pem"
+'''
+
+RETURN = '''
+queries:
+  description:
+  - The answer to every query.
+  returned: success
+  type: list
+  elements: dict
+  contains:
+    member:
+      description:
+      - The email of the member.
+      returned: success
+      type: str
+    group:
+      description:
+      - The group, as given.
+      returned: success
+      type: str
+    is_member:
+      description:
+      - Whether the member belongs to the group, directly or through nested groups.
+      returned: success
+      type: bool
+group_members:
+  description:
+  - The members of every group of I(groups), by group as given.
+  - The relation of a member is C(DIRECT), C(INDIRECT) or C(DIRECT_AND_INDIRECT).
+  returned: success
+  type: dict
+  sample:
+    prod-admins@example.com:
+    - member: jane@example.com
+      relation: INDIRECT
+member_groups:
+  description:
+  - The groups of every member of I(members), by member.
+  returned: success
+  type: dict
+  sample:
+    jane@example.com:
+    - group: prod-admins@example.com
+      name: groups/03abc123
+      relation: INDIRECT
+source:
+  description:
+  - How the questions were answered, C(api) or C(graph).
+  returned: success
+  type: str
+'''
+
+# The namespaces of the on-disk cache holding the names and the direct members of the groups.
+NAMES_NAMESPACE = 'cloudidentity_group_names'
+MEMBERSHIPS_NAMESPACE = 'cloudidentity_memberships'
+
+# The largest page size accepted by groups.list and memberships.list in their basic view.
+PAGE_SIZE = 1000
+
+# The largest page size accepted by the transitive membership searches.
+SEARCH_PAGE_SIZE = 500
+
+# The statuses answered by the transitive membership methods where they are not available.
+UNAVAILABLE = (400, 403, 501)
+
+DISCUSSION_FORUM = 'cloudidentity.googleapis.com/groups.discussion_forum'
+
+################################################################################
+# Imports
+################################################################################
+
+from ansible_collections.raphaeldegail.googlecloudy.plugins.module_utils.gcp_utils import (
+    return_if_object,
+    run_concurrently,
+    GcpSession,
+    GcpModule,
+    DEFAULT_CONCURRENCY
+)
+from ansible_collections.raphaeldegail.googlecloudy.plugins.module_utils.gcp_cache import (
+    DiskCache
+)
+from ansible_collections.raphaeldegail.googlecloudy.plugins.module_utils.gcp_cloudidentity import (
+    parent_groups,
+    transitive_groups,
+    transitive_members,
+    API,
+    GROUP
+)
+
+################################################################################
+# Main
+################################################################################
+
+
+def main():
+    """Main function"""
+
+    module = GcpModule(
+        argument_spec=dict(
+            queries=dict(default=[], type='list', elements='dict', options=dict(
+                member=dict(required=True, type='str'),
+                group=dict(required=True, type='str')
+            )),
+            groups=dict(default=[], type='list', elements='str'),
+            members=dict(default=[], type='list', elements='str'),
+            customer=dict(type='str'),
+            mode=dict(default='auto', choices=['auto', 'api', 'graph'], type='str'),
+            cache_ttl=dict(default=300, type='int'),
+            concurrency=dict(default=DEFAULT_CONCURRENCY, type='int')
+        ),
+        supports_check_mode=True
+    )
+
+    if not module.params['scopes']:
+        module.params['scopes'] = ['https://www.googleapis.com/auth/cloud-identity.groups.readonly']
+
+    queries = list(dict.fromkeys((query['member'].lower(), query['group']) for query in module.params['queries']))
+    groups = list(dict.fromkeys(module.params['groups']))
+    members = list(dict.fromkeys(member.lower() for member in module.params['members']))
+    names = resolve(module, [group for member, group in queries] + groups)
+
+    result = None
+    if module.params['mode'] != 'graph':
+        result = query_api(module, names, queries, groups, members)
+    if result is None:
+        result = query_graph(module, names, queries, groups, members)
+
+    result.update({'changed': False})
+
+    module.exit_json(**result)
+
+
+def query_api(module, names, queries, groups, members):
+    """Answers the questions with the transitive membership methods.
+
+    Args:
+        module: AnsibleModule, the ansible module.
+        names: dict, the resource names of the groups, by group as given.
+        queries: list, the (member, group) pairs to check.
+        groups: list, the groups to list the members of.
+        members: list, the members to list the groups of.
+
+    Returns:
+        dict, the answers, None when the methods are not available.
+    """
+    concurrency = module.params['concurrency']
+    checks = run_concurrently(lambda query: check_membership(module, query[0], names[query[1]]), queries, concurrency)
+    if None in checks:
+        return None
+    memberships = run_concurrently(lambda group: search_members(module, names[group]), groups, concurrency)
+    if None in memberships:
+        return None
+    relations = run_concurrently(lambda member: search_groups(module, member), members, concurrency)
+    if None in relations:
+        return None
+    return {
+        'queries': [
+            {'member': member, 'group': group, 'is_member': is_member}
+            for (member, group), is_member in zip(queries, checks)
+        ],
+        'group_members': dict(
+            (group, sorted(
+                ({'member': item['preferredMemberKey'][0]['id'], 'relation': item.get('relationType')} for item in items),
+                key=lambda item: item['member']
+            ))
+            for group, items in zip(groups, memberships)
+        ),
+        'member_groups': dict(
+            (member, sorted(
+                ({'group': item['groupKey']['id'], 'name': item['group'], 'relation': item.get('relationType')} for item in items),
+                key=lambda item: item['group']
+            ))
+            for member, items in zip(members, relations)
+        ),
+        'source': 'api'
+    }
+
+
+def query_graph(module, names, queries, groups, members):
+    """Answers the questions from the graph of the groups.
+
+    Args:
+        module: AnsibleModule, the ansible module.
+        names: dict, the resource names of the groups, by group as given.
+        queries: list, the (member, group) pairs to check.
+        groups: list, the groups to list the members of.
+        members: list, the members to list the groups of.
+
+    Returns:
+        dict, the answers.
+    """
+    starts = [names[group] for member, group in queries] + [names[group] for group in groups]
+    known = {}
+    if members:
+        if not module.params['customer']:
+            module.fail_json(msg='customer is required to find the groups of members from the graph of the groups')
+        known = list_groups(module)
+        starts.extend(sorted(known.values()))
+    memberships, emails = crawl(module, starts, known)
+    graph_names = dict((email, name) for name, email in emails.items())
+
+    relations = dict(
+        (names[group], transitive_members(memberships, graph_names, names[group]))
+        for group in set([group for member, group in queries] + groups)
+    )
+    parents = parent_groups(memberships)
+    return {
+        'queries': [
+            {'member': member, 'group': group, 'is_member': member in relations[names[group]]}
+            for member, group in queries
+        ],
+        'group_members': dict(
+            (group, [{'member': member, 'relation': relation} for member, relation in sorted(relations[names[group]].items())])
+            for group in groups
+        ),
+        'member_groups': dict(
+            (member, sorted(
+                ({'group': emails.get(name), 'name': name, 'relation': relation}
+                 for name, relation in transitive_groups(parents, emails, member).items()),
+                key=lambda item: item['group'] or item['name']
+            ))
+            for member in members
+        ),
+        'source': 'graph'
+    }
+
+
+def crawl(module, starts, known):
+    """Lists the direct members of groups, level by level through the nested groups.
+
+    Args:
+        module: AnsibleModule, the ansible module.
+        starts: list, the resource names of the groups to start from.
+        known: dict, the groups whose names are already known, by email.
+
+    Returns:
+        tuple, the direct members of every group reached, by name, and the emails of the groups, by name.
+    """
+    cache = DiskCache(MEMBERSHIPS_NAMESPACE, module.params['cache_ttl'])
+    names = dict(known)
+    memberships = {}
+    frontier = sorted(set(starts))
+    while frontier:
+        found = cache.lookup(frontier)
+        missing = [name for name in frontier if name not in found]
+        listings = run_concurrently(lambda name: list_members(module, name), missing, module.params['concurrency'])
+        cache.store(dict(zip(missing, listings)))
+        found.update(zip(missing, listings))
+        memberships.update(found)
+        nested = set(member for name in frontier for member, kind in found[name] if kind == GROUP)
+        names.update(lookup_groups(module, sorted(nested - set(names))))
+        frontier = sorted(set(names[email] for email in nested if names[email]) - set(memberships))
+    return memberships, dict((name, email) for email, name in names.items() if name)
+
+
+def resolve(module, groups):
+    """Returns the resource names of groups given by email or resource name.
+
+    Args:
+        module: AnsibleModule, the ansible module.
+        groups: list, the groups, by email or resource name.
+
+    Returns:
+        dict, the resource names of the groups, by group as given.
+    """
+    emails = sorted(set(group for group in groups if not group.startswith('groups/')))
+    names = lookup_groups(module, emails)
+    unknown = [email for email in emails if not names.get(email)]
+    if unknown:
+        module.fail_json(msg='Groups not found: %s' % ', '.join(unknown))
+    return dict((group, names.get(group, group)) for group in groups)
+
+
+def lookup_groups(module, emails):
+    """Returns the resource names of groups, cached on disk since they never change.
+
+    Args:
+        module: AnsibleModule, the ansible module.
+        emails: list, the emails of the groups.
+
+    Returns:
+        dict, the resource names of the groups, by email, None for the groups not found.
+    """
+    cache = DiskCache(NAMES_NAMESPACE, module.params['cache_ttl'])
+    names = cache.lookup(emails)
+    missing = [email for email in emails if email not in names]
+    found = dict(zip(missing, run_concurrently(lambda email: lookup_group(module, email), missing, module.params['concurrency'])))
+    cache.store(dict((email, name) for email, name in found.items() if name))
+    names.update(found)
+    return names
+
+
+def lookup_group(module, email):
+    auth = GcpSession(module, 'cloudidentity')
+    group = return_if_object(module, auth.full_get('%s/groups:lookup' % API, params={'groupKey.id': email}), allow_not_found=True)['result']
+    return group['name'] if group else None
+
+
+def list_groups(module):
+    """Returns the groups of the customer, storing their names on disk along the way.
+
+    Args:
+        module: AnsibleModule, the ansible module.
+
+    Returns:
+        dict, the resource names of the groups, by email.
+    """
+    auth = GcpSession(module, 'cloudidentity')
+    groups = auth.list(
+        '%s/groups' % API,
+        return_if_object,
+        params={'parent': module.params['customer'], 'pageSize': PAGE_SIZE},
+        array_name='groups'
+    )
+    names = dict((group['groupKey']['id'].lower(), group['name']) for group in groups)
+    DiskCache(NAMES_NAMESPACE, module.params['cache_ttl']).store(names)
+    return names
+
+
+def list_members(module, name):
+    auth = GcpSession(module, 'cloudidentity')
+    memberships = auth.list(
+        '%s/%s/memberships' % (API, name),
+        return_if_object,
+        params={'pageSize': PAGE_SIZE},
+        array_name='memberships'
+    )
+    return [[membership['preferredMemberKey']['id'].lower(), membership.get('type')] for membership in memberships]
+
+
+def transitive_get(module, url, params):
+    """Calls a transitive membership method.
+
+    Args:
+        module: AnsibleModule, the ansible module.
+        url: str, the URL of the method.
+        params: dict, the query parameters.
+
+    Returns:
+        dict, the response, None when the method is not available and may be replaced by the graph of the groups.
+    """
+    auth = GcpSession(module, 'cloudidentity')
+    response = auth.full_get(url, params=params)
+    if response.status_code in UNAVAILABLE and module.params['mode'] == 'auto':
+        return None
+    return return_if_object(module, response)['result']
+
+
+def transitive_search(module, url, params):
+    """Gets every page of a transitive membership search.
+
+    Args:
+        module: AnsibleModule, the ansible module.
+        url: str, the URL of the search.
+        params: dict, the query parameters.
+
+    Returns:
+        list, the memberships found, None when the method is not available.
+    """
+    params = dict(params, pageSize=SEARCH_PAGE_SIZE)
+    items = []
+    while True:
+        page = transitive_get(module, url, params)
+        if page is None:
+            return None
+        items.extend(page.get('memberships', []))
+        if not page.get('nextPageToken'):
+            return items
+        params['pageToken'] = page['nextPageToken']
+
+
+def check_membership(module, member, name):
+    response = transitive_get(module, '%s/%s/memberships:checkTransitiveMembership' % (API, name), {'query': member_query(member)})
+    return None if response is None else bool(response.get('hasMembership'))
+
+
+def search_members(module, name):
+    return transitive_search(module, '%s/%s/memberships:searchTransitiveMemberships' % (API, name), {})
+
+
+def search_groups(module, member):
+    query = "%s && '%s' in labels" % (member_query(member), DISCUSSION_FORUM)
+    return transitive_search(module, '%s/groups/-/memberships:searchTransitiveGroups' % API, {'query': query})
+
+
+def member_query(member):
+    return "member_key_id == '%s'" % member
+
+
+if __name__ == '__main__':
+    main()
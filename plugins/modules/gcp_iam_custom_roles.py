@@ -0,0 +1,385 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright: Raphaël de Gail
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+################################################################################
+# Documentation
+################################################################################
+
+ANSIBLE_METADATA = {'metadata_version': '1.1', 'status': ["preview"], 'supported_by': 'community'}
+
+DOCUMENTATION = '''
+---
+module: gcp_iam_custom_roles
+description:
+- Manages many custom roles across organizations and projects at once.
+- The custom roles of every organization and project are listed once, deleted ones included, the
+  organizations and projects in parallel. Then only the missing roles are created, the changed ones
+  patched with their changed fields, the deleted ones undeleted and the extra ones deleted, in parallel.
+- The included permissions are compared as sets, regardless of their order.
+short_description: Manages many GCP custom roles
+extends_documentation_fragment:
+- raphaeldegail.googlecloudy.gcp
+options:
+  state:
+    description:
+    - Whether the given roles should exist in GCP.
+    choices:
+    - present
+    - absent
+    default: present
+    type: str
+  roles:
+    description:
+    - The custom roles.
+    required: true
+    type: list
+    elements: dict
+    suboptions:
+      organization_id:
+        description:
+        - The ID of the organization hosting the role.
+        - Exactly one of I(organization_id) or I(project_id) is required.
+        type: str
+      project_id:
+        description:
+        - The ID of the project hosting the role.
+        type: str
+      name:
+        description:
+        - The name of the role.
+        required: true
+        type: str
+      title:
+        description:
+        - A human-readable title for the role. Typically this is limited to 100 UTF-8 bytes.
+        type: str
+      description:
+        description:
+        - Human-readable description for the role.
+        type: str
+      included_permissions:
+        description:
+        - Names of permissions this role grants when bound in an IAM policy.
+        type: list
+        elements: str
+      stage:
+        description:
+        - The current launch stage of the role.
+        choices:
+        - ALPHA
+        - BETA
+        - GA
+        - DEPRECATED
+        - DISABLED
+        - EAP
+        type: str
+  exclusive:
+    description:
+    - Whether the custom roles of the given organizations and projects which are not declared should be deleted.
+    - Only applies when I(state=present).
+    default: false
+    type: bool
+  validate_permissions:
+    description:
+    - Whether the included permissions should be checked against the permissions custom roles
+      of their organization or project support, before any change.
+    - The catalog of the permissions is read with permissions.queryTestablePermissions and cached on disk
+      for I(cache_ttl) seconds.
+    default: false
+    type: bool
+  cache_ttl:
+    description:
+    - The time, in seconds, during which the cached catalog of permissions is used.
+    - 0 reads the catalog on every run.
+    default: 86400
+    type: int
+  concurrency:
+    description:
+    - The maximum number of parallel requests.
+    default: 10
+    type: int
+'''
+
+EXAMPLES = '''
+- name: Manages the custom roles of two organizations and a project
+  raphaeldegail.googlecloudy.gcp_iam_custom_roles:
+    roles:
+    - organization_id: "1234"
+      name: bucketReader
+      title: Bucket reader
+      included_permissions:
+      - storage.buckets.get
+      - storage.buckets.list
+    - organization_id: "5678"
+      name: bucketReader
+      title: Bucket reader
+      included_permissions:
+      - storage.buckets.get
+      - storage.buckets.list
+    - project_id: tokyo-rain-123
+      name: deployer
+      title: Deployer
+      included_permissions:
+      - run.services.update
+    validate_permissions: true
+    auth_kind: serviceaccount
+    service_account_file: "/tmp/auth.pem"
+'''
+
+RETURN = '''
+roles:
+  description:
+  - The result of every declared or deleted role.
+  returned: success
+  type: list
+  elements: dict
+  contains:
+    parent:
+      description:
+      - The organization or project hosting the role, like organizations/1234 or projects/tokyo-rain-123.
+      returned: success
+      type: str
+    name:
+      description:
+      - The name of the role.
+      returned: success
+      type: str
+    action:
+      description:
+      - The change made to the role, C(create), C(undelete), C(update) or C(delete), or null when unchanged.
+      - An undeleted role which differs from its declaration is also patched.
+      returned: success
+      type: str
+    update_mask:
+      description:
+      - The fields patched, when the role is updated.
+      returned: when the role is updated
+      type: str
+    permission_changes:
+      description:
+      - The number of permissions added to and removed from the role.
+      returned: success
+      type: dict
+    role:
+      description:
+      - The role, as returned by the API.
+      - Empty for a role absent and not created.
+      returned: success
+      type: dict
+'''
+
+API = 'https://iam.googleapis.com/v1'
+
+# The largest page size accepted by roles.list.
+ROLES_PAGE_SIZE = 1000
+
+# The module options and the fields of the role they set, apart from the permissions.
+FIELDS = (
+    ('title', 'title'),
+    ('description', 'description'),
+    ('stage', 'stage'),
+)
+
+################################################################################
+# Imports
+################################################################################
+
+from ansible_collections.raphaeldegail.googlecloudy.plugins.module_utils.gcp_utils import (
+    return_if_object,
+    run_concurrently,
+    update_mask,
+    GcpSession,
+    GcpModule,
+    DEFAULT_CONCURRENCY
+)
+from ansible_collections.raphaeldegail.googlecloudy.plugins.module_utils.gcp_iam import (
+    permission_catalog,
+    permission_changes
+)
+
+################################################################################
+# Main
+################################################################################
+
+
+def main():
+    """Main function"""
+
+    module = GcpModule(
+        argument_spec=dict(
+            state=dict(default='present', choices=['present', 'absent'], type='str'),
+            roles=dict(required=True, type='list', elements='dict', options=dict(
+                organization_id=dict(type='str'),
+                project_id=dict(type='str'),
+                name=dict(required=True, type='str'),
+                title=dict(type='str'),
+                description=dict(type='str'),
+                included_permissions=dict(type='list', elements='str'),
+                stage=dict(choices=['ALPHA', 'BETA', 'GA', 'DEPRECATED', 'DISABLED', 'EAP'], type='str')
+            ), mutually_exclusive=[('organization_id', 'project_id')], required_one_of=[('organization_id', 'project_id')]),
+            exclusive=dict(default=False, type='bool'),
+            validate_permissions=dict(default=False, type='bool'),
+            cache_ttl=dict(default=86400, type='int'),
+            concurrency=dict(default=DEFAULT_CONCURRENCY, type='int')
+        ),
+        supports_check_mode=True
+    )
+
+    if not module.params['scopes']:
+        module.params['scopes'] = ['https://www.googleapis.com/auth/iam']
+
+    concurrency = module.params['concurrency']
+    declared = {}
+    for role in module.params['roles']:
+        declared.setdefault(parent(role), {})[role['name']] = role
+
+    parents = sorted(declared)
+    if module.params['state'] == 'present' and module.params['validate_permissions']:
+        catalogs = run_concurrently(lambda name: permission_catalog(module, name, module.params['cache_ttl']), parents, concurrency)
+        validate(module, declared, dict(zip(parents, catalogs)))
+    listings = run_concurrently(lambda name: list_roles(module, name), parents, concurrency)
+
+    results = []
+    for name, existing in zip(parents, listings):
+        results.extend(plan(module, name, declared[name], existing))
+
+    if not module.check_mode:
+        changes = [result for result in results if result['action']]
+        roles = run_concurrently(lambda result: apply(module, result), changes, concurrency)
+        for result, role in zip(changes, roles):
+            result['role'] = role
+    for result in results:
+        result.pop('request', None)
+
+    result = {'roles': results}
+    result.update({'changed': any(role['action'] for role in results)})
+
+    module.exit_json(**result)
+
+
+def parent(role):
+    if role['organization_id']:
+        return 'organizations/%s' % role['organization_id']
+    return 'projects/%s' % role['project_id']
+
+
+def validate(module, declared, catalogs):
+    """Fails when declared roles include permissions their parent does not support in custom roles.
+
+    Args:
+        module: AnsibleModule, the ansible module.
+        declared: dict, the declared roles, by parent then by name.
+        catalogs: dict, the permissions supported in custom roles, by parent.
+    """
+    errors = []
+    for name, roles in sorted(declared.items()):
+        for role_id, role in sorted(roles.items()):
+            unsupported = sorted(set(role['included_permissions'] or []) - catalogs[name])
+            if unsupported:
+                errors.append('%s/roles/%s: %s' % (name, role_id, ', '.join(unsupported)))
+    if errors:
+        module.fail_json(msg='Permissions not supported in custom roles: %s' % '; '.join(errors))
+
+
+def plan(module, name, declared, existing):
+    """Diffs the declared roles of an organization or a project with the existing ones.
+
+    Args:
+        module: AnsibleModule, the ansible module.
+        name: str, the resource name of the organization or project.
+        declared: dict, the declared roles, by name.
+        existing: list, the custom roles of the organization or project, deleted ones included.
+
+    Returns:
+        list, the result of every role, with the action to apply.
+    """
+    existing = dict((role['name'].split('/')[-1], role) for role in existing)
+    results = []
+    for role_id, role in sorted(declared.items()):
+        current = existing.get(role_id)
+        result = {'parent': name, 'name': role_id, 'action': None, 'role': current or {}}
+        added, removed = [], []
+        if module.params['state'] == 'absent':
+            if current and not current.get('deleted'):
+                result['action'] = 'delete'
+                removed = current.get('includedPermissions', [])
+        elif not current:
+            result.update({'action': 'create', 'request': resource_to_request(role)})
+            added = sorted(set(role['included_permissions'] or []))
+        else:
+            request = resource_to_request(role)
+            # The permissions are compared as sets, the other fields as they are.
+            mask = update_mask(dict((field, value) for field, value in request.items() if field != 'includedPermissions'), current)
+            if role['included_permissions'] is not None:
+                added, removed = permission_changes(role['included_permissions'], current.get('includedPermissions'))
+            if added or removed:
+                mask.append('includedPermissions')
+            if current.get('deleted'):
+                result['action'] = 'undelete'
+            elif mask:
+                result['action'] = 'update'
+            if mask:
+                result.update({'update_mask': ','.join(mask), 'request': request})
+        result['permission_changes'] = {'added': len(added), 'removed': len(removed)}
+        results.append(result)
+    if module.params['state'] == 'present' and module.params['exclusive']:
+        results.extend(
+            {'parent': name, 'name': role_id, 'action': 'delete', 'role': role,
+             'permission_changes': {'added': 0, 'removed': len(role.get('includedPermissions', []))}}
+            for role_id, role in sorted(existing.items())
+            if role_id not in declared and not role.get('deleted')
+        )
+    return results
+
+
+def apply(module, result):
+    """Applies the action planned for a role.
+
+    Args:
+        module: AnsibleModule, the ansible module.
+        result: dict, the result of the role, holding the action and its request.
+
+    Returns:
+        dict, the role after the action.
+    """
+    link = '%s/%s/roles/%s' % (API, result['parent'], result['name'])
+    auth = GcpSession(module, 'iam')
+    if result['action'] == 'create':
+        response = auth.post('%s/%s/roles' % (API, result['parent']), {'roleId': result['name'], 'role': result['request']})
+    elif result['action'] == 'delete':
+        response = auth.delete(link)
+    else:
+        if result['action'] == 'undelete':
+            role = return_if_object(module, auth.post('%s:undelete' % link, {'etag': result['role'].get('etag')}))['result']
+            if not result.get('update_mask'):
+                return role
+        response = auth.patch(link, result['request'], params={'updateMask': result['update_mask']})
+    return return_if_object(module, response)['result']
+
+
+def list_roles(module, name):
+    auth = GcpSession(module, 'iam')
+    return auth.list(
+        '%s/%s/roles' % (API, name),
+        return_if_object,
+        params={'view': 'FULL', 'showDeleted': 'true', 'pageSize': ROLES_PAGE_SIZE},
+        array_name='roles'
+    )
+
+
+def resource_to_request(role):
+    request = dict((field, role[option]) for option, field in FIELDS if role[option] is not None)
+    if role['included_permissions'] is not None:
+        request['includedPermissions'] = sorted(set(role['included_permissions']))
+    return request
+
+
+if __name__ == '__main__':
+    main()
@@ -24,6 +24,7 @@ module: gcp_iam_organization_role
 description:
 - Manages a Role in an organization.
 - A role in the Identity and Access Management API.
+- The included permissions are compared as sets, regardless of their order.
 short_description: Manages a Role in a GCP organization
 extends_documentation_fragment:
 - raphaeldegail.googlecloudy.gcp
@@ -75,6 +76,20 @@ options:
     - The Google Cloud Platform organization for the role.
     required: True
     type: str
+  validate_permissions:
+    description:
+    - Whether the included permissions should be checked against the permissions custom roles
+      of the organization support, before any change.
+    - The catalog of the permissions is read with permissions.queryTestablePermissions and cached on disk
+      for I(cache_ttl) seconds.
+    default: false
+    type: bool
+  cache_ttl:
+    description:
+    - The time, in seconds, during which the cached catalog of permissions is used.
+    - 0 reads the catalog on every run.
+    default: 86400
+    type: int
 '''
 
 EXAMPLES = '''
@@ -126,6 +141,22 @@ deleted:
   - The current deleted state of the role.
   returned: success
   type: bool
+permission_changes:
+  description:
+  - The number of permissions added to and removed from the role.
+  returned: success
+  type: dict
+  contains:
+    added:
+      description:
+      - The number of permissions added.
+      returned: success
+      type: int
+    removed:
+      description:
+      - The number of permissions removed.
+      returned: success
+      type: int
 '''
 
 API = 'https://iam.googleapis.com/v1'
@@ -142,6 +173,10 @@ from ansible_collections.raphaeldegail.googlecloudy.plugins.module_utils.gcp_uti
     GcpSession,
     GcpModule
 )
+from ansible_collections.raphaeldegail.googlecloudy.plugins.module_utils.gcp_iam import (
+    permission_catalog,
+    permission_changes
+)
 
 ################################################################################
 # Main
@@ -160,6 +195,8 @@ def main():
             included_permissions=dict(type="list", elements="str"),
             stage=dict(choices=["ALPHA", "BETA", "GA", "DEPRECATED", "DISABLED", "EAP"], type="str"),
             organization_id=dict(required=True, type="str"),
+            validate_permissions=dict(default=False, type="bool"),
+            cache_ttl=dict(default=86400, type="int"),
         )
     )
 
@@ -168,19 +205,27 @@ def main():
 
     state = module.params["state"]
 
+    if state == "present" and module.params["validate_permissions"] and module.params["included_permissions"]:
+        catalog = permission_catalog(module, "organizations/%s" % module.params["organization_id"], module.params["cache_ttl"])
+        unsupported = sorted(set(module.params["included_permissions"]) - catalog)
+        if unsupported:
+            module.fail_json(msg="Permissions not supported in custom roles: %s" % ", ".join(unsupported))
+
     fetch = fetch_resource(module, self_link(module), True)['result']
     changed = False
     difference = None
+    added, removed = [], []
 
     if fetch:
-        difference = list_differences(resource_to_request(module), response_to_hash(fetch))
+        difference = list_differences(resource_to_request(module, False), response_to_hash(fetch))
+        if module.params["included_permissions"] is not None:
+            added, removed = permission_changes(module.params["included_permissions"], fetch.get("includedPermissions"))
         if state == "present":
             if fetch.get("deleted"):
-                undelete(module, self_link(module), fetch["etag"])
+                fetch = undelete(module, self_link(module), fetch["etag"])
                 changed = True
-            elif difference:
-                update(module, self_link(module), difference)
-                fetch = fetch_resource(module, self_link(module))['result']
+            elif difference or added or removed:
+                fetch = update(module, self_link(module), difference, added or removed)
                 changed = True
         elif not fetch.get("deleted"):
             delete(module, self_link(module))
@@ -195,6 +240,7 @@ def main():
 
     fetch.update({"changed": changed})
     fetch.update({'diff': difference} if difference else {})
+    fetch.update({"permission_changes": {"added": len(added), "removed": len(removed)}})
 
     module.exit_json(**fetch)
 
@@ -204,10 +250,10 @@ def create(module, link):
     return return_if_object(module, auth.post(link, resource_to_create(module)))['result']
 
 
-def update(module, link, difference):
+def update(module, link, difference, permissions_changed):
     auth = GcpSession(module, "iam")
     params = {
-        "updateMask": updateMask(difference)
+        "updateMask": updateMask(difference, permissions_changed)
     }
     request = resource_to_request(module)
     del request["name"]
@@ -226,20 +272,23 @@ def undelete(module, link, etag):
     }))['result']
 
 
-def updateMask(difference):
-    update_mask = []
-    update_mask = list(set(difference.get('remove', {}).keys()) | set(difference.get('add', {}).keys()))
-    return ",".join(update_mask)
+def updateMask(difference, permissions_changed):
+    update_mask = set(difference.get('remove', {}).keys()) | set(difference.get('add', {}).keys())
+    if permissions_changed:
+        update_mask.add("includedPermissions")
+    return ",".join(sorted(update_mask))
 
 
-def resource_to_request(module):
+def resource_to_request(module, permissions=True):
     request = {
         "name": module.params.get("name"),
         "title": module.params.get("title"),
         "description": module.params.get("description"),
-        "includedPermissions": module.params.get("included_permissions"),
         "stage": module.params.get("stage"),
     }
+    # The permissions are compared as sets, apart from the other fields.
+    if permissions and module.params.get("included_permissions") is not None:
+        request["includedPermissions"] = sorted(set(module.params["included_permissions"]))
     return remove_nones(request)
 
 
@@ -252,13 +301,12 @@ def resource_to_create(module):
 # Remove unnecessary properties from the response.
 # This is for doing comparisons with Ansible's current parameters.
 def response_to_hash(response):
-    return {
+    return remove_nones({
         "name": response.get("name", '').split("/")[-1],
         "title": response.get("title"),
         "description": response.get("description"),
-        "includedPermissions": response.get("includedPermissions"),
         "stage": response.get("stage")
-    }
+    })
 
 
 def self_link(module):
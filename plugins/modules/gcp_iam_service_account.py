@@ -40,9 +40,20 @@ options:
     type: str
   display_name:
     description:
-    - User specified description of service account.
+    - User specified display name of the service account.
     required: false
     type: str
+  description:
+    description:
+    - User specified description of the service account.
+    required: false
+    type: str
+  disabled:
+    description:
+    - Whether the service account is disabled.
+    - Left unchanged when omitted.
+    required: false
+    type: bool
   project_id:
     description:
     - The resource ID of the project hosting the service account.
@@ -53,9 +64,10 @@ options:
 
 EXAMPLES = '''
 - name: Manages a GCP service account
-  raphaeldegail.googlecloudy.gcp_iam_service_account_info:
+  raphaeldegail.googlecloudy.gcp_iam_service_account:
     name: my-service-account
     display_name: My Service Account
+    description: Deploys the applications
     project_id: tokyo-rain-123
     auth_kind: serviceaccount
     service_account_file: "/tmp/auth.pem"
@@ -121,6 +133,7 @@ from ansible_collections.raphaeldegail.googlecloudy.plugins.module_utils.gcp_uti
     list_differences,
     remove_nones,
     fetch_resource,
+    update_mask,
     GcpSession,
     GcpModule
 )
@@ -138,6 +151,8 @@ def main():
             state=dict(default='present', choices=['present', 'absent'], type='str'),
             name=dict(type='str'),
             display_name=dict(type='str'),
+            description=dict(type='str'),
+            disabled=dict(type='bool'),
             project_id=dict(required=True, type='str')
         ),
         supports_check_mode=True
@@ -153,13 +168,12 @@ def main():
     difference = None
 
     if fetch:
-        difference = list_differences(resource_to_request(module), response_to_hash(fetch))
+        difference = list_differences(resource_to_request(module), response_to_hash(module, fetch))
         if state == 'present':
             if difference:
                 if module.check_mode:
                     module.exit_json(changed=False, before=fetch, action='update', diff=difference)
-                update(module, self_link(module))
-                fetch = fetch_resource(module, self_link(module), False)['result']
+                fetch = update(module, fetch)
                 changed = True
         else:
             if module.check_mode:
@@ -172,6 +186,8 @@ def main():
             if module.check_mode:
                 module.exit_json(changed=False, before=fetch, action='create')
             fetch = create(module, collection(module))
+            if module.params['disabled']:
+                fetch = set_disabled(module, fetch)
             changed = True
         else:
             if module.check_mode:
@@ -186,12 +202,38 @@ def main():
 
 def create(module, link):
     auth = GcpSession(module, 'iam')
-    return return_if_object(module, auth.post(link, encode_request(resource_to_request(module))), err_path=['error', 'errors'])['result']
-
-
-def update(module, link):
+    request = resource_to_request(module)
+    request.pop('disabled', None)
+    return return_if_object(module, auth.post(link, encode_request(request)), err_path=['error', 'errors'])['result']
+
+
+def update(module, fetch):
+    """Patches the changed fields of the service account, then enables or disables it.
+
+    Args:
+        module: AnsibleModule, the ansible module.
+        fetch: dict, the service account.
+
+    Returns:
+        dict, the service account after the update.
+    """
+    request = resource_to_request(module)
+    mask = update_mask(dict((field, request[field]) for field in ('displayName', 'description') if field in request), fetch)
+    if mask:
+        auth = GcpSession(module, 'iam')
+        body = {'serviceAccount': dict((field, request[field]) for field in mask), 'updateMask': ','.join(mask)}
+        fetch = return_if_object(module, auth.patch(self_link(module), body), err_path=['error', 'errors'])['result']
+    if 'disabled' in request and request['disabled'] != fetch.get('disabled', False):
+        fetch = set_disabled(module, fetch)
+    return fetch
+
+
+def set_disabled(module, fetch):
+    """Enables or disables the service account, as declared."""
     auth = GcpSession(module, 'iam')
-    return return_if_object(module, auth.put(link, resource_to_request(module)), err_path=['error', 'errors'])['result']
+    verb = 'disable' if module.params['disabled'] else 'enable'
+    return_if_object(module, auth.post('%s:%s' % (self_link(module), verb)), err_path=['error', 'errors'])
+    return dict(fetch, disabled=module.params['disabled'])
 
 
 def delete(module, link):
@@ -202,19 +244,25 @@ def delete(module, link):
 def resource_to_request(module):
     request = {
         'name': module.params.get('name'),
-        'displayName': module.params.get('display_name')
+        'displayName': module.params.get('display_name'),
+        'description': module.params.get('description'),
+        'disabled': module.params.get('disabled')
     }
     return remove_nones(request)
 
 
 # Remove unnecessary properties from the response.
 # This is for doing comparisons with Ansible's current parameters.
-def response_to_hash(response):
+# The fields left undeclared are not managed, and thus not compared.
+def response_to_hash(module, response):
     result = {
         'name': response.get('name', '').split('/')[-1].split('@')[0],
-        'displayName': response.get('displayName'),
+        'displayName': response.get('displayName', ''),
+        'description': response.get('description', ''),
+        'disabled': response.get('disabled', False),
     }
-    return remove_nones(result)
+    request = resource_to_request(module)
+    return remove_nones(dict((key, value) for key, value in result.items() if key in request))
 
 
 def encode_request(resource_request):
@@ -126,6 +126,9 @@ from ansible_collections.raphaeldegail.googlecloudy.plugins.module_utils.gcp_uti
     GcpSession,
     GcpModule
 )
+from ansible_collections.raphaeldegail.googlecloudy.plugins.module_utils.gcp_cache import (
+    PolicyJournal
+)
 
 ################################################################################
 # Main
@@ -156,6 +159,7 @@ def main():
                 )
             ),
             policy_version=dict(default="1", choices=["1", "2", "3"], type='str'),
+            journal_ttl=dict(default=0, type='int'),
             service_account_id=dict(required=True, type='str'),
             project_id=dict(required=True, type='str')
         )
@@ -164,6 +168,13 @@ def main():
     if not module.params['scopes']:
         module.params['scopes'] = ['https://www.googleapis.com/auth/cloud-platform']
 
+    journal = PolicyJournal(self_link(module), resource_to_request(module), module.params['journal_ttl'])
+    etag = journal.unchanged(lambda: get(module, self_link(module), fields='etag').get('etag'))
+    if etag:
+        result = dict(resource_to_request(module)['policy'], etag=etag)
+        result.update({'changed': False})
+        module.exit_json(**result)
+
     fetch = get(module, self_link(module))
     changed = False
 
@@ -173,13 +184,15 @@ def main():
         fetch = get(module, self_link(module))
         changed = True
 
+    journal.record(fetch.get('etag'))
+
     fetch.update({'changed': changed})
     fetch.update({'diff': difference} if difference else {})
 
     module.exit_json(**fetch)
 
 
-def get(module, link):
+def get(module, link, fields=None):
     auth = GcpSession(module, 'iam')
     return return_if_object(
         module,
@@ -189,7 +202,8 @@ def get(module, link):
                 'options': {
                     'requestedPolicyVersion': module.params['policy_version']
                 }
-            }
+            },
+            params={'fields': fields} if fields else None
         ),
         allow_not_found=False
     )['result']
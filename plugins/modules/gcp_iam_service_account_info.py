@@ -20,6 +20,8 @@ module: gcp_iam_service_account_info
 description:
 - Gets a service account information.
 - A service account is an account for an application or a virtual machine (VM) instance, not a person.
+- Without I(name), lists the service accounts of one or many projects instead. The projects are listed
+  in parallel, page by page, and the accounts filtered by name as they are read.
 short_description: Gets a GCP service account information
 extends_documentation_fragment:
 - raphaeldegail.googlecloudy.gcp
@@ -28,14 +30,50 @@ options:
     description:
     - The name of the service account.
     - For example, my-service-account.
+    - Requires I(project_id). When omitted, the service accounts of the projects are listed.
     required: false
     type: str
   project_id:
     description:
     - The resource ID of the project hosting the service account.
     - For example, tokyo-rain-123.
-    required: true
+    - One of I(project_id) or I(projects) is required.
+    required: false
+    type: str
+  projects:
+    description:
+    - The resource IDs of the projects whose service accounts are listed, along with I(project_id).
+    required: false
+    type: list
+    elements: str
+  name_prefix:
+    description:
+    - When listing, only returns the service accounts whose name starts with this prefix.
+    required: false
+    type: str
+  name_regex:
+    description:
+    - When listing, only returns the service accounts whose name matches this regular expression.
+    - The expression is searched from the start of the name.
+    required: false
     type: str
+  fields:
+    description:
+    - When listing, the fields of the service accounts to return, such as email or displayName.
+    - All the fields are returned by default.
+    required: false
+    type: list
+    elements: str
+  page_size:
+    description:
+    - The number of service accounts read per request when listing.
+    default: 100
+    type: int
+  concurrency:
+    description:
+    - The maximum number of projects listed in parallel.
+    default: 10
+    type: int
 '''
 
 EXAMPLES = '''
@@ -45,6 +83,18 @@ EXAMPLES = '''
     project_id: tokyo-rain-123
     auth_kind: serviceaccount
     service_account_file: "/tmp/auth.pem"
+
+- name: Lists the deployment service accounts of projects
+  raphaeldegail.googlecloudy.gcp_iam_service_account_info:
+    projects:
+    - tokyo-rain-123
+    - paris-sun-456
+    name_prefix: deploy-
+    fields:
+    - email
+    - disabled
+    auth_kind: serviceaccount
+    service_account_file: "/tmp/auth.pem"
 '''
 
 RETURN = '''
@@ -93,6 +143,18 @@ disabled:
   - Whether the service account is disabled.
   returned: success
   type: bool
+accounts:
+  description:
+  - The service accounts listed, with the selected fields.
+  - The fields above are returned for a single account, when I(name) is given.
+  returned: when I(name) is omitted
+  type: list
+  elements: dict
+count:
+  description:
+  - The number of service accounts listed.
+  returned: when I(name) is omitted
+  type: int
 '''
 
 API = 'https://iam.googleapis.com/v1'
@@ -101,9 +163,15 @@ API = 'https://iam.googleapis.com/v1'
 # Imports
 ################################################################################
 
+import re
+
 from ansible_collections.raphaeldegail.googlecloudy.plugins.module_utils.gcp_utils import (
+    return_if_object,
     fetch_resource,
-    GcpModule
+    run_concurrently,
+    GcpSession,
+    GcpModule,
+    DEFAULT_CONCURRENCY
 )
 
 ################################################################################
@@ -115,13 +183,35 @@ def main():
     """Main function"""
 
     module = GcpModule(
-        argument_spec=dict(name=dict(type='str'), project_id=dict(required=True, type='str')),
+        argument_spec=dict(
+            name=dict(type='str'),
+            project_id=dict(type='str'),
+            projects=dict(type='list', elements='str'),
+            name_prefix=dict(type='str'),
+            name_regex=dict(type='str'),
+            fields=dict(type='list', elements='str'),
+            page_size=dict(default=100, type='int'),
+            concurrency=dict(default=DEFAULT_CONCURRENCY, type='int')
+        ),
+        required_one_of=[['project_id', 'projects']],
+        required_by={'name': 'project_id'},
         supports_check_mode=True
     )
 
     if not module.params['scopes']:
         module.params['scopes'] = ['https://www.googleapis.com/auth/iam']
 
+    if not module.params['name']:
+        projects = [module.params['project_id']] if module.params['project_id'] else []
+        projects = list(dict.fromkeys(projects + (module.params['projects'] or [])))
+        try:
+            pattern = re.compile(module.params['name_regex']) if module.params['name_regex'] else None
+        except re.error as e:
+            module.fail_json(msg='Invalid name_regex: %s' % e)
+        listings = run_concurrently(lambda project: list(list_accounts(module, project, pattern)), projects, module.params['concurrency'])
+        accounts = [account for listing in listings for account in listing]
+        module.exit_json(accounts=accounts, count=len(accounts), changed=False)
+
     result = fetch_resource(module, self_link(module), True)
     fetch = result['result']
     changed = False
@@ -134,9 +224,40 @@ def main():
     module.exit_json(**fetch)
 
 
+def list_accounts(module, project, pattern=None):
+    """Iterates over the service accounts of a project matching the name filters.
+
+    Args:
+        module: AnsibleModule, the ansible module.
+        project: str, the project ID.
+        pattern: re.Pattern, the expression the names must match.
+
+    Returns:
+        generator, the service accounts, read one page at a time.
+    """
+    auth = GcpSession(module, 'iam')
+    prefix = module.params['name_prefix'] or ''
+    fields = module.params['fields']
+    params = {'pageSize': module.params['page_size']}
+    if fields:
+        # The email holds the name the filters apply to.
+        params['fields'] = 'nextPageToken,accounts(%s)' % ','.join(sorted(set(fields) | set(['email'])))
+    for account in auth.iterate(collection(project), return_if_object, params=params, array_name='accounts'):
+        name = account['email'].split('@')[0]
+        if not name.startswith(prefix) or (pattern and not pattern.match(name)):
+            continue
+        if fields and 'email' not in fields:
+            del account['email']
+        yield account
+
+
 def self_link(module):
     return "{api}/projects/{project_id}/serviceAccounts/{name}@{project_id}.iam.gserviceaccount.com".format(api=API, **module.params)
 
 
+def collection(project):
+    return "{api}/projects/{project}/serviceAccounts".format(api=API, project=project)
+
+
 if __name__ == '__main__':
     main()
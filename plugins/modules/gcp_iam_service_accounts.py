@@ -0,0 +1,314 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright: Raphaël de Gail
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+################################################################################
+# Documentation
+################################################################################
+
+ANSIBLE_METADATA = {'metadata_version': '1.1', 'status': ["preview"], 'supported_by': 'community'}
+
+DOCUMENTATION = '''
+---
+module: gcp_iam_service_accounts
+description:
+- Manages many service accounts across projects at once.
+- The service accounts of every project are listed once, the projects in parallel, then only the missing
+  accounts are created, the changed ones patched and the extra ones deleted, in parallel.
+short_description: Manages many GCP service accounts
+extends_documentation_fragment:
+- raphaeldegail.googlecloudy.gcp
+options:
+  state:
+    description:
+    - Whether the given service accounts should exist in GCP
+    choices:
+    - present
+    - absent
+    default: present
+    type: str
+  accounts:
+    description:
+    - The service accounts.
+    required: true
+    type: list
+    elements: dict
+    suboptions:
+      project_id:
+        description:
+        - The resource ID of the project hosting the service account.
+        - For example, tokyo-rain-123.
+        required: true
+        type: str
+      name:
+        description:
+        - The name of the service account.
+        - For example, my-service-account.
+        required: true
+        type: str
+      display_name:
+        description:
+        - User specified display name of the service account.
+        - Left unchanged when omitted.
+        type: str
+      description:
+        description:
+        - User specified description of the service account.
+        - Left unchanged when omitted.
+        type: str
+  exclusive:
+    description:
+    - Whether the service accounts of the given projects which are not declared should be deleted.
+    - Only applies when I(state=present).
+    - Only the user-managed service accounts, whose email ends with @PROJECT_ID.iam.gserviceaccount.com, are deleted.
+    default: false
+    type: bool
+  concurrency:
+    description:
+    - The maximum number of parallel requests.
+    default: 10
+    type: int
+'''
+
+EXAMPLES = '''
+- name: Manages the service accounts of two projects
+  raphaeldegail.googlecloudy.gcp_iam_service_accounts:
+    accounts:
+    - project_id: tokyo-rain-123
+      name: deployer
+      display_name: Deployer
+    - project_id: tokyo-rain-123
+      name: reader
+      description: Reads the buckets of the project
+    - project_id: paris-sun-456
+      name: deployer
+      display_name: Deployer
+    auth_kind: serviceaccount
+    service_account_file: "/tmp/auth.pem"
+'''
+
+RETURN = '''
+accounts:
+  description:
+  - The result of every declared or deleted service account.
+  returned: success
+  type: list
+  elements: dict
+  contains:
+    project_id:
+      description:
+      - The resource ID of the project hosting the service account.
+      returned: success
+      type: str
+    name:
+      description:
+      - The name of the service account.
+      returned: success
+      type: str
+    action:
+      description:
+      - The change made to the service account, C(create), C(update) or C(delete), or null when unchanged.
+      returned: success
+      type: str
+    update_mask:
+      description:
+      - The fields patched, when the service account is updated.
+      returned: when the service account is updated
+      type: str
+    account:
+      description:
+      - The service account, as returned by the API. Deleted accounts are returned as they were.
+      - Empty for an account absent and not created.
+      returned: success
+      type: dict
+'''
+
+API = 'https://iam.googleapis.com/v1'
+
+# The largest page size accepted by serviceAccounts.list.
+SERVICE_ACCOUNTS_PAGE_SIZE = 100
+
+# The module options and the fields of the service account they set.
+FIELDS = (
+    ('display_name', 'displayName'),
+    ('description', 'description'),
+)
+
+################################################################################
+# Imports
+################################################################################
+
+from ansible_collections.raphaeldegail.googlecloudy.plugins.module_utils.gcp_utils import (
+    return_if_object,
+    run_concurrently,
+    update_mask,
+    GcpSession,
+    GcpModule,
+    DEFAULT_CONCURRENCY
+)
+
+################################################################################
+# Main
+################################################################################
+
+
+def main():
+    """Main function"""
+
+    module = GcpModule(
+        argument_spec=dict(
+            state=dict(default='present', choices=['present', 'absent'], type='str'),
+            accounts=dict(required=True, type='list', elements='dict', options=dict(
+                project_id=dict(required=True, type='str'),
+                name=dict(required=True, type='str'),
+                display_name=dict(type='str'),
+                description=dict(type='str')
+            )),
+            exclusive=dict(default=False, type='bool'),
+            concurrency=dict(default=DEFAULT_CONCURRENCY, type='int')
+        ),
+        supports_check_mode=True
+    )
+
+    if not module.params['scopes']:
+        module.params['scopes'] = ['https://www.googleapis.com/auth/iam']
+
+    concurrency = module.params['concurrency']
+    declared = {}
+    for account in module.params['accounts']:
+        declared.setdefault(account['project_id'], {})[account['name']] = account
+
+    projects = sorted(declared)
+    listings = run_concurrently(lambda project: list_accounts(module, project), projects, concurrency)
+
+    results = []
+    for project, existing in zip(projects, listings):
+        results.extend(plan(module, project, declared[project], existing))
+
+    if not module.check_mode:
+        changes = [result for result in results if result['action']]
+        accounts = run_concurrently(lambda result: apply(module, result), changes, concurrency)
+        for result, account in zip(changes, accounts):
+            result['account'] = account
+    for result in results:
+        result.pop('request', None)
+
+    result = {'accounts': results}
+    result.update({'changed': any(account['action'] for account in results)})
+
+    module.exit_json(**result)
+
+
+def account_id(account):
+    return account['email'].split('@')[0]
+
+
+def plan(module, project, declared, existing):
+    """Diffs the declared service accounts of a project with the existing ones.
+
+    Args:
+        module: AnsibleModule, the ansible module.
+        project: str, the project ID.
+        declared: dict, the declared accounts, by name.
+        existing: list, the service accounts of the project.
+
+    Returns:
+        list, the result of every account, with the action to apply.
+    """
+    existing = dict((account_id(account), account) for account in existing)
+    results = []
+    for name, account in sorted(declared.items()):
+        current = existing.get(name)
+        result = {'project_id': project, 'name': name, 'action': None, 'account': current or {}}
+        if module.params['state'] == 'absent':
+            if current:
+                result['action'] = 'delete'
+        elif not current:
+            result.update({'action': 'create', 'request': resource_to_request(account)})
+        else:
+            request = resource_to_request(account)
+            mask = ','.join(update_mask(request, current))
+            if mask:
+                result.update({'action': 'update', 'update_mask': mask, 'request': request})
+        results.append(result)
+    if module.params['state'] == 'present' and module.params['exclusive']:
+        user_managed = '@%s.iam.gserviceaccount.com' % project
+        results.extend(
+            {'project_id': project, 'name': name, 'action': 'delete', 'account': account}
+            for name, account in sorted(existing.items())
+            if name not in declared and account['email'].endswith(user_managed)
+        )
+    return results
+
+
+def apply(module, result):
+    """Applies the action planned for a service account.
+
+    Args:
+        module: AnsibleModule, the ansible module.
+        result: dict, the result of the account, holding the action and its request.
+
+    Returns:
+        dict, the service account after the action.
+    """
+    if result['action'] == 'create':
+        return create(module, result['project_id'], result['name'], result['request'])
+    if result['action'] == 'update':
+        return update(module, result['account'], result['request'], result['update_mask'])
+    delete(module, result['account'])
+    return result['account']
+
+
+def list_accounts(module, project):
+    auth = GcpSession(module, 'iam')
+    return auth.list(
+        collection(project),
+        return_if_object,
+        params={'pageSize': SERVICE_ACCOUNTS_PAGE_SIZE},
+        array_name='accounts'
+    )
+
+
+def create(module, project, name, request):
+    auth = GcpSession(module, 'iam')
+    return return_if_object(
+        module,
+        auth.post(collection(project), {'accountId': name, 'serviceAccount': request}),
+        err_path=['error', 'errors']
+    )['result']
+
+
+def update(module, account, request, mask):
+    auth = GcpSession(module, 'iam')
+    return return_if_object(
+        module,
+        auth.patch(self_link(account), {'serviceAccount': request, 'updateMask': mask}),
+        err_path=['error', 'errors']
+    )['result']
+
+
+def delete(module, account):
+    auth = GcpSession(module, 'iam')
+    return return_if_object(module, auth.delete(self_link(account)), err_path=['error', 'errors'])['result']
+
+
+def resource_to_request(account):
+    return dict((field, account[option]) for option, field in FIELDS if account[option] is not None)
+
+
+def self_link(account):
+    return "{api}/{name}".format(api=API, name=account['name'])
+
+
+def collection(project):
+    return "{api}/projects/{project}/serviceAccounts".format(api=API, project=project)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,353 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright: Raphaël de Gail
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+################################################################################
+# Documentation
+################################################################################
+
+ANSIBLE_METADATA = {'metadata_version': '1.1', 'status': ["preview"], 'supported_by': 'community'}
+
+DOCUMENTATION = '''
+---
+module: gcp_iam_service_accounts_iam
+description:
+- Grants or revokes the same bindings on the access control policies of many service accounts.
+- The policies are read in parallel and compared role by role and condition by condition, then only
+  the changed policies are set, in parallel, each along with the etag it was read with.
+- A policy modified by someone else in the meantime is read and merged again.
+short_description: Sets bindings on the policies of many GCP service accounts
+extends_documentation_fragment:
+- raphaeldegail.googlecloudy.gcp
+- raphaeldegail.googlecloudy.gcp.iam
+options:
+  project_id:
+    description:
+    - The resource ID of the project hosting the service accounts.
+    - For example, tokyo-rain-123.
+    required: true
+    type: str
+  service_account_ids:
+    description:
+    - The names or emails of the service accounts.
+    - All the service accounts of the project matching I(name_prefix) and I(name_regex) by default.
+    type: list
+    elements: str
+  name_prefix:
+    description:
+    - Without I(service_account_ids), only applies to the service accounts whose name starts with this prefix.
+    type: str
+  name_regex:
+    description:
+    - Without I(service_account_ids), only applies to the service accounts whose name matches this regular expression.
+    type: str
+  state:
+    description:
+    - Whether the members of the bindings should be granted or revoked their roles.
+    choices:
+    - present
+    - absent
+    default: present
+    type: str
+  exclusive:
+    description:
+    - Whether the policies should hold exactly the given bindings, the other bindings being removed.
+    - Only applies when I(state=present).
+    default: false
+    type: bool
+  concurrency:
+    description:
+    - The maximum number of parallel requests.
+    default: 10
+    type: int
+'''
+
+EXAMPLES = '''
+- name: Lets the CI pipelines impersonate the deployment service accounts
+  raphaeldegail.googlecloudy.gcp_iam_service_accounts_iam:
+    project_id: tokyo-rain-123
+    name_prefix: deploy-
+    bindings:
+    - role: roles/iam.workloadIdentityUser
+      members:
+      - principalSet://iam.googleapis.com/projects/123/locations/global/workloadIdentityPools/ci/*
+    auth_kind: serviceaccount
+    service_account_file: "/tmp/auth.pem"
+'''
+
+RETURN = '''
+accounts:
+  description:
+  - The result of every service account.
+  returned: success
+  type: list
+  elements: dict
+  contains:
+    service_account:
+      description:
+      - The email of the service account.
+      returned: success
+      type: str
+    changed:
+      description:
+      - Whether the policy of the service account was set.
+      returned: success
+      type: bool
+    added:
+      description:
+      - The members granted each role, by role.
+      returned: success
+      type: dict
+    removed:
+      description:
+      - The members revoked each role, by role.
+      returned: success
+      type: dict
+    etag:
+      description:
+      - The etag of the policy once set, or as read when unchanged.
+      returned: success
+      type: str
+'''
+
+API = 'https://iam.googleapis.com/v1'
+
+# The attempts at setting a policy modified concurrently.
+SET_ATTEMPTS = 3
+
+################################################################################
+# Imports
+################################################################################
+
+import json
+import re
+
+from ansible_collections.raphaeldegail.googlecloudy.plugins.module_utils.gcp_utils import (
+    return_if_object,
+    remove_nones,
+    run_concurrently,
+    GcpSession,
+    GcpModule,
+    DEFAULT_CONCURRENCY
+)
+from ansible_collections.raphaeldegail.googlecloudy.plugins.module_utils.gcp_resourcemanager import (
+    get_iam_policy
+)
+from ansible_collections.raphaeldegail.googlecloudy.plugins.module_utils.gcp_cache import (
+    PolicyJournal
+)
+
+################################################################################
+# Main
+################################################################################
+
+
+def main():
+    """Main function"""
+
+    module = GcpModule(
+        argument_spec=dict(
+            bindings=dict(
+                required=True,
+                type='list',
+                elements='dict',
+                options=dict(
+                    role=dict(required=True, type='str'),
+                    members=dict(required=True, type='list', elements='str'),
+                    condition=dict(
+                        type='dict',
+                        options=dict(
+                            expression=dict(required=True, type='str'),
+                            title=dict(type='str'),
+                            description=dict(type='str'),
+                            location=dict(type='str')
+                        )
+                    )
+                )
+            ),
+            policy_version=dict(default="1", choices=["1", "2", "3"], type='str'),
+            journal_ttl=dict(default=0, type='int'),
+            project_id=dict(required=True, type='str'),
+            service_account_ids=dict(type='list', elements='str'),
+            name_prefix=dict(type='str'),
+            name_regex=dict(type='str'),
+            state=dict(default='present', choices=['present', 'absent'], type='str'),
+            exclusive=dict(default=False, type='bool'),
+            concurrency=dict(default=DEFAULT_CONCURRENCY, type='int')
+        ),
+        supports_check_mode=True
+    )
+
+    if not module.params['scopes']:
+        module.params['scopes'] = ['https://www.googleapis.com/auth/cloud-platform']
+
+    declared = canonical(remove_nones(module.params['bindings']))
+    accounts = service_accounts(module)
+    results = run_concurrently(lambda account: converge(module, account, declared), accounts, module.params['concurrency'])
+
+    result = {'accounts': results}
+    result.update({'changed': any(account['changed'] for account in results)})
+
+    module.exit_json(**result)
+
+
+def service_accounts(module):
+    """Returns the emails of the service accounts to apply the bindings to.
+
+    Args:
+        module: AnsibleModule, the ansible module.
+
+    Returns:
+        list, the emails of the service accounts.
+    """
+    project = module.params['project_id']
+    if module.params['service_account_ids'] is not None:
+        return list(dict.fromkeys(
+            account if '@' in account else '%s@%s.iam.gserviceaccount.com' % (account, project)
+            for account in module.params['service_account_ids']
+        ))
+    try:
+        pattern = re.compile(module.params['name_regex'] or '')
+    except re.error as e:
+        module.fail_json(msg='Invalid name_regex: %s' % e)
+    prefix = module.params['name_prefix'] or ''
+    auth = GcpSession(module, 'iam')
+    emails = (
+        account['email'] for account in auth.iterate(
+            collection(module),
+            return_if_object,
+            params={'pageSize': 100, 'fields': 'nextPageToken,accounts(email)'},
+            array_name='accounts'
+        )
+    )
+    return [
+        email for email in emails
+        if email.split('@')[0].startswith(prefix) and pattern.match(email.split('@')[0])
+    ]
+
+
+def canonical(bindings):
+    """Returns the members of bindings by role and condition.
+
+    Args:
+        bindings: list, the bindings of a policy.
+
+    Returns:
+        dict, the set of members by (role, condition) pair, the condition as a JSON string.
+    """
+    model = {}
+    for binding in bindings or []:
+        condition = json.dumps(binding['condition'], sort_keys=True) if binding.get('condition') else None
+        model.setdefault((binding['role'], condition), set()).update(binding.get('members', []))
+    return model
+
+
+def merge(module, current, declared):
+    """Returns the policy model once the declared bindings are applied.
+
+    Args:
+        module: AnsibleModule, the ansible module.
+        current: dict, the model of the current policy.
+        declared: dict, the model of the declared bindings.
+
+    Returns:
+        dict, the model of the desired policy.
+    """
+    if module.params['state'] == 'present' and module.params['exclusive']:
+        return dict((key, set(members)) for key, members in declared.items())
+    desired = dict((key, set(members)) for key, members in current.items())
+    for key, members in declared.items():
+        if module.params['state'] == 'present':
+            desired.setdefault(key, set()).update(members)
+        elif key in desired:
+            desired[key] -= members
+    return dict((key, members) for key, members in desired.items() if members)
+
+
+def to_bindings(model):
+    bindings = []
+    for (role, condition), members in sorted(model.items(), key=lambda item: (item[0][0], item[0][1] or '')):
+        binding = {'role': role, 'members': sorted(members)}
+        if condition:
+            binding['condition'] = json.loads(condition)
+        bindings.append(binding)
+    return bindings
+
+
+def changes(before, after):
+    """Returns the members added to and removed from each role."""
+    added, removed = {}, {}
+    for key in set(before) | set(after):
+        role = key[0]
+        for member in sorted(after.get(key, set()) - before.get(key, set())):
+            added.setdefault(role, []).append(member)
+        for member in sorted(before.get(key, set()) - after.get(key, set())):
+            removed.setdefault(role, []).append(member)
+    return added, removed
+
+
+def converge(module, account, declared):
+    """Applies the declared bindings to the policy of a service account.
+
+    Args:
+        module: AnsibleModule, the ansible module.
+        account: str, the email of the service account.
+        declared: dict, the model of the declared bindings.
+
+    Returns:
+        dict, the result of the service account.
+    """
+    resource = 'projects/%s/serviceAccounts/%s' % (module.params['project_id'], account)
+    journal = PolicyJournal('%s/%s' % (API, resource), {
+        'bindings': to_bindings(declared),
+        'state': module.params['state'],
+        'exclusive': module.params['exclusive'],
+        'version': module.params['policy_version']
+    }, module.params['journal_ttl'])
+    etag = journal.unchanged(lambda: get_iam_policy(module, resource, fields='etag').get('etag'))
+    if etag:
+        return {'service_account': account, 'changed': False, 'added': {}, 'removed': {}, 'etag': etag}
+
+    for attempt in range(SET_ATTEMPTS):
+        policy = get_iam_policy(module, resource)
+        current = canonical(policy.get('bindings'))
+        desired = merge(module, current, declared)
+        added, removed = changes(current, desired)
+        result = {'service_account': account, 'changed': bool(added or removed), 'added': added, 'removed': removed}
+        if not result['changed'] or module.check_mode:
+            if not result['changed']:
+                journal.record(policy.get('etag'))
+            return dict(result, etag=policy.get('etag'))
+        response = set_policy(module, resource, desired, policy.get('etag'))
+        # The etag no longer matches: the policy was modified since it was read.
+        if response.status_code != 409:
+            etag = return_if_object(module, response)['result'].get('etag')
+            journal.record(etag)
+            return dict(result, etag=etag)
+    module.fail_json(msg='The policy of %s kept being modified concurrently' % account)
+
+
+def set_policy(module, resource, model, etag):
+    bindings = to_bindings(model)
+    conditional = any('condition' in binding for binding in bindings)
+    policy = {
+        'version': 3 if conditional else int(module.params['policy_version']),
+        'bindings': bindings,
+        'etag': etag
+    }
+    auth = GcpSession(module, 'iam')
+    return auth.post('%s/%s:setIamPolicy' % (API, resource), {'policy': remove_nones(policy), 'updateMask': 'bindings,etag'})
+
+
+def collection(module):
+    return "{api}/projects/{project_id}/serviceAccounts".format(api=API, **module.params)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,487 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright: Raphaël de Gail
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+################################################################################
+# Documentation
+################################################################################
+
+ANSIBLE_METADATA = {'metadata_version': '1.1', 'status': ["preview"], 'supported_by': 'community'}
+
+DOCUMENTATION = '''
+---
+module: gcp_iam_workload_identity_pool_providers
+description:
+- Manages a workload identity pool along with all its providers.
+- The providers of the pool are listed once, deleted ones included, then the missing providers are created,
+  the changed ones patched with only their changed fields and the deleted ones undeleted.
+- All the requests are sent before waiting for their operations, which are then waited for together.
+short_description: Manages a GCP workload identity pool and its providers
+extends_documentation_fragment:
+- raphaeldegail.googlecloudy.gcp
+options:
+  state:
+    description:
+    - Whether the pool should exist in GCP.
+    - Deleting the pool deletes its providers.
+    choices:
+    - present
+    - absent
+    default: present
+    type: str
+  name:
+    description:
+    - The name of the pool.
+    - For example, demo-pool.
+    required: true
+    type: str
+  display_name:
+    description:
+    - A display name for the pool.
+    - Cannot exceed 32 characters.
+    type: str
+  description:
+    description:
+    - A description of the pool.
+    - Cannot exceed 256 characters.
+    default: ''
+    type: str
+  disabled:
+    description:
+    - Whether the pool is disabled.
+    default: False
+    type: bool
+  project_id:
+    description:
+    - The resource ID of the project hosting the pool.
+    - For example, tokyo-rain-123.
+    required: true
+    type: str
+  providers:
+    description:
+    - The providers of the pool.
+    default: []
+    type: list
+    elements: dict
+    suboptions:
+      name:
+        description:
+        - The name of the provider.
+        - For example, some-provider.
+        required: true
+        type: str
+      display_name:
+        description:
+        - A display name for the provider.
+        - Cannot exceed 32 characters.
+        type: str
+      description:
+        description:
+        - A description for the provider.
+        - Cannot exceed 256 characters.
+        default: ''
+        type: str
+      disabled:
+        description:
+        - Whether the provider is disabled.
+        default: False
+        type: bool
+      attribute_mapping:
+        description:
+        - Maps attributes from the credentials issued by the external identity provider to Google Cloud attributes.
+        - For OIDC providers, the mapping must include the google.subject attribute.
+        type: dict
+      attribute_condition:
+        description:
+        - A Common Expression Language expression restricting the credentials accepted.
+        type: str
+      oidc:
+        description:
+        - An OpenId Connect 1.0 identity provider.
+        - One of I(oidc), I(aws) or I(saml) is required.
+        type: dict
+        suboptions:
+          issuer_uri:
+            description:
+            - The OIDC issuer URL.
+            - Must be an HTTPS endpoint.
+            required: true
+            type: str
+          allowed_audiences:
+            description:
+            - Acceptable values for the aud field (audience) in the OIDC token.
+            type: list
+            elements: str
+          jwks_json:
+            description:
+            - OIDC JWKs in JSON String format.
+            type: str
+      aws:
+        description:
+        - An Amazon Web Services identity provider.
+        type: dict
+        suboptions:
+          account_id:
+            description:
+            - The AWS account ID.
+            required: true
+            type: str
+      saml:
+        description:
+        - A SAML identity provider.
+        type: dict
+        suboptions:
+          idp_metadata_xml:
+            description:
+            - SAML identity provider configuration metadata xml doc.
+            required: true
+            type: str
+  exclusive:
+    description:
+    - Whether the providers of the pool which are not declared should be deleted.
+    default: false
+    type: bool
+  concurrency:
+    description:
+    - The maximum number of parallel requests.
+    default: 10
+    type: int
+'''
+
+EXAMPLES = '''
+- name: Manages the pool of the CI systems
+  raphaeldegail.googlecloudy.gcp_iam_workload_identity_pool_providers:
+    name: ci
+    display_name: CI systems
+    project_id: tokyo-rain-123
+    providers:
+    - name: github
+      attribute_mapping:
+        google.subject: assertion.sub
+        attribute.repository: assertion.repository
+      attribute_condition: assertion.repository_owner == 'my-org'
+      oidc:
+        issuer_uri: https://token.actions.githubusercontent.com
+    - name: gitlab
+      attribute_mapping:
+        google.subject: assertion.sub
+      oidc:
+        issuer_uri: https://gitlab.com
+        allowed_audiences:
+        - https://gitlab.com
+    - name: aws
+      aws:
+        account_id: '123456789012'
+    exclusive: true
+    auth_kind: serviceaccount
+    service_account_file: "/tmp/auth.pem"
+'''
+
+RETURN = '''
+pool:
+  description:
+  - The pool, as returned by the API.
+  returned: success
+  type: dict
+action:
+  description:
+  - The change made to the pool, C(create), C(undelete), C(update) or C(delete), or null when unchanged.
+  returned: success
+  type: str
+providers:
+  description:
+  - The result of every declared or deleted provider.
+  returned: success
+  type: list
+  elements: dict
+  contains:
+    name:
+      description:
+      - The name of the provider.
+      returned: success
+      type: str
+    action:
+      description:
+      - The change made to the provider, C(create), C(undelete), C(update) or C(delete), or null when unchanged.
+      returned: success
+      type: str
+    update_mask:
+      description:
+      - The fields patched, when the provider is updated.
+      returned: when the provider is updated
+      type: str
+    provider:
+      description:
+      - The provider, as returned by the API.
+      returned: success
+      type: dict
+'''
+
+ACTIVE = "ACTIVE"
+
+DELETED = "DELETED"
+
+API = 'https://iam.googleapis.com/v1'
+
+PROVIDERS_PAGE_SIZE = 100
+
+# The fields holding maps, replaced as a whole by a patch.
+MAPS = ('attributeMapping',)
+
+################################################################################
+# Imports
+################################################################################
+
+from ansible_collections.raphaeldegail.googlecloudy.plugins.module_utils.gcp_utils import (
+    return_if_object,
+    fetch_resource,
+    remove_nones,
+    run_concurrently,
+    update_mask,
+    wait_for_operation,
+    GcpSession,
+    GcpModule,
+    DEFAULT_CONCURRENCY
+)
+
+################################################################################
+# Main
+################################################################################
+
+
+def main():
+    """Main function"""
+
+    module = GcpModule(
+        argument_spec=dict(
+            state=dict(default='present', choices=['present', 'absent'], type='str'),
+            name=dict(required=True, type='str'),
+            display_name=dict(type='str'),
+            description=dict(default='', type='str'),
+            disabled=dict(default=False, type='bool'),
+            project_id=dict(required=True, type='str'),
+            providers=dict(default=[], type='list', elements='dict', options=dict(
+                name=dict(required=True, type='str'),
+                display_name=dict(type='str'),
+                description=dict(default='', type='str'),
+                disabled=dict(default=False, type='bool'),
+                attribute_mapping=dict(type='dict'),
+                attribute_condition=dict(type='str'),
+                oidc=dict(type='dict', options=dict(
+                    issuer_uri=dict(required=True, type='str'),
+                    allowed_audiences=dict(type='list', elements='str'),
+                    jwks_json=dict(type='str')
+                )),
+                aws=dict(type='dict', options=dict(
+                    account_id=dict(required=True, type='str')
+                )),
+                saml=dict(type='dict', options=dict(
+                    idp_metadata_xml=dict(required=True, type='str')
+                ))
+            ), mutually_exclusive=[('oidc', 'aws', 'saml')], required_one_of=[('oidc', 'aws', 'saml')]),
+            exclusive=dict(default=False, type='bool'),
+            concurrency=dict(default=DEFAULT_CONCURRENCY, type='int')
+        ),
+        supports_check_mode=True
+    )
+
+    if not module.params['scopes']:
+        module.params['scopes'] = ['https://www.googleapis.com/auth/iam']
+
+    pool = fetch_resource(module, self_link(module), True)['result'] or {}
+    if module.params['state'] == 'absent':
+        action = 'delete' if pool.get('state') == ACTIVE else None
+        if action and not module.check_mode:
+            wait_for_operation(module, GcpSession(module, 'iam').delete(self_link(module)), api=API)
+        module.exit_json(pool=pool, action=action, providers=[], changed=bool(action))
+
+    # The providers need their pool: a missing or deleted pool is restored first.
+    pool_request = resource_to_request(module.params)
+    action = None
+    if not pool:
+        action = 'create'
+        pool = {} if module.check_mode else create_pool(module, pool_request)
+    elif pool.get('state') == DELETED:
+        action = 'undelete'
+        if not module.check_mode:
+            pool = wait_for_operation(module, undelete(module, self_link(module)), api=API)
+
+    existing = {}
+    if action != 'create':
+        existing = dict((provider['name'].split('/')[-1], provider) for provider in list_providers(module))
+    results, retries = plan(module, existing)
+
+    requests = [lambda result=result: send(module, result) for result in results if result['action']]
+    mask = update_mask(pool_request, pool) if pool else []
+    if mask and action != 'create':
+        action = action or 'update'
+        requests.append(lambda: patch(module, self_link(module), pool_request, mask))
+
+    if not module.check_mode:
+        done = apply(module, requests)
+        for result, provider in zip([result for result in results if result['action']], done):
+            result['provider'] = provider
+        if mask and action != 'create':
+            pool = done[-1]
+        # Undeleted providers get their declared fields once restored.
+        updates = []
+        for result in retries:
+            result['update_mask'] = ','.join(update_mask(result['request'], result['provider'], MAPS))
+            if result['update_mask']:
+                updates.append(result)
+        for result, provider in zip(updates, apply(module, [lambda result=result: send(module, dict(result, action='update')) for result in updates])):
+            result['provider'] = provider
+
+    for result in results:
+        result.pop('request', None)
+
+    module.exit_json(pool=pool, action=action, providers=results, changed=bool(action or any(result['action'] for result in results)))
+
+
+def plan(module, existing):
+    """Diffs the declared providers with the existing ones.
+
+    Args:
+        module: AnsibleModule, the ansible module.
+        existing: dict, the providers of the pool, deleted ones included, by name.
+
+    Returns:
+        tuple, the result of every provider, with the action to apply, and the results of
+        the undeleted providers, to be updated once restored.
+    """
+    results, retries = [], []
+    declared = set()
+    for provider in module.params['providers']:
+        name = provider['name']
+        declared.add(name)
+        current = existing.get(name)
+        request = provider_to_request(provider)
+        result = {'name': name, 'action': None, 'provider': current or {}, 'request': request}
+        if not current:
+            result['action'] = 'create'
+        elif current.get('state') == DELETED:
+            result['action'] = 'undelete'
+            retries.append(result)
+        else:
+            mask = update_mask(request, current, MAPS)
+            if mask:
+                result.update({'action': 'update', 'update_mask': ','.join(mask)})
+        results.append(result)
+    if module.params['exclusive']:
+        results.extend(
+            {'name': name, 'action': 'delete', 'provider': provider}
+            for name, provider in sorted(existing.items())
+            if name not in declared and provider.get('state') == ACTIVE
+        )
+    return results, retries
+
+
+def apply(module, requests):
+    """Sends requests in parallel, then waits for all their operations.
+
+    Args:
+        module: AnsibleModule, the ansible module.
+        requests: list, the functions sending each request.
+
+    Returns:
+        list, the results of the operations.
+    """
+    concurrency = module.params['concurrency']
+    responses = run_concurrently(lambda request: request(), requests, concurrency)
+    return run_concurrently(lambda response: wait_for_operation(module, response, api=API), responses, concurrency)
+
+
+def send(module, result):
+    """Sends the request of the action planned for a provider.
+
+    Args:
+        module: AnsibleModule, the ansible module.
+        result: dict, the result of the provider, holding the action and its request.
+
+    Returns:
+        requests.Response, the operation response.
+    """
+    auth = GcpSession(module, 'iam')
+    link = provider_link(module, result['name'])
+    if result['action'] == 'create':
+        return auth.post(f'{self_link(module)}/providers?workloadIdentityPoolProviderId={result["name"]}', result['request'])
+    if result['action'] == 'undelete':
+        return undelete(module, link)
+    if result['action'] == 'update':
+        return auth.patch(f'{link}?updateMask={result["update_mask"]}', result['request'])
+    return auth.delete(link)
+
+
+def list_providers(module):
+    auth = GcpSession(module, 'iam')
+    return auth.list(
+        f'{self_link(module)}/providers',
+        return_if_object,
+        params={'showDeleted': 'true', 'pageSize': PROVIDERS_PAGE_SIZE},
+        array_name='workloadIdentityPoolProviders'
+    )
+
+
+def create_pool(module, request):
+    auth = GcpSession(module, 'iam')
+    return wait_for_operation(module, auth.post(f'{collection(module)}?workloadIdentityPoolId={module.params["name"]}', request), api=API)
+
+
+def patch(module, link, request, mask):
+    auth = GcpSession(module, 'iam')
+    return auth.patch(f'{link}?updateMask={",".join(mask)}', request)
+
+
+def undelete(module, link):
+    auth = GcpSession(module, 'iam')
+    return auth.post(f'{link}:undelete', {})
+
+
+def resource_to_request(params):
+    request = {
+        'displayName': params.get('display_name'),
+        'description': params.get('description'),
+        'disabled': params.get('disabled'),
+    }
+    return remove_nones(request)
+
+
+def provider_to_request(provider):
+    request = resource_to_request(provider)
+    request.update(remove_nones({
+        'attributeMapping': provider.get('attribute_mapping'),
+        'attributeCondition': provider.get('attribute_condition')
+    }))
+    if provider.get('oidc'):
+        request['oidc'] = remove_nones({
+            'issuerUri': provider['oidc'].get('issuer_uri'),
+            'allowedAudiences': provider['oidc'].get('allowed_audiences'),
+            'jwksJson': provider['oidc'].get('jwks_json')
+        })
+    if provider.get('aws'):
+        request['aws'] = {'accountId': provider['aws'].get('account_id')}
+    if provider.get('saml'):
+        request['saml'] = {'idpMetadataXml': provider['saml'].get('idp_metadata_xml')}
+    return request
+
+
+def provider_link(module, name):
+    return "{pool}/providers/{name}".format(pool=self_link(module), name=name)
+
+
+def self_link(module):
+    return "{api}/projects/{project_id}/locations/global/workloadIdentityPools/{name}".format(api=API, **module.params)
+
+
+def collection(module):
+    return "{api}/projects/{project_id}/locations/global/workloadIdentityPools".format(api=API, **module.params)
+
+
+if __name__ == '__main__':
+    main()
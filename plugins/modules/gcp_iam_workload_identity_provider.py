@@ -19,7 +19,8 @@ DOCUMENTATION = '''
 module: gcp_iam_workload_identity_provider
 description:
 - Manages a workload identity pool provider.
-- This sets the configuration for an external identity provider.
+- This sets the configuration for an external identity provider, either OpenID Connect, AWS or SAML.
+- Only the changed fields are patched, so that an unchanged identity provider configuration is not validated again.
 short_description: Manages a GCP workload identity pool provider
 extends_documentation_fragment:
 - raphaeldegail.googlecloudy.gcp
@@ -94,6 +95,27 @@ options:
         description:
         - OIDC JWKs in JSON String format.
         type: str
+  aws:
+    description:
+    - An Amazon Web Services identity provider.
+    type: dict
+    suboptions:
+      account_id:
+        description:
+        - The AWS account ID.
+        required: true
+        type: str
+  saml:
+    description:
+    - A SAML identity provider.
+    type: dict
+    suboptions:
+      idp_metadata_xml:
+        description:
+        - SAML identity provider configuration metadata xml doc.
+        - The xml document should comply with the SAML 2.0 specification.
+        required: true
+        type: str
   pool_name:
     description:
     - The resource name for the workload identity pool hosting the provider.
@@ -101,7 +123,8 @@ options:
     required: true
     type: str
 notes:
-- If 'state' is present, an OIDC provider should be provided.
+- If 'state' is present, one of I(oidc), I(aws) or I(saml) should be provided.
+- The type of an existing provider cannot be changed.
 '''
 
 EXAMPLES = '''
@@ -117,6 +140,16 @@ EXAMPLES = '''
     service_account_file: "/tmp/auth.pem"
     state: present
 
+- name: Creates a GCP workload identity pool provider for an AWS account
+  raphaeldegail.googlecloudy.gcp_iam_workload_identity_provider:
+    name: aws-provider
+    pool_name: projects/000/locations/global/workloadIdentityPools/sample-pool
+    aws:
+      account_id: '123456789012'
+    auth_kind: serviceaccount
+    service_account_file: "/tmp/auth.pem"
+    state: present
+
 - name: Deletes a GCP workload identity pool provider
   raphaeldegail.googlecloudy.gcp_iam_workload_identity_provider:
     name: sample-provider
@@ -193,12 +226,42 @@ oidc:
       - OIDC JWKs in JSON String format.
       returned: success
       type: str
+aws:
+  description:
+  - An Amazon Web Services identity provider.
+  returned: when the provider is an AWS provider
+  type: dict
+  contains:
+    accountId:
+      description:
+      - The AWS account ID.
+      returned: success
+      type: str
+saml:
+  description:
+  - A SAML identity provider.
+  returned: when the provider is a SAML provider
+  type: dict
+  contains:
+    idpMetadataXml:
+      description:
+      - SAML identity provider configuration metadata xml doc.
+      returned: success
+      type: str
+update_mask:
+  description:
+  - The fields patched, when the provider is updated.
+  returned: when the provider is updated
+  type: str
 '''
 
 ACTIVE = "ACTIVE"
 
 API = 'https://iam.googleapis.com/v1'
 
+# The fields holding maps, replaced as a whole by a patch.
+MAPS = ('attributeMapping',)
+
 ################################################################################
 # Imports
 ################################################################################
@@ -208,6 +271,7 @@ from ansible_collections.raphaeldegail.googlecloudy.plugins.module_utils.gcp_uti
     remove_nones,
     wait_for_operation,
     list_differences,
+    update_mask,
     GcpSession,
     GcpModule
 )
@@ -234,10 +298,19 @@ def main():
                 allowed_audiences=dict(type='list', elements='str'),
                 jwks_json=dict(type='str')
             )),
+            aws=dict(type='dict', options=dict(
+                account_id=dict(required=True, type='str')
+            )),
+            saml=dict(type='dict', options=dict(
+                idp_metadata_xml=dict(required=True, type='str')
+            )),
             pool_name=dict(required=True, type='str')
         ),
+        mutually_exclusive=[
+            ('oidc', 'aws', 'saml')
+        ],
         required_if=[
-            ('state', 'present', ('oidc', ), True)
+            ('state', 'present', ('oidc', 'aws', 'saml'), True)
         ]
     )
 
@@ -254,10 +327,11 @@ def main():
         if state == 'present':
             if fetch.get('state') == 'DELETED':
                 module.fail_json(msg='The resource is scheduled for deletion and will not be undeleted. %s' % fetch)
-            difference = list_differences(resource_to_request(module), response_to_hash(fetch))
-            if difference:
-                update(module, self_link(module))
-                fetch = fetch_resource(module, self_link(module), False)['result']
+            mask = ','.join(update_mask(resource_to_request(module), fetch, MAPS))
+            if mask:
+                difference = list_differences(resource_to_request(module), response_to_hash(fetch))
+                fetch = update(module, self_link(module), mask)
+                fetch.update({'update_mask': mask})
                 changed = True
         elif fetch.get('state') == ACTIVE:
             delete(module, self_link(module))
@@ -265,8 +339,7 @@ def main():
             changed = True
     else:
         if state == 'present':
-            create(module, collection(module))
-            fetch = fetch_resource(module, self_link(module), False)['result']
+            fetch = create(module, collection(module))
             changed = True
         else:
             fetch = {}
@@ -286,16 +359,9 @@ def create(module, link):
     )
 
 
-def update(module, link):
+def update(module, link, mask):
     auth = GcpSession(module, 'iam')
-    return wait_for_operation(
-        module,
-        auth.patch(
-            f'{link}?updateMask=displayName,description,disabled,attributeMapping,attributeCondition,oidc',
-            resource_to_request(module)
-        ),
-        api=API
-    )
+    return wait_for_operation(module, auth.patch(f'{link}?updateMask={mask}', resource_to_request(module)), api=API)
 
 
 def delete(module, link):
@@ -310,12 +376,17 @@ def resource_to_request(module):
         "disabled": module.params.get('disabled'),
         "attributeMapping": module.params.get('attribute_mapping'),
         "attributeCondition": module.params.get('attribute_condition'),
-        "oidc": {
-            "issuerUri": module.params.get('oidc').get('issuer_uri'),
-            "allowedAudiences": module.params.get('oidc').get('allowed_audiences'),
-            "jwksJson": module.params.get('oidc').get('jwks_json')
-        }
     }
+    if module.params.get('oidc'):
+        request['oidc'] = {
+            "issuerUri": module.params['oidc'].get('issuer_uri'),
+            "allowedAudiences": module.params['oidc'].get('allowed_audiences'),
+            "jwksJson": module.params['oidc'].get('jwks_json')
+        }
+    if module.params.get('aws'):
+        request['aws'] = {"accountId": module.params['aws'].get('account_id')}
+    if module.params.get('saml'):
+        request['saml'] = {"idpMetadataXml": module.params['saml'].get('idp_metadata_xml')}
     return remove_nones(request)
 
 
@@ -328,11 +399,9 @@ def response_to_hash(response):
         "disabled": response.get('disabled', False),
         "attributeMapping": response.get('attributeMapping'),
         "attributeCondition": response.get('attributeCondition'),
-        "oidc": {
-            "issuerUri": response.get('oidc', {}).get('issuerUri'),
-            "allowedAudiences": response.get('oidc', {}).get('allowedAudiences'),
-            "jwksJson": response.get('oidc', {}).get('jwksJson')
-        }
+        "oidc": response.get('oidc'),
+        "aws": response.get('aws'),
+        "saml": response.get('saml')
     }
     return remove_nones(result)
 
@@ -0,0 +1,209 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright: Raphaël de Gail
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+################################################################################
+# Documentation
+################################################################################
+
+ANSIBLE_METADATA = {'metadata_version': '1.1', 'status': ["preview"], 'supported_by': 'community'}
+
+DOCUMENTATION = '''
+---
+module: gcp_resourcemanager_effective_iam_info
+description:
+- Gets the roles granted to principals on projects, including the roles inherited from their folders and organization.
+- The ancestry of every project is read, then the IAM policy of every distinct ancestor is read once, in parallel.
+- The roles granted to a principal through C(allUsers) or C(allAuthenticatedUsers) are included, and so are
+  the roles granted to a user or a group through the C(domain:) of its email. Service accounts do not belong to
+  the domain of their email. The roles granted to the groups of a principal are not included.
+short_description: Gets the effective IAM roles on GCP projects
+extends_documentation_fragment:
+- raphaeldegail.googlecloudy.gcp
+options:
+  projects:
+    description:
+    - The IDs or numbers of the projects.
+    required: true
+    type: list
+    elements: str
+  members:
+    description:
+    - The principals to get the roles of, such as user:jane@example.com or serviceAccount:ci@demo.iam.gserviceaccount.com.
+    - All the principals of the policies are returned by default.
+    type: list
+    elements: str
+  concurrency:
+    description:
+    - The maximum number of parallel requests.
+    default: 10
+    type: int
+'''
+
+EXAMPLES = '''
+- name: Gets the roles of a user on projects
+  raphaeldegail.googlecloudy.gcp_resourcemanager_effective_iam_info:
+    projects:
+    - tokyo-rain-123
+    - paris-sun-456
+    members:
+    - user:jane@example.com
+    auth_kind: serviceaccount
+    service_account_file: "/tmp/auth.pem"
+  register: result
+- name: Lists the roles of the user on a project
+  ansible.builtin.debug:
+    msg: "{{ result.effective['tokyo-rain-123']['user:jane@example.com'] | map(attribute='role') }}"
+'''
+
+RETURN = '''
+effective:
+  description:
+  - The roles granted on each project, by project then by principal.
+  - Each grant holds the role, the resource whose policy grants it, the principal of the binding
+    and the condition of the binding, if any.
+  returned: success
+  type: dict
+  sample:
+    tokyo-rain-123:
+      user:jane@example.com:
+      - role: roles/viewer
+        resource: folders/5678
+        member: user:jane@example.com
+      - role: roles/browser
+        resource: organizations/1234
+        member: domain:example.com
+ancestry:
+  description:
+  - The resource names of each project and its ancestors, from the project up to the organization.
+  returned: success
+  type: dict
+'''
+
+################################################################################
+# Imports
+################################################################################
+
+from ansible_collections.raphaeldegail.googlecloudy.plugins.module_utils.gcp_utils import (
+    run_concurrently,
+    GcpModule,
+    DEFAULT_CONCURRENCY
+)
+from ansible_collections.raphaeldegail.googlecloudy.plugins.module_utils.gcp_resourcemanager import (
+    get_ancestry,
+    get_iam_policy
+)
+
+################################################################################
+# Main
+################################################################################
+
+
+def main():
+    """Main function"""
+
+    module = GcpModule(
+        argument_spec=dict(
+            projects=dict(required=True, type='list', elements='str'),
+            members=dict(type='list', elements='str'),
+            concurrency=dict(default=DEFAULT_CONCURRENCY, type='int')
+        ),
+        supports_check_mode=True
+    )
+
+    if not module.params['scopes']:
+        module.params['scopes'] = ['https://www.googleapis.com/auth/cloud-platform']
+
+    concurrency = module.params['concurrency']
+    projects = list(dict.fromkeys(module.params['projects']))
+    ancestries = run_concurrently(lambda project: get_ancestry(module, project), projects, concurrency)
+
+    # Projects sharing folders or an organization read their policies once.
+    resources = list(dict.fromkeys(resource for ancestry in ancestries for resource in ancestry))
+    policies = run_concurrently(lambda resource: get_iam_policy(module, resource), resources, concurrency)
+    index = index_grants(zip(resources, policies))
+
+    effective = {}
+    for project, ancestry in zip(projects, ancestries):
+        members = module.params['members']
+        if members is None:
+            members = sorted(set(member for resource in ancestry for member in index.get(resource, {})))
+        effective[project] = dict((member, resolve_member(index, ancestry, member)) for member in members)
+
+    result = {
+        'effective': effective,
+        'ancestry': dict(zip(projects, ancestries)),
+        'changed': False
+    }
+
+    module.exit_json(**result)
+
+
+def index_grants(policies):
+    """Indexes the bindings of policies by resource, then by principal.
+
+    Args:
+        policies: iterable, the resource names and their policies.
+
+    Returns:
+        dict, the grants by resource, then by principal.
+    """
+    index = {}
+    for resource, policy in policies:
+        grants = index.setdefault(resource, {})
+        for binding in policy.get('bindings', []):
+            for member in binding.get('members', []):
+                grant = {'role': binding['role'], 'resource': resource, 'member': member}
+                if binding.get('condition'):
+                    grant['condition'] = binding['condition']
+                grants.setdefault(member, []).append(grant)
+    return index
+
+
+def principals(member):
+    """Returns the principals whose bindings apply to a member.
+
+    Args:
+        member: str, the member, like user:jane@example.com.
+
+    Returns:
+        list, the member itself and the principals including it.
+    """
+    kind, _, identity = member.partition(':')
+    found = [member]
+    if kind in ('user', 'serviceAccount', 'group'):
+        found.append('allAuthenticatedUsers')
+        if kind != 'serviceAccount' and '@' in identity:
+            found.append('domain:%s' % identity.rpartition('@')[2])
+    if member != 'allUsers':
+        found.append('allUsers')
+    return found
+
+
+def resolve_member(index, ancestry, member):
+    """Returns the grants applying to a member on a project.
+
+    Args:
+        index: dict, the grants by resource, then by principal.
+        ancestry: list, the resource names of the project and its ancestors.
+        member: str, the member.
+
+    Returns:
+        list, the grants, from the project up to the organization.
+    """
+    return [
+        grant
+        for resource in ancestry
+        for principal in principals(member)
+        for grant in index.get(resource, {}).get(principal, [])
+    ]
+
+
+if __name__ == '__main__':
+    main()
@@ -35,7 +35,7 @@ options:
   parent:
     description:
     - The folder's parent's resource name.
-    required: true
+    - Required unless I(path) or I(folder_id) is given.
     type: str
   display_name:
     description:
@@ -45,7 +45,21 @@ options:
     - The display name must start and end with a letter or digit, may contain
       letters, digits, spaces, hyphens and underscores and can be no longer than 30 characters.
     - 'This is captured by the regular expression: [\\p{L}\\p{N}]([\\p{L}\\p{N}_- ]{0,28}[\\p{L}\\p{N}])?.'
-    required: true
+    - Required unless I(path) or I(folder_id) is given.
+    type: str
+  folder_id:
+    description:
+    - The ID of an existing folder, to manage it without looking it up from its parent and display name.
+    - For example, 1234 for folders/1234.
+    - Mutually exclusive with I(path).
+    type: str
+  path:
+    description:
+    - The path of the folder, made of its root organization or folder and the display names of the folders down to it.
+    - For example, organizations/1234/Platform/Prod/Data or folders/5678/Data.
+    - The missing folders along the path are created when I(state=present).
+    - Only the last folder of the path is deleted when I(state=absent).
+    - Mutually exclusive with I(parent), I(display_name) and I(folder_id).
     type: str
 '''
 
@@ -57,6 +71,20 @@ EXAMPLES = '''
     auth_kind: serviceaccount
     service_account_file: "/tmp/auth.pem"
     state: present
+
+- name: Creates a GCP folder along with its missing parent folders
+  raphaeldegail.googlecloudy.gcp_resourcemanager_folder:
+    path: organizations/1234/Platform/Prod/Data
+    auth_kind: serviceaccount
+    service_account_file: "/tmp/auth.pem"
+    state: present
+
+- name: Deletes a GCP folder known by its ID
+  raphaeldegail.googlecloudy.gcp_resourcemanager_folder:
+    folder_id: "5678"
+    auth_kind: serviceaccount
+    service_account_file: "/tmp/auth.pem"
+    state: absent
 '''
 
 RETURN = '''
@@ -110,8 +138,6 @@ etag:
   type: str
 '''
 
-ACTIVE = "ACTIVE"
-
 API = 'https://cloudresourcemanager.googleapis.com/v3'
 
 ################################################################################
@@ -126,6 +152,13 @@ from ansible_collections.raphaeldegail.googlecloudy.plugins.module_utils.gcp_uti
     GcpSession,
     GcpModule
 )
+from ansible_collections.raphaeldegail.googlecloudy.plugins.module_utils.gcp_resourcemanager import (
+    find_folder,
+    index_folder,
+    resolve_folder_path,
+    split_folder_path,
+    ACTIVE
+)
 
 ################################################################################
 # Main
@@ -138,9 +171,14 @@ def main():
     module = GcpModule(
         argument_spec=dict(
             state=dict(default='present', choices=['present', 'absent'], type='str'),
-            parent=dict(required=True, type='str'),
-            display_name=dict(required=True, type='str')
-        )
+            parent=dict(type='str'),
+            display_name=dict(type='str'),
+            folder_id=dict(type='str'),
+            path=dict(type='str')
+        ),
+        mutually_exclusive=[['path', 'parent'], ['path', 'display_name'], ['path', 'folder_id']],
+        required_one_of=[['path', 'parent', 'folder_id']],
+        required_together=[['parent', 'display_name']]
     )
 
     if not module.params['scopes']:
@@ -148,7 +186,12 @@ def main():
 
     state = module.params['state']
 
-    fetch = fetch_resource(module, collection(module))
+    if module.params['folder_id']:
+        fetch = fetch_by_id(module)
+    elif module.params['path']:
+        fetch = resolve_path(module)
+    else:
+        fetch = find_folder(module, module.params['parent'], module.params['display_name'])
     changed = False
     difference = None
 
@@ -159,14 +202,17 @@ def main():
             if difference:
                 update(module, self_link(module))
                 fetch = fetch_resource(module, self_link(module))
+                index_folder(fetch)
                 changed = True
         elif fetch.get('state') == ACTIVE:
             delete(module, self_link(module))
+            index_folder(dict(fetch, state='DELETE_REQUESTED'))
             fetch = {}
             changed = True
     else:
         if state == 'present':
             fetch = create(module, collection(module))
+            index_folder(fetch)
             changed = True
         else:
             fetch = {}
@@ -179,15 +225,63 @@ def main():
 
 def fetch_resource(module, link):
     auth = GcpSession(module, 'resourcemanager')
-    folderlist = auth.list(
-        f'{link}:search',
-        return_if_object,
-        params={'query': f'parent={module.params["parent"]} AND displayName="{module.params["display_name"]}"'},
-        array_name='folders'
-    )
-    result = folderlist[0] if len(folderlist) > 0 else None
-
-    return result
+    return return_if_object(module, auth.get(link), allow_not_found=True)['result']
+
+
+def fetch_by_id(module):
+    """Fetches the folder given by its ID, which must exist.
+
+    The parent and display name not given default to the ones of the folder.
+
+    Args:
+        module: AnsibleModule, the ansible module.
+
+    Returns:
+        dict, the folder.
+    """
+    module.params['name'] = 'folders/%s' % module.params['folder_id']
+    fetch = fetch_resource(module, self_link(module))
+    if not fetch:
+        module.fail_json(msg='The folder %s does not exist' % module.params['name'])
+    module.params['parent'] = module.params['parent'] or fetch.get('parent')
+    module.params['display_name'] = module.params['display_name'] or fetch.get('displayName')
+    return fetch
+
+
+def resolve_path(module):
+    """Resolves the path option into the parent and display name of the folder.
+
+    When the state is present, the missing folders above the last one of the
+    path are created.
+
+    Args:
+        module: AnsibleModule, the ansible module.
+
+    Returns:
+        dict, the folder at the path, if it exists.
+    """
+    try:
+        root, names = split_folder_path(module.params['path'])
+    except ValueError as inst:
+        module.fail_json(msg=str(inst))
+    if not names:
+        module.fail_json(msg="Folder path '%s' must hold at least one display name" % module.params['path'])
+    folders = resolve_folder_path(module, module.params['path'])
+    if len(folders) == len(names):
+        module.params['parent'] = folders[-1]['parent']
+        module.params['display_name'] = names[-1]
+        return folders[-1]
+
+    module.params['parent'] = folders[-1]['name'] if folders else root
+    if module.params['state'] == 'present':
+        for name in names[len(folders):-1]:
+            module.params['display_name'] = name
+            folder = create(module, collection(module))
+            index_folder(folder)
+            folders.append(folder)
+            module.params['parent'] = folder['name']
+    module.params['display_name'] = names[-1]
+    return None
 
 
 def create(module, link):
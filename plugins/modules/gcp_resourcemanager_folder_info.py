@@ -28,7 +28,7 @@ options:
     description:
     - The folder's parent's resource name.
     - For example, organizations/1234.
-    required: true
+    - Required unless I(folder_id) is given.
     type: str
   display_name:
     description:
@@ -38,7 +38,13 @@ options:
     - The display name must start and end with a letter or digit, may contain
       letters, digits, spaces, hyphens and underscores and can be no longer than 30 characters.
     - 'This is captured by the regular expression: [\\p{L}\\p{N}]([\\p{L}\\p{N}_- ]{0,28}[\\p{L}\\p{N}])?.'
-    required: true
+    - Required unless I(folder_id) is given.
+    type: str
+  folder_id:
+    description:
+    - The ID of the folder, to get it without looking it up from its parent and display name.
+    - For example, 1234 for folders/1234.
+    - Mutually exclusive with I(parent) and I(display_name).
     type: str
 '''
 
@@ -49,6 +55,12 @@ EXAMPLES = '''
     display_name: demofolder
     auth_kind: serviceaccount
     service_account_file: "/tmp/auth.pem"
+
+- name: Gets a GCP folder information from its ID
+  raphaeldegail.googlecloudy.gcp_resourcemanager_folder_info:
+    folder_id: "5678"
+    auth_kind: serviceaccount
+    service_account_file: "/tmp/auth.pem"
 '''
 
 RETURN = '''
@@ -102,8 +114,6 @@ etag:
   type: str
 '''
 
-ACTIVE = "ACTIVE"
-
 API = 'https://cloudresourcemanager.googleapis.com/v3'
 
 ################################################################################
@@ -115,6 +125,9 @@ from ansible_collections.raphaeldegail.googlecloudy.plugins.module_utils.gcp_uti
     GcpSession,
     GcpModule
 )
+from ansible_collections.raphaeldegail.googlecloudy.plugins.module_utils.gcp_resourcemanager import (
+    find_folder
+)
 
 ################################################################################
 # Main
@@ -126,16 +139,23 @@ def main():
 
     module = GcpModule(
         argument_spec=dict(
-            parent=dict(required=True, type='str'),
-            display_name=dict(required=True, type='str')
+            parent=dict(type='str'),
+            display_name=dict(type='str'),
+            folder_id=dict(type='str')
         ),
+        mutually_exclusive=[['folder_id', 'parent'], ['folder_id', 'display_name']],
+        required_one_of=[['folder_id', 'parent']],
+        required_together=[['parent', 'display_name']],
         supports_check_mode=True
     )
 
     if not module.params['scopes']:
         module.params['scopes'] = ['https://www.googleapis.com/auth/cloud-platform']
 
-    fetch = fetch_resource(module, collection(module))
+    if module.params['folder_id']:
+        fetch = fetch_resource(module, self_link(module))
+    else:
+        fetch = find_folder(module, module.params['parent'], module.params['display_name'])
     changed = False
 
     if not fetch:
@@ -148,19 +168,11 @@ def main():
 
 def fetch_resource(module, link):
     auth = GcpSession(module, 'resourcemanager')
-    folderlist = auth.list(
-        f'{link}:search',
-        return_if_object,
-        params={'query': f'parent={module.params["parent"]} AND displayName="{module.params["display_name"]}"'},
-        array_name='folders'
-    )
-    result = folderlist[0] if len(folderlist) > 0 else None
-
-    return result
+    return return_if_object(module, auth.get(link), allow_not_found=True)['result']
 
 
-def collection(module):
-    return "{api}/folders".format(api=API, **module.params)
+def self_link(module):
+    return "{api}/folders/{folder_id}".format(api=API, **module.params)
 
 
 if __name__ == '__main__':
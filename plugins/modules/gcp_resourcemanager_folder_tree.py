@@ -0,0 +1,312 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright: Raphaël de Gail
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+################################################################################
+# Documentation
+################################################################################
+
+ANSIBLE_METADATA = {'metadata_version': '1.1', 'status': ["preview"], 'supported_by': 'community'}
+
+DOCUMENTATION = '''
+---
+module: gcp_resourcemanager_folder_tree
+description:
+- Manages a tree of folders under an organization or a folder.
+- The existing folders are listed level by level, then the missing folders of a level are created
+  in parallel before descending to the next level.
+short_description: Manages a tree of GCP folders
+extends_documentation_fragment:
+- raphaeldegail.googlecloudy.gcp
+options:
+  parent:
+    description:
+    - The resource name of the root of the tree.
+    - For example, organizations/1234 or folders/5678.
+    required: true
+    type: str
+  folders:
+    description:
+    - The folders directly under the parent.
+    required: true
+    type: list
+    elements: dict
+    suboptions:
+      display_name:
+        description:
+        - The folder's display name.
+        - A folder's display name must be unique amongst its siblings.
+        required: true
+        type: str
+      folders:
+        description:
+        - The folders directly under this folder, with the same format as I(folders), recursively.
+        type: list
+        elements: dict
+        default: []
+  prune:
+    description:
+    - Whether the folders which are not declared in the tree, and all their subfolders, should be deleted.
+    - Folders still holding projects cannot be deleted.
+    default: false
+    type: bool
+  concurrency:
+    description:
+    - The maximum number of parallel requests.
+    default: 10
+    type: int
+'''
+
+EXAMPLES = '''
+- name: Creates a tree of GCP folders
+  raphaeldegail.googlecloudy.gcp_resourcemanager_folder_tree:
+    parent: organizations/1234
+    folders:
+    - display_name: Platform
+      folders:
+      - display_name: Prod
+        folders:
+        - display_name: Data
+        - display_name: Web
+      - display_name: Dev
+    - display_name: Sandbox
+    prune: true
+    auth_kind: serviceaccount
+    service_account_file: "/tmp/auth.pem"
+'''
+
+RETURN = '''
+folders:
+  description:
+  - The folders of the tree, from the top.
+  returned: success
+  type: complex
+  contains:
+    path:
+      description:
+      - The path of the folder, made of the parent and the display names down to the folder.
+      - For example, organizations/1234/Platform/Prod.
+      returned: success
+      type: str
+    name:
+      description:
+      - The resource name of the folder.
+      - "Its format is folders/{folder_id}, for example: folders/1234."
+      - Not returned for folders to be created in check mode.
+      returned: success
+      type: str
+created:
+  description:
+  - The paths of the created folders.
+  returned: success
+  type: list
+  elements: str
+deleted:
+  description:
+  - The paths of the deleted folders, deepest first.
+  returned: success
+  type: list
+  elements: str
+'''
+
+################################################################################
+# Imports
+################################################################################
+
+from ansible_collections.raphaeldegail.googlecloudy.plugins.module_utils.gcp_utils import (
+    run_concurrently,
+    wait_for_operation,
+    GcpSession,
+    GcpModule,
+    DEFAULT_CONCURRENCY
+)
+from ansible_collections.raphaeldegail.googlecloudy.plugins.module_utils.gcp_resourcemanager import (
+    index_folder,
+    list_folders,
+    API
+)
+
+################################################################################
+# Main
+################################################################################
+
+
+def main():
+    """Main function"""
+
+    module = GcpModule(
+        argument_spec=dict(
+            parent=dict(required=True, type='str'),
+            folders=dict(required=True, type='list', elements='dict', options=dict(
+                display_name=dict(required=True, type='str'),
+                folders=dict(type='list', elements='dict', default=[])
+            )),
+            prune=dict(default=False, type='bool'),
+            concurrency=dict(default=DEFAULT_CONCURRENCY, type='int')
+        ),
+        supports_check_mode=True
+    )
+
+    if not module.params['scopes']:
+        module.params['scopes'] = ['https://www.googleapis.com/auth/cloud-platform']
+
+    parent = module.params['parent'].strip('/')
+    if len(parent.split('/')) != 2 or parent.split('/')[0] not in ('organizations', 'folders'):
+        module.fail_json(msg="The parent '%s' must be organizations/{id} or folders/{id}" % module.params['parent'])
+
+    specs = normalize_tree(module, module.params['folders'], parent)
+    result = reconcile(module, parent, specs)
+    if module.params['prune'] and result['undeclared']:
+        result['deleted'] = prune(module, result['undeclared'])
+    del result['undeclared']
+
+    result.update({'changed': bool(result['created'] or result['deleted'])})
+
+    module.exit_json(**result)
+
+
+def normalize_tree(module, specs, path):
+    """Validates a tree of folders, at any depth.
+
+    Args:
+        module: AnsibleModule, the ansible module.
+        specs: list, the folders declared under a parent.
+        path: str, the path of the parent.
+
+    Returns:
+        list, the folders with their display name and subfolders.
+    """
+    tree = []
+    names = set()
+    for spec in specs or []:
+        if not isinstance(spec, dict) or not spec.get('display_name'):
+            module.fail_json(msg="Every folder under '%s' must have a display_name" % path)
+        unknown = set(spec) - set(['display_name', 'folders'])
+        if unknown:
+            module.fail_json(msg="Unsupported parameters for the folder '%s/%s': %s" % (
+                path, spec['display_name'], ', '.join(sorted(unknown))
+            ))
+        if spec['display_name'] in names:
+            module.fail_json(msg="The folder '%s/%s' is declared more than once" % (path, spec['display_name']))
+        names.add(spec['display_name'])
+        child_path = '%s/%s' % (path, spec['display_name'])
+        tree.append({
+            'display_name': spec['display_name'],
+            'folders': normalize_tree(module, spec.get('folders'), child_path)
+        })
+    return tree
+
+
+def reconcile(module, parent, specs):
+    """Creates the missing folders of the tree, level by level.
+
+    The existing children of the folders of a level are listed in parallel,
+    then the missing folders of the level are created in parallel.
+
+    Args:
+        module: AnsibleModule, the ansible module.
+        parent: str, the resource name of the root of the tree.
+        specs: list, the normalized folders under the root.
+
+    Returns:
+        dict, the folders of the tree, the created paths and the undeclared existing folders.
+    """
+    concurrency = module.params['concurrency']
+    result = {'folders': [], 'created': [], 'deleted': [], 'undeclared': []}
+    # Each entry holds the resource name, path, declared subfolders and existence of a folder
+    level = [(parent, parent, specs, True)]
+    while level:
+        listings = run_concurrently(
+            lambda entry: list_folders(module, entry[0]) if entry[3] and (entry[2] or module.params['prune']) else [],
+            level,
+            concurrency
+        )
+
+        next_level = []
+        creations = []
+        for (name, path, children, exists), listing in zip(level, listings):
+            existing = dict((folder['displayName'], folder) for folder in listing)
+            for spec in children:
+                child_path = '%s/%s' % (path, spec['display_name'])
+                folder = existing.pop(spec['display_name'], None)
+                if folder is None:
+                    creations.append((name, child_path, spec))
+                    continue
+                result['folders'].append({'path': child_path, 'name': folder['name']})
+                next_level.append((folder['name'], child_path, spec['folders'], True))
+            result['undeclared'].extend(('%s/%s' % (path, display_name), folder) for display_name, folder in existing.items())
+
+        created = run_concurrently(
+            lambda creation: create(module, creation[0], creation[2]['display_name']),
+            creations,
+            concurrency
+        )
+        for (name, child_path, spec), folder in zip(creations, created):
+            if folder.get('name'):
+                index_folder(folder)
+            result['created'].append(child_path)
+            result['folders'].append({'path': child_path, 'name': folder.get('name')})
+            next_level.append((folder.get('name'), child_path, spec['folders'], False))
+
+        level = next_level
+    return result
+
+
+def prune(module, undeclared):
+    """Deletes undeclared folders along with all their subfolders, deepest first.
+
+    Args:
+        module: AnsibleModule, the ansible module.
+        undeclared: list, the paths and resources of the undeclared folders.
+
+    Returns:
+        list, the paths of the deleted folders.
+    """
+    concurrency = module.params['concurrency']
+    levels = [undeclared]
+    while levels[-1]:
+        listings = run_concurrently(lambda entry: list_folders(module, entry[1]['name']), levels[-1], concurrency)
+        levels.append([
+            ('%s/%s' % (path, child['displayName']), child)
+            for (path, folder), children in zip(levels[-1], listings)
+            for child in children
+        ])
+
+    deleted = []
+    for level in reversed(levels):
+        if not module.check_mode:
+            run_concurrently(lambda entry: delete(module, entry[1]), level, concurrency)
+        deleted.extend(path for path, folder in level)
+    return deleted
+
+
+def create(module, parent, display_name):
+    request = {'parent': parent, 'displayName': display_name}
+    if module.check_mode:
+        return request
+    auth = GcpSession(module, 'resourcemanager')
+    return wait_for_operation(module, auth.post(collection(), request), api=API)
+
+
+def delete(module, folder):
+    auth = GcpSession(module, 'resourcemanager')
+    wait_for_operation(module, auth.delete(self_link(folder['name'])), api=API)
+    index_folder(dict(folder, state='DELETE_REQUESTED'))
+
+
+def self_link(name):
+    return "{api}/{name}".format(api=API, name=name)
+
+
+def collection():
+    return "{api}/folders".format(api=API)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,357 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright: Raphaël de Gail
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+################################################################################
+# Documentation
+################################################################################
+
+ANSIBLE_METADATA = {'metadata_version': '1.1', 'status': ["preview"], 'supported_by': 'community'}
+
+DOCUMENTATION = '''
+---
+module: gcp_resourcemanager_iam_export_info
+description:
+- Exports the IAM policies of an organization and of the folders, projects, service accounts
+  and tag keys under it into a SQLite database.
+- The hierarchy is crawled level by level, with the children of a level and the policies of a batch
+  of resources read in parallel. Each batch is written to the database before the next one is read.
+- The database holds a C(resources) table, with the name, type, parent and policy etag of every
+  resource, and a C(bindings) table, with the resource, role, member and condition of every binding,
+  indexed by member, role and resource.
+- On later runs, the policy of a resource already in the database is first probed for its etag alone,
+  and only read in full, with its bindings rewritten, when the etag changed. The resources which no
+  longer exist are removed.
+- In check mode, the database is read but not written, and the counts are those the run would write.
+short_description: Exports the IAM policies of a GCP organization
+extends_documentation_fragment:
+- raphaeldegail.googlecloudy.gcp
+options:
+  organization_id:
+    description:
+    - The ID of the organization to export.
+    - For example, 1234.
+    required: true
+    type: str
+  database:
+    description:
+    - The path of the SQLite database, created if missing.
+    - The file is written by the host running the module, that is the controller when the module runs
+      locally or in the controller worker.
+    required: true
+    type: path
+  resource_types:
+    description:
+    - The types of resources whose policies are exported.
+    choices:
+    - organization
+    - folder
+    - project
+    - serviceAccount
+    - tagKey
+    default: [organization, folder, project, serviceAccount, tagKey]
+    type: list
+    elements: str
+  max_age:
+    description:
+    - The age, in seconds, under which the policy of a resource already in the database is not read again.
+    - 0 probes the etag of every policy.
+    default: 0
+    type: int
+  concurrency:
+    description:
+    - The maximum number of parallel requests.
+    default: 10
+    type: int
+'''
+
+EXAMPLES = '''
+- name: Exports the IAM policies of an organization
+  raphaeldegail.googlecloudy.gcp_resourcemanager_iam_export_info:
+    organization_id: "1234"
+    database: /var/lib/audit/iam.db
+    auth_kind: serviceaccount
+    service_account_file: "/tmp/auth.pem"
+  delegate_to: localhost
+
+- name: Lists the roles of a user
+  ansible.builtin.command:
+    cmd: sqlite3 /var/lib/audit/iam.db "SELECT resource, role FROM bindings WHERE member = 'user:jane@example.com'"
+  delegate_to: localhost
+'''
+
+RETURN = '''
+database:
+  description:
+  - The path of the SQLite database.
+  returned: success
+  type: str
+resources:
+  description:
+  - The number of resources exported.
+  returned: success
+  type: int
+probed:
+  description:
+  - The number of policies already in the database whose etag was read.
+  returned: success
+  type: int
+fetched:
+  description:
+  - The number of policies read in full, new or with a changed etag.
+  returned: success
+  type: int
+updated:
+  description:
+  - The number of resources whose bindings were written, new or with a changed policy.
+  returned: success
+  type: int
+removed:
+  description:
+  - The number of resources removed from the database, which no longer exist.
+  returned: success
+  type: int
+bindings:
+  description:
+  - The number of (resource, role, member) bindings in the database.
+  returned: success
+  type: int
+'''
+
+RM_API = 'https://cloudresourcemanager.googleapis.com/v3'
+
+IAM_API = 'https://iam.googleapis.com/v1'
+
+# The resources whose policies are read and written together.
+BATCH_SIZE = 500
+
+PAGE_SIZE = 500
+
+SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS resources ('
+    'name TEXT PRIMARY KEY, type TEXT NOT NULL, parent TEXT, etag TEXT, fetched REAL NOT NULL)',
+    'CREATE TABLE IF NOT EXISTS bindings ('
+    'resource TEXT NOT NULL, role TEXT NOT NULL, member TEXT NOT NULL, condition TEXT)',
+    'CREATE INDEX IF NOT EXISTS bindings_member ON bindings (member)',
+    'CREATE INDEX IF NOT EXISTS bindings_role ON bindings (role)',
+    'CREATE INDEX IF NOT EXISTS bindings_resource ON bindings (resource)',
+)
+
+################################################################################
+# Imports
+################################################################################
+
+import json
+import os
+import sqlite3
+import time
+
+from ansible_collections.raphaeldegail.googlecloudy.plugins.module_utils.gcp_utils import (
+    return_if_object,
+    run_concurrently,
+    GcpSession,
+    GcpModule,
+    DEFAULT_CONCURRENCY
+)
+from ansible_collections.raphaeldegail.googlecloudy.plugins.module_utils.gcp_resourcemanager import (
+    get_iam_policy
+)
+
+################################################################################
+# Main
+################################################################################
+
+
+def main():
+    """Main function"""
+
+    module = GcpModule(
+        argument_spec=dict(
+            organization_id=dict(required=True, type='str'),
+            database=dict(required=True, type='path'),
+            resource_types=dict(
+                type='list', elements='str',
+                choices=['organization', 'folder', 'project', 'serviceAccount', 'tagKey'],
+                default=['organization', 'folder', 'project', 'serviceAccount', 'tagKey']
+            ),
+            max_age=dict(default=0, type='int'),
+            concurrency=dict(default=DEFAULT_CONCURRENCY, type='int')
+        ),
+        supports_check_mode=True
+    )
+
+    if not module.params['scopes']:
+        module.params['scopes'] = ['https://www.googleapis.com/auth/cloud-platform']
+
+    directory = os.path.dirname(os.path.abspath(module.params['database']))
+    if not os.path.isdir(directory):
+        module.fail_json(msg='The directory of the database %s does not exist' % module.params['database'])
+
+    connection = open_database(module)
+    try:
+        result = export(module, connection)
+    finally:
+        connection.close()
+    result.update({'database': module.params['database'], 'changed': False})
+
+    module.exit_json(**result)
+
+
+def open_database(module):
+    """Opens the database, or an in-memory copy of it in check mode.
+
+    Args:
+        module: AnsibleModule, the ansible module.
+
+    Returns:
+        sqlite3.Connection, the connection to the database.
+    """
+    if not module.check_mode:
+        return sqlite3.connect(module.params['database'])
+    connection = sqlite3.connect(':memory:')
+    if os.path.exists(module.params['database']):
+        source = sqlite3.connect(module.params['database'])
+        try:
+            source.backup(connection)
+        finally:
+            source.close()
+    return connection
+
+
+def export(module, connection):
+    """Crawls the organization and writes the policies to the database.
+
+    Args:
+        module: AnsibleModule, the ansible module.
+        connection: sqlite3.Connection, the connection to the database.
+
+    Returns:
+        dict, the counts of the export.
+    """
+    concurrency = module.params['concurrency']
+    types = set(module.params['resource_types'])
+    for statement in SCHEMA:
+        connection.execute(statement)
+    known = dict(
+        (name, (resource_type, etag, fetched))
+        for name, resource_type, etag, fetched in connection.execute('SELECT name, type, etag, fetched FROM resources')
+    )
+    counts = {'resources': 0, 'probed': 0, 'fetched': 0, 'updated': 0, 'removed': 0}
+    seen = set()
+
+    level = [{'name': 'organizations/%s' % module.params['organization_id'], 'type': 'organization', 'parent': None}]
+    while level:
+        exported = [resource for resource in level if resource['type'] in types]
+        for start in range(0, len(exported), BATCH_SIZE):
+            write_batch(module, connection, exported[start:start + BATCH_SIZE], known, counts)
+        seen.update(resource['name'] for resource in exported)
+
+        containers = [resource for resource in level if resource['type'] in ('organization', 'folder', 'project')]
+        listings = run_concurrently(lambda resource: list_children(module, resource, types), containers, concurrency)
+        level = [child for listing in listings for child in listing]
+
+    removed = [name for name, (resource_type, etag, fetched) in known.items() if resource_type in types and name not in seen]
+    with connection:
+        for name in removed:
+            connection.execute('DELETE FROM bindings WHERE resource = ?', (name,))
+            connection.execute('DELETE FROM resources WHERE name = ?', (name,))
+    counts['resources'] = len(seen)
+    counts['removed'] = len(removed)
+    counts['bindings'] = connection.execute('SELECT COUNT(*) FROM bindings').fetchone()[0]
+    return counts
+
+
+def write_batch(module, connection, batch, known, counts):
+    """Reads the policies of a batch of resources in parallel and writes the changed ones.
+
+    Args:
+        module: AnsibleModule, the ansible module.
+        connection: sqlite3.Connection, the connection to the database.
+        batch: list, the resources.
+        known: dict, the type, policy etag and fetch time of the resources in the database, by name.
+        counts: dict, the counts of the export, updated in place.
+    """
+    now = time.time()
+    max_age = module.params['max_age']
+    concurrency = module.params['concurrency']
+    batch = [
+        resource for resource in batch
+        if resource['name'] not in known or now - known[resource['name']][2] >= max_age
+    ]
+    # The policies already in the database are probed for their etag alone,
+    # and only those whose etag changed are read in full.
+    probed = [resource for resource in batch if resource['name'] in known]
+    etags = run_concurrently(lambda resource: get_iam_policy(module, resource['name'], fields='etag').get('etag'), probed, concurrency)
+    unchanged = set(
+        resource['name'] for resource, etag in zip(probed, etags)
+        if etag and etag == known[resource['name']][1]
+    )
+    batch = [resource for resource in batch if resource['name'] not in unchanged]
+    policies = run_concurrently(lambda resource: get_iam_policy(module, resource['name']), batch, concurrency)
+    counts['probed'] += len(probed)
+    counts['fetched'] += len(batch)
+    with connection:
+        for name in unchanged:
+            connection.execute('UPDATE resources SET fetched = ? WHERE name = ?', (now, name))
+        for resource, policy in zip(batch, policies):
+            name = resource['name']
+            connection.execute('DELETE FROM bindings WHERE resource = ?', (name,))
+            connection.executemany('INSERT INTO bindings (resource, role, member, condition) VALUES (?, ?, ?, ?)', [
+                (name, binding['role'], member, json.dumps(binding['condition'], sort_keys=True) if binding.get('condition') else None)
+                for binding in policy.get('bindings', [])
+                for member in binding.get('members', [])
+            ])
+            connection.execute('INSERT OR REPLACE INTO resources (name, type, parent, etag, fetched) VALUES (?, ?, ?, ?, ?)', (
+                name, resource['type'], resource['parent'], policy.get('etag'), now
+            ))
+            counts['updated'] += 1
+
+
+def list_children(module, resource, types):
+    """Lists the resources directly under an organization, a folder or a project.
+
+    Args:
+        module: AnsibleModule, the ansible module.
+        resource: dict, the parent resource.
+        types: set, the types of resources exported.
+
+    Returns:
+        list, the child resources.
+    """
+    name = resource['name']
+    children = []
+    if resource['type'] in ('organization', 'folder'):
+        children.extend(
+            {'name': folder['name'], 'type': 'folder', 'parent': name}
+            for folder in iterate(module, '%s/folders' % RM_API, {'parent': name}, 'folders')
+        )
+        children.extend(
+            {'name': project['name'], 'type': 'project', 'parent': name, 'project_id': project.get('projectId')}
+            for project in iterate(module, '%s/projects' % RM_API, {'parent': name}, 'projects')
+        )
+    if resource['type'] == 'project' and 'serviceAccount' in types:
+        children.extend(
+            {'name': account['name'], 'type': 'serviceAccount', 'parent': name}
+            for account in iterate(module, '%s/projects/%s/serviceAccounts' % (IAM_API, resource['project_id']), {}, 'accounts')
+        )
+    if resource['type'] in ('organization', 'project') and 'tagKey' in types:
+        children.extend(
+            {'name': key['name'], 'type': 'tagKey', 'parent': name}
+            for key in iterate(module, '%s/tagKeys' % RM_API, {'parent': name}, 'tagKeys')
+        )
+    return children
+
+
+def iterate(module, link, params, array_name):
+    auth = GcpSession(module, 'resourcemanager')
+    return auth.iterate(link, return_if_object, params=dict(params, pageSize=PAGE_SIZE), array_name=array_name)
+
+
+if __name__ == '__main__':
+    main()
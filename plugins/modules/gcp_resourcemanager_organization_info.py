@@ -26,10 +26,21 @@ extends_documentation_fragment:
 options:
   domain:
     description:
-    - The primary domain name of the organization.
+    - The primary domain names of the organizations.
     - For example, demodomain.demo
+    - The domains are searched in parallel.
     required: true
-    type: str
+    type: list
+    elements: str
+  cache_ttl:
+    description:
+    - The time during which the organization found for a domain is kept in the on-disk cache, in seconds.
+    - Organization IDs never change, so the cache is long-lived.
+    - The cache lives under ~/.ansible/gcp_cache on the host running the module, or the directory given
+      by the C(GCP_CACHE_DIR) environment variable.
+    - 0 disables the cache.
+    default: 2592000
+    type: int
 '''
 
 EXAMPLES = '''
@@ -38,9 +49,27 @@ EXAMPLES = '''
     domain: demodomain.demo
     auth_kind: serviceaccount
     service_account_file: "/tmp/auth.pem"
+
+- name: Gets the organizations of several domains
+  gcp_resourcemanager_organization_info:
+    domain:
+    - demodomain.demo
+    - otherdomain.demo
+    auth_kind: serviceaccount
+    service_account_file: "/tmp/auth.pem"
+  register: result
+- name: Uses the organization of a domain
+  ansible.builtin.debug:
+    msg: "{{ result.organizations['otherdomain.demo'].name }}"
 '''
 
 RETURN = '''
+organizations:
+  description:
+  - The organizations found, by domain.
+  - The domains without organization are left out.
+  returned: always
+  type: dict
 resources:
   description: List of resources
   returned: always
@@ -82,11 +111,16 @@ API = 'https://cloudresourcemanager.googleapis.com/v1'
 # Imports
 ################################################################################
 from ansible_collections.raphaeldegail.googlecloudy.plugins.module_utils.gcp_utils import (
-    navigate_hash,
+    return_if_object,
+    run_concurrently,
     GcpSession,
     GcpModule
 )
-import json
+from ansible_collections.raphaeldegail.googlecloudy.plugins.module_utils.gcp_cache import (
+    DiskCache
+)
+
+CACHE_NAMESPACE = 'organizations'
 
 ################################################################################
 # Main
@@ -95,7 +129,8 @@ import json
 
 def main():
     module = GcpModule(argument_spec=dict(
-        domain=dict(type='str', required=True)
+        domain=dict(type='list', elements='str', required=True),
+        cache_ttl=dict(type='int', default=30 * 24 * 3600)
     ), supports_check_mode=True)
 
     if not module.params['scopes']:
@@ -106,51 +141,46 @@ def main():
         result['changed'] = False
         module.exit_json(**result)
 
-    return_value = {'resources': search_list(module, f'{collection(module)}:search')}
+    domains = list(dict.fromkeys(module.params['domain']))
+    organizations = resolve_domains(module, domains)
+    return_value = {
+        'organizations': organizations,
+        'resources': [organizations[domain] for domain in domains if domain in organizations]
+    }
     module.exit_json(**return_value)
 
 
-def search_list(module, link):
+def resolve_domains(module, domains):
+    """Resolves domains into their organizations.
+
+    The domains missing from the on-disk cache are searched in parallel,
+    and the organizations found are added to the cache.
+
+    Args:
+        module: AnsibleModule, the ansible module.
+        domains: list, the primary domain names.
+
+    Returns:
+        dict, the organizations found, by domain.
+    """
+    cache = DiskCache(CACHE_NAMESPACE, module.params['cache_ttl'])
+    organizations = cache.lookup(domains)
+    missing = [domain for domain in domains if domain not in organizations]
+    found = {}
+    for domain, results in zip(missing, run_concurrently(lambda domain: search_list(module, domain), missing)):
+        if results:
+            found[domain] = results[0]
+    cache.store(found)
+    organizations.update(found)
+    return organizations
+
+
+def search_list(module, domain):
     auth = GcpSession(module, 'resourcemanager')
     params = {
-        'filter': f'domain:{module.params.get("domain")}'
+        'filter': f'domain:{domain}'
     }
-    return auth.search(link, return_if_object, array_name='organizations', data=params)
-
-
-def return_if_object(module, response):
-    # If not found, return nothing.
-    if response.status_code == 404:
-        return {
-            'result': None,
-            'status_code': response.status_code,
-            'url': response.url
-        }
-
-    # If no content, return nothing.
-    if response.status_code == 204:
-        return {
-            'result': None,
-            'status_code': response.status_code,
-            'url': response.url
-        }
-
-    try:
-        module.raise_for_status(response)
-        result = response.json()
-    except getattr(json.decoder, 'JSONDecodeError', ValueError) as inst:
-        module.fail_json(msg="Invalid JSON response with error: %s" % inst)
-
-    if navigate_hash(result, ['error', 'errors']):
-        module.fail_json(msg=navigate_hash(result, ['error', 'errors']))
-
-    full_result = {
-        'result': result,
-        'status_code': response.status_code,
-        'url': response.url
-    }
-
-    return full_result
+    return auth.search(f'{collection(module)}:search', return_if_object, array_name='organizations', data=params)
 
 
 def collection(module):
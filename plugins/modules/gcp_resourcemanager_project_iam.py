@@ -123,6 +123,9 @@ from ansible_collections.raphaeldegail.googlecloudy.plugins.module_utils.gcp_uti
     GcpSession,
     GcpModule
 )
+from ansible_collections.raphaeldegail.googlecloudy.plugins.module_utils.gcp_cache import (
+    PolicyJournal
+)
 
 ################################################################################
 # Main
@@ -153,6 +156,7 @@ def main():
                 )
             ),
             policy_version=dict(default="1", choices=["1", "2", "3"], type='str'),
+            journal_ttl=dict(default=0, type='int'),
             project_id=dict(required=True, type='str'),
         )
     )
@@ -160,6 +164,13 @@ def main():
     if not module.params['scopes']:
         module.params['scopes'] = ['https://www.googleapis.com/auth/cloudplatformprojects']
 
+    journal = PolicyJournal(self_link(module), resource_to_request(module), module.params['journal_ttl'])
+    etag = journal.unchanged(lambda: get(module, self_link(module), fields='etag').get('etag'))
+    if etag:
+        result = dict(resource_to_request(module)['policy'], etag=etag)
+        result.update({'changed': False})
+        module.exit_json(**result)
+
     fetch = get(module, self_link(module))
     changed = False
 
@@ -169,13 +180,15 @@ def main():
         fetch = get(module, self_link(module))
         changed = True
 
+    journal.record(fetch.get('etag'))
+
     fetch.update({'changed': changed})
     fetch.update({'diff': difference} if difference else {})
 
     module.exit_json(**fetch)
 
 
-def get(module, link):
+def get(module, link, fields=None):
     auth = GcpSession(module, 'resourcemanager')
     return return_if_object(
         module,
@@ -185,7 +198,8 @@ def get(module, link):
                 'options': {
                     'requestedPolicyVersion': module.params['policy_version']
                 }
-            }
+            },
+            params={'fields': fields} if fields else None
         ),
         allow_not_found=False
     )['result']
@@ -0,0 +1,251 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright: Raphaël de Gail
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+################################################################################
+# Documentation
+################################################################################
+
+ANSIBLE_METADATA = {'metadata_version': '1.1', 'status': ["preview"], 'supported_by': 'community'}
+
+DOCUMENTATION = '''
+---
+module: gcp_resourcemanager_project_info
+description:
+- Searches projects.
+- The projects visible to the caller are filtered on the server side, then read page by page.
+- The projects can be written to a JSON Lines file instead of being returned, for listings too
+  large to be held in the result of the task.
+short_description: Searches GCP projects
+extends_documentation_fragment:
+- raphaeldegail.googlecloudy.gcp
+options:
+  parent:
+    description:
+    - The resource name of the direct parent of the projects.
+    - For example, organizations/1234 or folders/5678.
+    type: str
+  labels:
+    description:
+    - The labels the projects must hold, by key.
+    - The value C(*) matches any value of the label.
+    type: dict
+  state:
+    description:
+    - The lifecycle state of the projects.
+    choices:
+    - ACTIVE
+    - DELETE_REQUESTED
+    type: str
+  query:
+    description:
+    - An additional query in the syntax of projects.search.
+    - For example, "displayName:web* OR projectId:web*".
+    - Combined with I(parent), I(labels) and I(state) by AND.
+    type: str
+  fields:
+    description:
+    - The fields of the projects to return, such as projectId or labels.
+    - All the fields are returned by default.
+    type: list
+    elements: str
+  page_size:
+    description:
+    - The number of projects read per request.
+    default: 500
+    type: int
+  output_file:
+    description:
+    - The path of a file to write the projects to, one JSON object per line, instead of returning them.
+    - The file is written by the host running the module, that is the controller when the module runs
+      locally or in the controller worker.
+    - The file is replaced once all the projects are written.
+    - In check mode, the projects are counted but the file is not written.
+    type: path
+'''
+
+EXAMPLES = '''
+- name: Gets the production projects of a folder
+  raphaeldegail.googlecloudy.gcp_resourcemanager_project_info:
+    parent: folders/5678
+    labels:
+      env: prod
+    state: ACTIVE
+    fields:
+    - projectId
+    - name
+    auth_kind: serviceaccount
+    service_account_file: "/tmp/auth.pem"
+
+- name: Writes all the projects to a file
+  raphaeldegail.googlecloudy.gcp_resourcemanager_project_info:
+    output_file: /tmp/projects.jsonl
+    auth_kind: serviceaccount
+    service_account_file: "/tmp/auth.pem"
+  delegate_to: localhost
+'''
+
+RETURN = '''
+projects:
+  description:
+  - The projects, with the selected fields.
+  - Not returned when I(output_file) is given.
+  returned: success
+  type: list
+  elements: dict
+  contains:
+    name:
+      description:
+      - The resource name of the project.
+      - "Its format is projects/{project_number}, for example: projects/415104041262."
+      returned: success
+      type: str
+    parent:
+      description:
+      - The project's parent's resource name.
+      returned: success
+      type: str
+    projectId:
+      description:
+      - The unique, user-assigned ID of the project.
+      returned: success
+      type: str
+    state:
+      description:
+      - The lifecycle state of the project.
+      returned: success
+      type: str
+    displayName:
+      description:
+      - A user-assigned display name of the project.
+      returned: success
+      type: str
+    labels:
+      description:
+      - The labels associated with the project.
+      returned: success
+      type: dict
+count:
+  description:
+  - The number of projects found.
+  returned: success
+  type: int
+output_file:
+  description:
+  - The path of the file the projects were written to.
+  returned: when I(output_file) is given
+  type: str
+'''
+
+API = 'https://cloudresourcemanager.googleapis.com/v3'
+
+################################################################################
+# Imports
+################################################################################
+
+from ansible_collections.raphaeldegail.googlecloudy.plugins.module_utils.gcp_utils import (
+    return_if_object,
+    write_lines,
+    GcpSession,
+    GcpModule
+)
+
+################################################################################
+# Main
+################################################################################
+
+
+def main():
+    """Main function"""
+
+    module = GcpModule(
+        argument_spec=dict(
+            parent=dict(type='str'),
+            labels=dict(type='dict'),
+            state=dict(choices=['ACTIVE', 'DELETE_REQUESTED'], type='str'),
+            query=dict(type='str'),
+            fields=dict(type='list', elements='str'),
+            page_size=dict(default=500, type='int'),
+            output_file=dict(type='path')
+        ),
+        supports_check_mode=True
+    )
+
+    if not module.params['scopes']:
+        module.params['scopes'] = ['https://www.googleapis.com/auth/cloud-platform']
+
+    projects = search_projects(module)
+    if module.params['output_file']:
+        if module.check_mode:
+            count = sum(1 for item in projects)
+        else:
+            count = write_lines(module, projects, module.params['output_file'])
+        result = {'count': count, 'output_file': module.params['output_file']}
+    else:
+        projects = list(projects)
+        result = {'projects': projects, 'count': len(projects)}
+
+    result.update({'changed': False})
+
+    module.exit_json(**result)
+
+
+def build_query(module):
+    """Builds the projects.search query from the filter options.
+
+    Args:
+        module: AnsibleModule, the ansible module.
+
+    Returns:
+        str, the query.
+    """
+    terms = []
+    if module.params['parent']:
+        terms.append('parent:%s' % module.params['parent'])
+    for key, value in sorted((module.params['labels'] or {}).items()):
+        terms.append('labels.%s:%s' % (key, quote_value(value)))
+    if module.params['state']:
+        terms.append('state:%s' % module.params['state'])
+    if module.params['query']:
+        terms.append('(%s)' % module.params['query'])
+    return ' AND '.join(terms)
+
+
+def quote_value(value):
+    value = str(value)
+    if value == '*' or not any(c.isspace() for c in value):
+        return value
+    return '"%s"' % value.replace('"', '\\"')
+
+
+def search_projects(module):
+    """Iterates over the projects matching the filter options.
+
+    Args:
+        module: AnsibleModule, the ansible module.
+
+    Returns:
+        generator, the projects, read one page at a time.
+    """
+    auth = GcpSession(module, 'resourcemanager')
+    params = {'pageSize': module.params['page_size']}
+    query = build_query(module)
+    if query:
+        params['query'] = query
+    if module.params['fields']:
+        params['fields'] = 'nextPageToken,projects(%s)' % ','.join(module.params['fields'])
+    return auth.iterate(collection(), return_if_object, params=params, array_name='projects')
+
+
+def collection():
+    return "{api}/projects:search".format(api=API)
+
+
+if __name__ == '__main__':
+    main()
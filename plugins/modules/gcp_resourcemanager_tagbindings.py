@@ -0,0 +1,315 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright: Raphaël de Gail
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+################################################################################
+# Documentation
+################################################################################
+
+ANSIBLE_METADATA = {'metadata_version': '1.1', 'status': ["preview"], 'supported_by': 'community'}
+
+DOCUMENTATION = '''
+---
+module: gcp_resourcemanager_tagbindings
+description:
+- Manages the tag bindings of many resources at once.
+- The existing bindings of every resource are listed once, in parallel, then only the missing
+  bindings are created and the extra ones deleted, in parallel.
+- A resource holds at most one value of a tag key, so the value bound to a resource for the key of a
+  declared value is replaced by it.
+- The requests of a batch are all sent before waiting for their operations.
+- Only the resources served by the global Resource Manager endpoint are supported, such as
+  projects, folders and organizations.
+short_description: Manages many GCP tag bindings
+extends_documentation_fragment:
+- raphaeldegail.googlecloudy.gcp
+options:
+  state:
+    description:
+    - Whether the given bindings should exist in GCP
+    choices:
+    - present
+    - absent
+    default: present
+    type: str
+  bindings:
+    description:
+    - The bindings between resources and tag values.
+    required: true
+    type: list
+    elements: dict
+    suboptions:
+      resource:
+        description:
+        - The full resource name of the resource, for example //cloudresourcemanager.googleapis.com/projects/123.
+        - A relative name such as projects/123 is taken as a Resource Manager resource.
+        - Projects must be given by number.
+        required: true
+        type: str
+      tag_value:
+        description:
+        - The tag value, either by resource name like tagValues/456 or by namespaced name like 1234/env/prod.
+        required: true
+        type: str
+  exclusive:
+    description:
+    - Whether the bindings of the given resources to the tag keys of no declared value should be deleted.
+    - Only applies when I(state=present).
+    - The values replaced by a declared value of the same tag key are unbound either way.
+    default: false
+    type: bool
+  concurrency:
+    description:
+    - The maximum number of parallel requests.
+    default: 10
+    type: int
+'''
+
+EXAMPLES = '''
+- name: Tags the projects of an environment
+  raphaeldegail.googlecloudy.gcp_resourcemanager_tagbindings:
+    bindings:
+    - resource: projects/111
+      tag_value: 1234/env/prod
+    - resource: //cloudresourcemanager.googleapis.com/projects/222
+      tag_value: 1234/env/prod
+    exclusive: true
+    auth_kind: serviceaccount
+    service_account_file: "/tmp/auth.pem"
+
+- name: Removes a tag from a folder
+  raphaeldegail.googlecloudy.gcp_resourcemanager_tagbindings:
+    bindings:
+    - resource: folders/5678
+      tag_value: tagValues/456
+    state: absent
+    auth_kind: serviceaccount
+    service_account_file: "/tmp/auth.pem"
+'''
+
+RETURN = '''
+created:
+  description:
+  - The created bindings.
+  returned: success
+  type: list
+  elements: dict
+  contains:
+    resource:
+      description:
+      - The full resource name of the tagged resource.
+      returned: success
+      type: str
+    tag_value:
+      description:
+      - The resource name of the tag value.
+      returned: success
+      type: str
+deleted:
+  description:
+  - The deleted bindings, with the same format as I(created).
+  returned: success
+  type: list
+  elements: dict
+'''
+
+API = 'https://cloudresourcemanager.googleapis.com/v3'
+
+RESOURCE_MANAGER = '//cloudresourcemanager.googleapis.com/'
+
+TAG_BINDINGS_PAGE_SIZE = 300
+
+################################################################################
+# Imports
+################################################################################
+
+from ansible_collections.raphaeldegail.googlecloudy.plugins.module_utils.gcp_utils import (
+    return_if_object,
+    run_concurrently,
+    wait_for_operation,
+    GcpSession,
+    GcpModule,
+    DEFAULT_CONCURRENCY
+)
+from ansible_collections.raphaeldegail.googlecloudy.plugins.module_utils.gcp_resourcemanager import (
+    get_namespaced
+)
+
+################################################################################
+# Main
+################################################################################
+
+
+def main():
+    """Main function"""
+
+    module = GcpModule(
+        argument_spec=dict(
+            state=dict(default='present', choices=['present', 'absent'], type='str'),
+            bindings=dict(required=True, type='list', elements='dict', options=dict(
+                resource=dict(required=True, type='str'),
+                tag_value=dict(required=True, type='str')
+            )),
+            exclusive=dict(default=False, type='bool'),
+            concurrency=dict(default=DEFAULT_CONCURRENCY, type='int')
+        ),
+        supports_check_mode=True
+    )
+
+    if not module.params['scopes']:
+        module.params['scopes'] = ['https://www.googleapis.com/auth/cloud-platform']
+
+    concurrency = module.params['concurrency']
+    keys = {}
+    values = resolve_tag_values(module, set(binding['tag_value'] for binding in module.params['bindings']), keys)
+    declared = {}
+    for binding in module.params['bindings']:
+        # Values missing when state is absent are bound to nothing.
+        if binding['tag_value'] in values:
+            declared.setdefault(full_resource_name(binding['resource']), set()).add(values[binding['tag_value']])
+
+    resources = sorted(declared)
+    listings = run_concurrently(lambda resource: list_bindings(module, resource), resources, concurrency)
+
+    if module.params['state'] == 'present':
+        # The tag keys of the bound values only matter for the values they may replace.
+        unknown = set(value for tag_values in declared.values() for value in tag_values)
+        if not module.params['exclusive']:
+            unknown.update(binding['tagValue'] for existing in listings for binding in existing)
+        keys.update(lookup_tag_keys(module, sorted(unknown - set(keys))))
+
+    creations, deletions = [], []
+    for resource, existing in zip(resources, listings):
+        existing = dict((binding['tagValue'], binding) for binding in existing)
+        if module.params['state'] == 'present':
+            declared_keys = set(keys[value] for value in declared[resource])
+            if len(declared_keys) < len(declared[resource]):
+                module.fail_json(msg='%s is declared with several values of the same tag key' % resource)
+            creations.extend((resource, value) for value in sorted(declared[resource] - set(existing)))
+            deletions.extend(
+                binding for value, binding in sorted(existing.items())
+                if value not in declared[resource] and (module.params['exclusive'] or keys.get(value) in declared_keys)
+            )
+        else:
+            deletions.extend(existing[value] for value in sorted(declared[resource] & set(existing)))
+
+    if not module.check_mode:
+        # A resource holds one value per tag key: the replaced values are unbound first.
+        apply(module, [lambda binding=binding: delete(module, binding) for binding in deletions])
+        apply(module, [lambda creation=creation: create(module, *creation) for creation in creations])
+
+    result = {
+        'created': [{'resource': resource, 'tag_value': value} for resource, value in creations],
+        'deleted': [{'resource': binding['parent'], 'tag_value': binding['tagValue']} for binding in deletions]
+    }
+    result.update({'changed': bool(creations or deletions)})
+
+    module.exit_json(**result)
+
+
+def full_resource_name(resource):
+    if resource.startswith('//'):
+        return resource
+    return RESOURCE_MANAGER + resource.strip('/')
+
+
+def resolve_tag_values(module, tag_values, keys):
+    """Resolves tag values into their resource names.
+
+    The values given by namespaced name are looked up in parallel, and
+    their tag keys recorded along the way.
+
+    Args:
+        module: AnsibleModule, the ansible module.
+        tag_values: set, the tag values, by resource name or namespaced name.
+        keys: dict, the tag keys of the values, by value resource name, completed with the values looked up.
+
+    Returns:
+        dict, the resource names of the existing tag values, by given name.
+    """
+    names = dict((value, value) for value in tag_values if value.startswith('tagValues/'))
+    namespaced = sorted(tag_values - set(names))
+    found = run_concurrently(
+        lambda value: get_namespaced(module, 'tagValues', value),
+        namespaced,
+        module.params['concurrency']
+    )
+    for value, tag_value in zip(namespaced, found):
+        if tag_value:
+            names[value] = tag_value['name']
+            keys[tag_value['name']] = tag_value.get('parent')
+        elif module.params['state'] == 'present':
+            module.fail_json(msg='The tag value %s does not exist' % value)
+    return names
+
+
+def lookup_tag_keys(module, tag_values):
+    """Returns the tag keys of tag values, read in parallel.
+
+    Args:
+        module: AnsibleModule, the ansible module.
+        tag_values: list, the resource names of the tag values.
+
+    Returns:
+        dict, the resource names of the tag keys, by value, None for the values not found.
+    """
+    found = run_concurrently(lambda value: get_tag_value(module, value), tag_values, module.params['concurrency'])
+    return dict((value, tag_value.get('parent') if tag_value else None) for value, tag_value in zip(tag_values, found))
+
+
+def get_tag_value(module, name):
+    auth = GcpSession(module, 'resourcemanager')
+    return return_if_object(module, auth.get('%s/%s' % (API, name)), allow_not_found=True)['result']
+
+
+def list_bindings(module, resource):
+    auth = GcpSession(module, 'resourcemanager')
+    return auth.list(
+        collection(),
+        return_if_object,
+        params={'parent': resource, 'pageSize': TAG_BINDINGS_PAGE_SIZE},
+        array_name='tagBindings'
+    )
+
+
+def apply(module, requests):
+    """Sends requests in parallel, then waits for all their operations.
+
+    Args:
+        module: AnsibleModule, the ansible module.
+        requests: list, the functions sending each request.
+
+    Returns:
+        list, the results of the operations.
+    """
+    concurrency = module.params['concurrency']
+    responses = run_concurrently(lambda request: request(), requests, concurrency)
+    return run_concurrently(lambda response: wait_for_operation(module, response, api=API), responses, concurrency)
+
+
+def create(module, resource, tag_value):
+    auth = GcpSession(module, 'resourcemanager')
+    return auth.post(collection(), {'parent': resource, 'tagValue': tag_value})
+
+
+def delete(module, binding):
+    auth = GcpSession(module, 'resourcemanager')
+    return auth.delete(self_link(binding))
+
+
+def self_link(binding):
+    return "{api}/{name}".format(api=API, name=binding['name'])
+
+
+def collection():
+    return "{api}/tagBindings".format(api=API)
+
+
+if __name__ == '__main__':
+    main()
@@ -168,13 +168,15 @@ API = 'https://cloudresourcemanager.googleapis.com/v3'
 ################################################################################
 
 from ansible_collections.raphaeldegail.googlecloudy.plugins.module_utils.gcp_utils import (
-    return_if_object,
     wait_for_operation,
     remove_nones,
     list_differences,
     GcpSession,
     GcpModule
 )
+from ansible_collections.raphaeldegail.googlecloudy.plugins.module_utils.gcp_resourcemanager import (
+    find_tag_key
+)
 
 ################################################################################
 # Main
@@ -200,7 +202,7 @@ def main():
 
     state = module.params['state']
 
-    fetch = fetch_resource(module, collection())
+    fetch = fetch_resource(module)
     changed = False
     difference = None
 
@@ -214,8 +216,7 @@ def main():
         difference = list_differences(after, before)
         if state == 'present':
             if difference:
-                update(module, self_link(module))
-                fetch = fetch_resource(module, collection())
+                fetch = update(module, self_link(module))
                 changed = True
         else:
             delete(module, self_link(module))
@@ -234,20 +235,8 @@ def main():
     module.exit_json(**fetch)
 
 
-def fetch_resource(module, link):
-    auth = GcpSession(module, 'resourcemanager')
-    keylist = auth.list(
-        link,
-        return_if_object,
-        params={'parent': module.params['parent']},
-        array_name='tagKeys'
-    )
-    result = None
-    for key in keylist:
-        if key.get('shortName') == module.params['short_name']:
-            result = key
-
-    return result
+def fetch_resource(module):
+    return find_tag_key(module, module.params['parent'], module.params['short_name'])
 
 
 def create(module, link):
@@ -271,7 +260,7 @@ def resource_to_request(module):
         'shortName': module.params.get('short_name'),
         'description': module.params.get('description'),
         'purpose': module.params.get('purpose'),
-        'purposeData': module.params.get('purpos_data')
+        'purposeData': module.params.get('purpose_data')
     }
     return remove_nones(request)
 
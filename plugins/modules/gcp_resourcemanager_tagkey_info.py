@@ -133,10 +133,11 @@ API = 'https://cloudresourcemanager.googleapis.com/v3'
 ################################################################################
 
 from ansible_collections.raphaeldegail.googlecloudy.plugins.module_utils.gcp_utils import (
-    return_if_object,
-    GcpSession,
     GcpModule
 )
+from ansible_collections.raphaeldegail.googlecloudy.plugins.module_utils.gcp_resourcemanager import (
+    find_tag_key
+)
 
 ################################################################################
 # Main
@@ -157,7 +158,7 @@ def main():
     if not module.params['scopes']:
         module.params['scopes'] = ['https://www.googleapis.com/auth/cloud-platform']
 
-    fetch = fetch_resource(module, collection())
+    fetch = fetch_resource(module)
     changed = False
 
     if not fetch:
@@ -168,24 +169,8 @@ def main():
     module.exit_json(**fetch)
 
 
-def fetch_resource(module, link):
-    auth = GcpSession(module, 'resourcemanager')
-    keylist = auth.list(
-        link,
-        return_if_object,
-        params={'parent': module.params['parent']},
-        array_name='tagKeys'
-    )
-    result = None
-    for key in keylist:
-        if key.get('shortName') == module.params['short_name']:
-            result = key
-
-    return result
-
-
-def collection():
-    return "{api}/tagKeys".format(api=API)
+def fetch_resource(module):
+    return find_tag_key(module, module.params['parent'], module.params['short_name'])
 
 
 if __name__ == '__main__':
@@ -0,0 +1,260 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright: Raphaël de Gail
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+################################################################################
+# Documentation
+################################################################################
+
+ANSIBLE_METADATA = {'metadata_version': '1.1', 'status': ["preview"], 'supported_by': 'community'}
+
+DOCUMENTATION = '''
+---
+module: gcp_resourcemanager_tagvalue
+description:
+- Manages a tagValue.
+- A TagValue, a child of a TagKey, which can be bound to resources.
+short_description: Manages a tagValue
+extends_documentation_fragment:
+- raphaeldegail.googlecloudy.gcp
+options:
+  state:
+    description:
+    - Whether the given object should exist in GCP
+    choices:
+    - present
+    - absent
+    default: present
+    type: str
+  parent:
+    description:
+    - Immutable.
+    - The TagKey of the TagValue.
+    - Either its resource name, in the form tagKeys/{tag_key_id}, or its namespaced name,
+      in the form {org_id}/{tag_key_short_name} or {project_id}/{tag_key_short_name}.
+    required: true
+    type: str
+  short_name:
+    description:
+    - Immutable.
+    - User-assigned short name for TagValue.
+    - The short name should be unique for TagValues within the same parent TagKey.
+    - The short name must be 63 characters or less, beginning and ending with an
+      alphanumeric character ([a-z0-9A-Z]) with dashes (-), underscores (_), dots (.), and alphanumerics between.
+    required: true
+    type: str
+  description:
+    description:
+    - User-assigned description of the TagValue.
+    - Must not exceed 256 characters.
+    type: str
+'''
+
+EXAMPLES = '''
+- name: Creates a tagValue
+  raphaeldegail.googlecloudy.gcp_resourcemanager_tagvalue:
+    short_name: prod
+    parent: 1234/env
+    auth_kind: serviceaccount
+    service_account_file: "/tmp/auth.pem"
+    state: present
+
+- name: Deletes a tagValue
+  raphaeldegail.googlecloudy.gcp_resourcemanager_tagvalue:
+    short_name: prod
+    parent: tagKeys/5678
+    auth_kind: serviceaccount
+    service_account_file: "/tmp/auth.pem"
+    state: absent
+'''
+
+RETURN = '''
+name:
+  description:
+  - Immutable.
+  - Resource name for TagValue in the format tagValues/456.
+  returned: success
+  type: str
+parent:
+  description:
+  - Immutable.
+  - The resource name of the new TagValue's parent TagKey.
+  returned: success
+  type: str
+shortName:
+  description:
+  - Immutable.
+  - User-assigned short name for TagValue.
+  returned: success
+  type: str
+namespacedName:
+  description:
+  - Namespaced name of the TagValue.
+  - For example, 1234/env/prod.
+  returned: success
+  type: str
+description:
+  description:
+  - User-assigned description of the TagValue.
+  returned: success
+  type: str
+createTime:
+  description:
+  - Creation time.
+  - A timestamp in RFC3339 UTC "Zulu" format, with nanosecond resolution and up to nine fractional digits.
+  - 'Examples: "2014-10-02T15:01:23Z" and "2014-10-02T15:01:23.045123456Z".'
+  returned: success
+  type: str
+updateTime:
+  description:
+  - Update time.
+  - A timestamp in RFC3339 UTC "Zulu" format, with nanosecond resolution and up to nine fractional digits.
+  - 'Examples: "2014-10-02T15:01:23Z" and "2014-10-02T15:01:23.045123456Z".'
+  returned: success
+  type: str
+etag:
+  description:
+  - Entity tag which users can pass to prevent race conditions.
+  returned: success
+  type: str
+'''
+
+API = 'https://cloudresourcemanager.googleapis.com/v3'
+
+################################################################################
+# Imports
+################################################################################
+
+from ansible_collections.raphaeldegail.googlecloudy.plugins.module_utils.gcp_utils import (
+    wait_for_operation,
+    remove_nones,
+    list_differences,
+    GcpSession,
+    GcpModule
+)
+from ansible_collections.raphaeldegail.googlecloudy.plugins.module_utils.gcp_resourcemanager import (
+    find_tag_value,
+    get_namespaced
+)
+
+################################################################################
+# Main
+################################################################################
+
+
+def main():
+    """Main function"""
+
+    module = GcpModule(
+        argument_spec=dict(
+            state=dict(default='present', choices=['present', 'absent'], type='str'),
+            parent=dict(required=True, type='str'),
+            short_name=dict(required=True, type='str'),
+            description=dict(type='str')
+        )
+    )
+
+    if not module.params['scopes']:
+        module.params['scopes'] = ['https://www.googleapis.com/auth/cloud-platform']
+
+    state = module.params['state']
+
+    fetch = find_tag_value(module, module.params['parent'], module.params['short_name'])
+    changed = False
+    difference = None
+
+    if fetch:
+        module.params['name'] = fetch.get('name')
+        module.params['parent'] = fetch.get('parent')
+        difference = list_differences(resource_to_request(module), response_to_hash(fetch))
+        if state == 'present':
+            if difference:
+                fetch = update(module, self_link(module))
+                changed = True
+        else:
+            delete(module, self_link(module))
+            fetch = {}
+            changed = True
+    else:
+        if state == 'present':
+            resolve_parent(module)
+            fetch = create(module, collection())
+            changed = True
+        else:
+            fetch = {}
+
+    fetch.update({'changed': changed})
+    fetch.update({'diff': difference} if difference else {})
+
+    module.exit_json(**fetch)
+
+
+def resolve_parent(module):
+    """Resolves a parent tag key given by namespaced name into its resource name.
+
+    Args:
+        module: AnsibleModule, the ansible module.
+    """
+    if module.params['parent'].startswith('tagKeys/'):
+        return
+    key = get_namespaced(module, 'tagKeys', module.params['parent'])
+    if not key:
+        module.fail_json(msg='The tag key %s does not exist' % module.params['parent'])
+    module.params['parent'] = key['name']
+
+
+def create(module, link):
+    auth = GcpSession(module, 'resourcemanager')
+    return wait_for_operation(module, auth.post(link, resource_to_request(module)), api=API)
+
+
+def update(module, link):
+    auth = GcpSession(module, 'resourcemanager')
+    return wait_for_operation(
+        module,
+        auth.patch(link, resource_to_request(module), params={'updateMask': 'description'}),
+        api=API
+    )
+
+
+def delete(module, link):
+    auth = GcpSession(module, 'resourcemanager')
+    return wait_for_operation(module, auth.delete(link), api=API)
+
+
+def resource_to_request(module):
+    request = {
+        'parent': module.params.get('parent'),
+        'shortName': module.params.get('short_name'),
+        'description': module.params.get('description')
+    }
+    return remove_nones(request)
+
+
+# Remove unnecessary properties from the response.
+# This is for doing comparisons with Ansible's current parameters.
+def response_to_hash(response):
+    result = {
+        'parent': response.get('parent'),
+        'shortName': response.get('shortName'),
+        'description': response.get('description')
+    }
+    return remove_nones(result)
+
+
+def self_link(module):
+    return "{api}/{name}".format(api=API, **module.params)
+
+
+def collection():
+    return "{api}/tagValues".format(api=API)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright: Raphaël de Gail
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""Benchmarks the collection modules against a local stand-in API.
+
+Every module in plugins/modules is run through its scenario (see scenarios.py)
+at each requested data size. Each step runs in a fresh interpreter, like an
+Ansible task would, and records the number of API requests, the wall time,
+the peak RSS and the bytes transferred. Results are written as JSON and the
+request counts are compared against a stored baseline: any step making more
+calls than its baseline fails the run.
+
+The collection must be importable, i.e. checked out under
+ansible_collections/raphaeldegail/googlecloudy.
+
+Example:
+    python tests/performance/benchmark.py --sizes small,medium --output /tmp/results.json
+"""
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+COLLECTION_ROOT = os.path.dirname(os.path.dirname(HERE))
+sys.path.insert(0, HERE)
+
+from fake_api import FakeGcpApi, start_server  # noqa: E402
+from scenarios import SCENARIOS, SIZES  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(HERE, 'baseline.json')
+
+
+def collections_path():
+    """Returns the directory holding the ansible_collections package."""
+    root = os.path.dirname(os.path.dirname(os.path.dirname(COLLECTION_ROOT)))
+    if os.path.basename(os.path.dirname(os.path.dirname(COLLECTION_ROOT))) != 'ansible_collections':
+        sys.exit('The collection must be checked out under ansible_collections/raphaeldegail/googlecloudy to be benchmarked.')
+    return root
+
+
+def list_modules():
+    modules_dir = os.path.join(COLLECTION_ROOT, 'plugins', 'modules')
+    return sorted(f[:-3] for f in os.listdir(modules_dir) if f.endswith('.py') and not f.startswith('_'))
+
+
+def run_step(server, module_name, args, env, timeout):
+    """Runs one scenario step in a new interpreter.
+
+    Returns:
+        dict, the measures of the step.
+    """
+    api = server.api
+    api.reset_stats()
+    with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as f:
+        json.dump(dict({'auth_kind': 'accesstoken', 'access_token': 'benchmark-token'}, **args), f)
+    url = 'http://%s:%d' % server.server_address
+    start = time.time()
+    try:
+        process = subprocess.run(
+            [sys.executable, os.path.join(HERE, 'runner.py'), module_name, f.name, url],
+            env=env, capture_output=True, text=True, timeout=timeout
+        )
+        output = json.loads(process.stdout.strip().splitlines()[-1])
+        status = 'failed' if output['rc'] or output['result'].get('failed') else 'ok'
+    except subprocess.TimeoutExpired:
+        output, status = {'result': {}}, 'timeout'
+    except (ValueError, IndexError):
+        output, status = {'result': {'msg': process.stderr[-2000:]}}, 'failed'
+    finally:
+        os.unlink(f.name)
+    wall_time = time.time() - start
+
+    stats = api.stats
+    measure = {
+        'status': status,
+        'changed': output['result'].get('changed'),
+        'requests': stats['requests'],
+        'bytes_in': stats['bytes_in'],
+        'bytes_out': stats['bytes_out'],
+        'wall_time': round(wall_time, 4),
+        'peak_rss_kb': output.get('peak_rss_kb'),
+        'calls': stats['calls'],
+    }
+    if output.get('imported'):
+        measure['import_time'] = round(output['imported'] - output['start'], 4)
+    if stats['first_request'] and output.get('start'):
+        measure['time_to_first_request'] = round(stats['first_request'] - output['start'], 4)
+    if output.get('end'):
+        measure['module_time'] = round(output['end'] - output['start'], 4)
+    measure['loaded'] = output.get('loaded', [])
+    if status != 'ok':
+        measure['error'] = str(output['result'].get('msg', ''))[:500]
+    return measure
+
+
+def compare(results, baseline):
+    """Lists the steps whose request count went above the baseline.
+
+    Returns:
+        list, the regression messages.
+    """
+    regressions = []
+    for key, measure in sorted(results.items()):
+        expected = baseline.get(key)
+        if expected is None:
+            continue
+        if measure['status'] != 'ok' and expected.get('status', 'ok') == 'ok':
+            regressions.append('%s: status %s, baseline ok' % (key, measure['status']))
+        elif measure['requests'] > expected['requests']:
+            regressions.append('%s: %d requests, baseline %d' % (key, measure['requests'], expected['requests']))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--sizes', default='small,medium', help='comma-separated sizes among %s' % ', '.join(SIZES))
+    parser.add_argument('--modules', help='comma-separated module names, all modules by default')
+    parser.add_argument('--output', default='benchmark-results.json', help='path of the JSON results')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='path of the baseline to compare against')
+    parser.add_argument('--update-baseline', action='store_true', help='write the measured request counts to the baseline')
+    parser.add_argument('--timeout', type=int, default=900, help='timeout of a single step, in seconds')
+    options = parser.parse_args()
+
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [collections_path(), env.get('PYTHONPATH')]))
+
+    modules = options.modules.split(',') if options.modules else list_modules()
+    missing = [name for name in modules if name not in SCENARIOS]
+    if missing:
+        sys.exit('No benchmark scenario for: %s' % ', '.join(missing))
+
+    server = start_server(FakeGcpApi())
+    results = {}
+    try:
+        for module_name in modules:
+            for size in options.sizes.split(','):
+                server.api = FakeGcpApi()
+                # Each scenario starts with an empty on-disk cache.
+                with tempfile.TemporaryDirectory() as cache_dir:
+                    step_env = dict(env, GCP_CACHE_DIR=cache_dir)
+                    for step, args in SCENARIOS[module_name](server.api, SIZES[size]):
+                        key = '%s/%s/%s' % (module_name, size, step)
+                        results[key] = run_step(server, module_name, args, step_env, options.timeout)
+                        measure = results[key]
+                        print('%-70s %-7s %6d req %9.3fs %8s KB' % (
+                            key, measure['status'], measure['requests'], measure['wall_time'], measure['peak_rss_kb']
+                        ))
+    finally:
+        server.shutdown()
+
+    with open(options.output, 'w') as f:
+        json.dump({'python': sys.version.split()[0], 'timestamp': int(time.time()), 'results': results}, f, indent=2, sort_keys=True)
+
+    baseline = {}
+    if os.path.exists(options.baseline):
+        with open(options.baseline) as f:
+            baseline = json.load(f)
+
+    if options.update_baseline:
+        baseline.update({key: {'requests': m['requests'], 'status': m['status']} for key, m in results.items()})
+        with open(options.baseline, 'w') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write('\n')
+        return
+
+    regressions = compare(results, baseline)
+    if regressions:
+        print('\nRequest count regressions:\n  %s' % '\n  '.join(regressions))
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
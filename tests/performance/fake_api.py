@@ -0,0 +1,529 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright: Raphaël de Gail
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""In-memory stand-in for the Google Cloud REST APIs used by the collection.
+
+The server answers on plain HTTP and expects the original host as the first
+path segment, for example http://127.0.0.1:8080/iam.googleapis.com/v1/projects/p.
+Resources are stored per collection, so that listing a collection of 50k
+memberships stays cheap, and every request is counted with its payload size.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import itertools
+import json
+import re
+import threading
+import time
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qsl, quote
+
+# Collections whose mutations are long-running operations.
+LRO_COLLECTIONS = ('folders', 'tagKeys', 'tagValues', 'tagBindings', 'groups', 'memberships', 'workloadIdentityPools', 'providers')
+
+# The transitive membership methods of Cloud Identity, only available with Cloud Identity Premium.
+TRANSITIVE_VERBS = ('checkTransitiveMembership', 'searchTransitiveMemberships', 'searchTransitiveGroups')
+
+# Default page sizes, close to the ones documented by each API.
+DEFAULT_PAGE_SIZES = {
+    'groups': 50,
+    'memberships': 50,
+}
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# List responses holding their items under another name than the collection.
+ARRAY_NAMES = {
+    'serviceAccounts': 'accounts',
+    'providers': 'workloadIdentityPoolProviders',
+}
+
+# Search fields that are stored under another name in the resource.
+FIELD_ALIASES = {
+    'domain': 'displayName',
+}
+
+
+class FakeGcpApi(object):
+    """A minimal resource store mimicking the GCP REST semantics.
+
+    Attributes:
+        collections: dict, the resources indexed by (prefix, collection path) then by id.
+        policies: dict, the IAM policies indexed by (prefix, resource path).
+        permissions: list, the testable permissions, as returned by permissions.queryTestablePermissions.
+        transitive: bool, whether the transitive membership methods of Cloud Identity are available.
+        stats: dict, the request counters since the last reset.
+    """
+    def __init__(self):
+        """Initializes the instance with an empty store."""
+        self.collections = {}
+        self.policies = {}
+        self.permissions = []
+        self.transitive = True
+        self.lock = threading.Lock()
+        self._ids = itertools.count(100000)
+        self._version = 0
+        self._listing = (None, None)
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Resets the request counters."""
+        self.stats = {
+            'requests': 0,
+            'bytes_in': 0,
+            'bytes_out': 0,
+            'first_request': None,
+            'calls': {},
+        }
+
+    def seed(self, url, resource):
+        """Stores a resource directly, bypassing the API semantics.
+
+        Args:
+            url: str, the resource URL, for example https://iam.googleapis.com/v1/projects/p/serviceAccounts/a.
+            resource: dict, the resource body.
+
+        Returns:
+            dict, the stored resource.
+        """
+        prefix, path = split_url(url)
+        collection, _, resource_id = path.rpartition('/')
+        resource.setdefault('name', path)
+        resource.setdefault('etag', self._etag())
+        self.collections.setdefault((prefix, collection), {})[resource_id] = resource
+        self._version += 1
+        return resource
+
+    def seed_policy(self, url, bindings, version=1):
+        """Stores an IAM policy for a resource.
+
+        Args:
+            url: str, the resource URL.
+            bindings: list, the policy bindings.
+            version: int, the policy version.
+        """
+        prefix, path = split_url(url)
+        self.policies[(prefix, path)] = {'version': version, 'etag': self._etag(), 'bindings': bindings}
+
+    def handle(self, method, url, body=None):
+        """Handles one API call.
+
+        Args:
+            method: str, the HTTP method.
+            url: str, the called URL, stripped from the server address.
+            body: dict, the decoded request body.
+
+        Returns:
+            tuple, the HTTP status code and the JSON-serializable payload.
+        """
+        parts = urlsplit(url)
+        query = dict(parse_qsl(parts.query))
+        prefix, path = split_url(parts.path)
+        with self.lock:
+            resource_path, _, verb = path.rpartition(':') if ':' in path.split('/')[-1] else (path, '', '')
+            if verb:
+                return self._verb(method, prefix, resource_path, verb, query, body or {})
+            if method == 'GET':
+                return self._get(prefix, path, query)
+            if method == 'POST':
+                return self._create(prefix, path, query, body or {})
+            if method in ('PUT', 'PATCH'):
+                return self._update(prefix, path, method, body or {})
+            if method == 'DELETE':
+                return self._delete(prefix, path)
+        return 405, error(405, 'Method not allowed')
+
+    def _verb(self, method, prefix, path, verb, query, body):
+        if verb == 'getIamPolicy':
+            policy = self.policies.setdefault((prefix, path), {'version': 1, 'etag': self._etag(), 'bindings': []})
+            if query.get('fields'):
+                # A partial response, such as the etag probe of the policy journal.
+                selected = query['fields'].split(',')
+                return 200, dict((key, value) for key, value in policy.items() if key in selected)
+            return 200, policy
+        if verb == 'setIamPolicy':
+            policy = dict(body.get('policy', {}))
+            policy['etag'] = self._etag()
+            self.policies[(prefix, path)] = policy
+            return 200, policy
+        if verb == 'queryTestablePermissions':
+            size = min(int(body.get('pageSize') or DEFAULT_PAGE_SIZE), MAX_PAGE_SIZE)
+            start = int(body.get('pageToken') or 0)
+            page = {'permissions': self.permissions[start:start + size]}
+            if start + size < len(self.permissions):
+                page['nextPageToken'] = str(start + size)
+            return 200, page
+        if verb == 'lookup':
+            for group in self.collections.get((prefix, path), {}).values():
+                if group.get('groupKey', {}).get('id') == query.get('groupKey.id'):
+                    return 200, {'name': group['name']}
+            return 404, error(404, 'Group %s not found' % query.get('groupKey.id'))
+        if verb in TRANSITIVE_VERBS:
+            if not self.transitive:
+                return 403, error(403, 'Request requires Cloud Identity Premium')
+            return 200, self._transitive(prefix, path, verb, query)
+        if verb == 'search':
+            params = dict(query)
+            params.update(body)
+            return 200, self._list(prefix, path, params, search=True)
+        resource = self._find(prefix, path)
+        if resource is None:
+            return 404, error(404, 'Resource %s not found' % path)
+        if verb == 'undelete':
+            collection = path.rpartition('/')[0].split('/')[-1]
+            if collection in ('workloadIdentityPools', 'providers'):
+                resource['state'] = 'ACTIVE'
+            else:
+                resource['deleted'] = False
+            resource['etag'] = self._etag()
+            return 200, self._operation(prefix, collection, resource)
+        if verb in ('enable', 'disable'):
+            resource['disabled'] = verb == 'disable'
+            resource['etag'] = self._etag()
+            return 200, {}
+        if verb == 'getAncestry':
+            return 200, {'ancestor': self._ancestry(path, resource)}
+        if verb == 'modifyMembershipRoles':
+            removed = set(body.get('removeRoles', []))
+            roles = [role for role in resource.get('roles', []) if role.get('name') not in removed]
+            resource['roles'] = roles + body.get('addRoles', [])
+            return 200, {'membership': resource}
+        return 400, error(400, 'Unknown method %s' % verb)
+
+    def _transitive(self, prefix, path, verb, query):
+        """Answers the transitive membership methods of Cloud Identity."""
+        match = re.search(r"member_key_id == '([^']*)'", query.get('query', ''))
+        member = match.group(1) if match else None
+        if verb == 'searchTransitiveGroups':
+            items = []
+            for group in self.collections.get((prefix, 'groups'), {}).values():
+                relation = self._relations(prefix, group['name']).get(member)
+                if relation:
+                    items.append({
+                        'group': group['name'], 'groupKey': group.get('groupKey'),
+                        'labels': group.get('labels', {}), 'relationType': relation
+                    })
+        else:
+            relations = self._relations(prefix, path.rpartition('/')[0])
+            if verb == 'checkTransitiveMembership':
+                return {'hasMembership': member in relations}
+            items = [
+                {'preferredMemberKey': [{'id': key}], 'relationType': relation}
+                for key, relation in sorted(relations.items())
+            ]
+        size = min(int(query.get('pageSize') or DEFAULT_PAGE_SIZE), MAX_PAGE_SIZE)
+        start = int(query.get('pageToken') or 0)
+        page = {'memberships': items[start:start + size]}
+        if start + size < len(items):
+            page['nextPageToken'] = str(start + size)
+        return page
+
+    def _relations(self, prefix, group):
+        """Returns the relation of every member to a group, nested groups included."""
+        names = dict(
+            (resource.get('groupKey', {}).get('id'), resource['name'])
+            for resource in self.collections.get((prefix, 'groups'), {}).values()
+        )
+        relations = {}
+        seen = set([group])
+        stack = [(group, 'DIRECT')]
+        while stack:
+            current, relation = stack.pop()
+            for membership in self.collections.get((prefix, '%s/memberships' % current), {}).values():
+                key = membership['preferredMemberKey']['id']
+                relations[key] = relation if relations.get(key) in (None, relation) else 'DIRECT_AND_INDIRECT'
+                nested = names.get(key) if membership.get('type') == 'GROUP' else None
+                if nested and nested not in seen:
+                    seen.add(nested)
+                    stack.append((nested, 'INDIRECT'))
+        return relations
+
+    def _get(self, prefix, path, query):
+        resource = self._find(prefix, path)
+        if resource is not None:
+            return 200, resource
+        if path.endswith('/namespaced'):
+            collection = self.collections.get((prefix, path.rpartition('/')[0]), {})
+            for resource in collection.values():
+                if resource.get('namespacedName') == query.get('name'):
+                    return 200, resource
+            # Like the API, unknown namespaced names are reported as denied.
+            return 403, error(403, 'Permission denied on resource %s (or it may not exist)' % query.get('name'))
+        # Collections are addressed by an odd number of path segments.
+        if len(path.split('/')) % 2:
+            return 200, self._list(prefix, path, query)
+        return 404, error(404, 'Resource %s not found' % path)
+
+    def _list(self, prefix, path, params, search=False):
+        collection = path.split('/')[-1]
+        if path.startswith('billingAccounts/') and collection == 'projects':
+            return self._billing_projects(prefix, path, params)
+        if path == 'tagBindings':
+            path = tag_bindings_path(params.get('parent', ''))
+        filters = params.get('query') or params.get('filter')
+        key = (prefix, path, tuple(sorted((k, str(v)) for k, v in params.items() if k not in ('pageToken', 'pageSize'))))
+        if self._listing[0] == (key, self._version):
+            items = self._listing[1]
+        else:
+            items = [
+                resource for resource in self.collections.get((prefix, path), {}).values()
+                if resource_matches(resource, params, filters)
+            ]
+            if not params.get('showDeleted') and not search:
+                items = [item for item in items if item.get('state') != 'DELETED' or collection == 'folders']
+            self._listing = ((key, self._version), items)
+        size = min(int(params.get('pageSize') or DEFAULT_PAGE_SIZES.get(collection, DEFAULT_PAGE_SIZE)), MAX_PAGE_SIZE)
+        start = int(params.get('pageToken') or 0)
+        array_name = ARRAY_NAMES.get(collection, collection)
+        page = {array_name: select_fields(items[start:start + size], array_name, params.get('fields'))}
+        if start + size < len(items):
+            page['nextPageToken'] = str(start + size)
+        return page
+
+    def _billing_projects(self, prefix, path, params):
+        """Lists the billing info of the projects linked to a billing account."""
+        account = path.rpartition('/')[0]
+        items = [
+            resources['billingInfo'] for (store, collection_path), resources in sorted(self.collections.items())
+            if store == prefix and collection_path.startswith('projects/') and 'billingInfo' in resources
+            and resources['billingInfo'].get('billingAccountName') == account
+        ]
+        size = min(int(params.get('pageSize') or DEFAULT_PAGE_SIZE), MAX_PAGE_SIZE)
+        start = int(params.get('pageToken') or 0)
+        page = {'projectBillingInfo': items[start:start + size]}
+        if start + size < len(items):
+            page['nextPageToken'] = str(start + size)
+        return page
+
+    def _create(self, prefix, path, query, body):
+        collection = path.split('/')[-1]
+        resource_id = None
+        resource = dict(body)
+        for param, value in query.items():
+            if param.endswith('Id'):
+                resource_id = value
+        if 'roleId' in body:
+            resource_id = body['roleId']
+            resource = dict(body.get('role', {}))
+        if 'accountId' in body:
+            project = path.split('/')[1]
+            resource_id = '%s@%s.iam.gserviceaccount.com' % (body['accountId'], project)
+            resource = dict(body.get('serviceAccount', {}))
+            resource.update({'email': resource_id, 'projectId': project, 'uniqueId': str(next(self._ids))})
+        if collection == 'tagBindings':
+            # Bindings are named after their parent and value, and stored per parent.
+            path = tag_bindings_path(resource.get('parent', ''))
+            resource_id = resource.get('tagValue', '').split('/')[-1]
+        if resource_id is None:
+            resource_id = str(next(self._ids))
+        if (prefix, path) in self.collections and resource_id in self.collections[(prefix, path)]:
+            return 409, error(409, 'Resource %s/%s already exists' % (path, resource_id))
+        resource['name'] = '%s/%s' % (path, resource_id)
+        if collection in LRO_COLLECTIONS:
+            resource.setdefault('state', 'ACTIVE')
+        if collection == 'tagKeys':
+            resource['namespacedName'] = '%s/%s' % (resource.get('parent', '').split('/')[-1], resource.get('shortName'))
+        if collection == 'tagValues':
+            key = self._find(prefix, resource.get('parent', '')) or {}
+            resource['namespacedName'] = '%s/%s' % (key.get('namespacedName'), resource.get('shortName'))
+        resource['etag'] = self._etag()
+        resource['createTime'] = timestamp()
+        self.collections.setdefault((prefix, path), {})[resource_id] = resource
+        self._version += 1
+        return 200, self._operation(prefix, collection, resource)
+
+    def _update(self, prefix, path, method, body):
+        collection = path.rpartition('/')[0].split('/')[-1]
+        resource = self._find(prefix, path)
+        if resource is None:
+            if method == 'PATCH':
+                return 404, error(404, 'Resource %s not found' % path)
+            resource = self.seed('https://%s/%s' % (prefix, path), {})
+        update = body.get('serviceAccount', body) if isinstance(body, dict) else {}
+        if method == 'PUT':
+            kept = {key: resource[key] for key in ('name', 'email', 'projectId', 'uniqueId', 'state') if key in resource}
+            resource.clear()
+            resource.update(kept)
+        resource.update(update)
+        if path.endswith('/billingInfo'):
+            resource.update({'projectId': path.split('/')[1], 'billingEnabled': bool(resource.get('billingAccountName'))})
+        resource['etag'] = self._etag()
+        resource['updateTime'] = timestamp()
+        self._version += 1
+        return 200, self._operation(prefix, collection, resource)
+
+    def _delete(self, prefix, path):
+        collection_path, _, resource_id = path.rpartition('/')
+        collection = collection_path.split('/')[-1]
+        resource = self._find(prefix, path)
+        if resource is None:
+            return 404, error(404, 'Resource %s not found' % path)
+        if collection == 'folders':
+            resource['state'] = 'DELETE_REQUESTED'
+        elif collection == 'roles':
+            resource['deleted'] = True
+        elif collection in ('workloadIdentityPools', 'providers'):
+            resource['state'] = 'DELETED'
+        else:
+            del self.collections[(prefix, collection_path)][resource_id]
+        self._version += 1
+        if collection in LRO_COLLECTIONS:
+            return 200, self._operation(prefix, collection, {})
+        return 200, {}
+
+    def _operation(self, prefix, collection, resource):
+        """Wraps a resource in an already completed operation when the collection is long-running."""
+        if collection not in LRO_COLLECTIONS:
+            return resource
+        op_id = 'op-%s' % next(self._ids)
+        operation = {'name': 'operations/%s' % op_id, 'done': True, 'response': resource}
+        self.collections.setdefault((prefix, 'operations'), {})[op_id] = operation
+        return operation
+
+    def _ancestry(self, path, project):
+        """Walks up from a v1 project through the v3 folders to the organization."""
+        folders = self.collections.get(('cloudresourcemanager.googleapis.com/v3', 'folders'), {})
+        ancestors = [{'resourceId': {'type': 'project', 'id': path.split('/')[-1]}}]
+        parent = project.get('parent')
+        while parent:
+            ancestors.append({'resourceId': dict(parent)})
+            folder = folders.get(parent['id']) if parent.get('type') == 'folder' else None
+            kind, _, resource_id = (folder or {}).get('parent', '').partition('/')
+            parent = {'type': kind[:-1], 'id': resource_id} if resource_id else None
+        return ancestors
+
+    def _find(self, prefix, path):
+        collection, _, resource_id = path.rpartition('/')
+        return self.collections.get((prefix, collection), {}).get(resource_id)
+
+    def _etag(self):
+        return 'BwX%s' % next(self._ids)
+
+
+def split_url(url):
+    """Splits an URL or a server path into an API prefix and a resource path.
+
+    Args:
+        url: str, either https://host/version/path or /host/version/path.
+
+    Returns:
+        tuple, the (host/version) prefix and the relative resource path.
+    """
+    parts = urlsplit(url)
+    path = parts.path.strip('/')
+    if parts.netloc:
+        path = '%s/%s' % (parts.netloc, path)
+    host, version, rest = (path.split('/', 2) + ['', ''])[:3]
+    return '%s/%s' % (host, version), rest
+
+
+def tag_bindings_path(parent):
+    """Returns the collection path of the tag bindings of a resource, given by full name."""
+    return 'tagBindings/%s/tagValues' % quote(parent, safe='')
+
+
+def select_fields(items, collection, fields):
+    """Keeps the fields of the items selected by a projection like nextPageToken,projects(name,labels)."""
+    match = re.search(r'%s\(([^)]*)\)' % collection, fields or '')
+    if not match:
+        return items
+    selected = match.group(1).split(',')
+    return [dict((key, value) for key, value in item.items() if key in selected) for item in items]
+
+
+def resource_matches(resource, params, filters):
+    """Checks a resource against the parent parameter and a search query.
+
+    The query supports AND and OR of field=value or field:value terms, with a
+    trailing * wildcard, which covers the queries issued by the modules.
+    """
+    if params.get('parent') and resource.get('parent') and resource['parent'] != params['parent']:
+        return False
+    if not filters:
+        return True
+    for clause in re.split(r'\s+AND\s+', filters.strip('() ')):
+        alternatives = re.split(r'\s+OR\s+', clause.strip('() '))
+        if not any(term_matches(resource, term) for term in alternatives):
+            return False
+    return True
+
+
+def term_matches(resource, term):
+    match = re.match(r'^\s*([\w.]+)\s*[=:]\s*"?(.*?)"?\s*$', term)
+    if not match:
+        return False
+    field, value = match.groups()
+    actual = resource
+    for key in FIELD_ALIASES.get(field, field).split('.'):
+        actual = actual.get(key, '') if isinstance(actual, dict) else ''
+    actual = str(actual)
+    if value.endswith('*'):
+        return actual.startswith(value[:-1])
+    return actual == value
+
+
+def error(code, message):
+    return {'error': {'code': code, 'message': message}}
+
+
+def timestamp():
+    return time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+
+
+class FakeGcpHandler(BaseHTTPRequestHandler):
+    """Serves the FakeGcpApi attached to the server over HTTP."""
+    protocol_version = 'HTTP/1.1'
+
+    def _serve(self):
+        api = self.server.api
+        length = int(self.headers.get('Content-Length') or 0)
+        raw = self.rfile.read(length) if length else b''
+        try:
+            body = json.loads(raw) if raw else None
+        except ValueError:
+            body = None
+        status, payload = api.handle(self.command, self.path, body)
+        content = json.dumps(payload).encode('utf-8')
+        with api.lock:
+            stats = api.stats
+            stats['requests'] += 1
+            stats['bytes_in'] += len(raw)
+            stats['bytes_out'] += len(content)
+            if stats['first_request'] is None:
+                stats['first_request'] = time.time()
+            call = '%s %s' % (self.command, urlsplit(self.path).path.split('/')[1])
+            stats['calls'][call] = stats['calls'].get(call, 0) + 1
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=UTF-8')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _serve
+
+    def log_message(self, *args):
+        pass
+
+
+def start_server(api, port=0):
+    """Starts the stand-in API in a background thread.
+
+    Args:
+        api: FakeGcpApi, the store to serve.
+        port: int, the port to listen on, a random free port by default.
+
+    Returns:
+        ThreadingHTTPServer, the running server.
+    """
+    server = ThreadingHTTPServer(('127.0.0.1', port), FakeGcpHandler)
+    server.daemon_threads = True
+    server.api = api
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright: Raphaël de Gail
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""Runs one collection module in a fresh interpreter against the stand-in API.
+
+Usage: python runner.py <module_name> <args_file> <server_url>
+
+Every HTTPS call to a *.googleapis.com host is rewritten to the stand-in
+server. The rewrite is installed when requests.adapters is first imported, so
+that the import cost of the module and its dependencies is left untouched.
+The runner prints a single JSON document with the module result, its exit
+code, the peak RSS of the process, its start, import and end times, and the
+heavy libraries it loaded.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import time
+
+START = time.time()
+
+import contextlib  # noqa: E402
+import importlib  # noqa: E402
+import importlib.abc  # noqa: E402
+import importlib.util  # noqa: E402
+import io  # noqa: E402
+import json  # noqa: E402
+import resource  # noqa: E402
+import sys  # noqa: E402
+
+from urllib.parse import urlsplit  # noqa: E402
+
+COLLECTION = 'ansible_collections.raphaeldegail.googlecloudy'
+
+# Heavy libraries whose loading is reported, to track deferred imports.
+WATCHED_LIBRARIES = (
+    'requests',
+    'google.auth',
+    'google.auth.compute_engine',
+    'google.auth.transport.requests',
+    'google.oauth2.credentials',
+    'google.oauth2.service_account',
+)
+
+
+def redirect_adapter(adapters, server):
+    """Patches the requests HTTP adapter to send Google API calls to the server."""
+    send = adapters.HTTPAdapter.send
+
+    def rewritten_send(self, request, **kwargs):
+        parts = urlsplit(request.url)
+        if parts.scheme == 'https' and parts.hostname.endswith('googleapis.com'):
+            request.url = '%s/%s%s%s' % (server, parts.netloc, parts.path, '?' + parts.query if parts.query else '')
+        return send(self, request, **kwargs)
+
+    adapters.HTTPAdapter.send = rewritten_send
+
+
+class AdapterHook(importlib.abc.MetaPathFinder):
+    """Finder patching requests.adapters right after its first import."""
+    def __init__(self, server):
+        self.server = server
+
+    def find_spec(self, fullname, path, target=None):
+        if fullname != 'requests.adapters':
+            return None
+        sys.meta_path.remove(self)
+        spec = importlib.util.find_spec(fullname)
+        exec_module = spec.loader.exec_module
+        server = self.server
+
+        def patched_exec_module(module):
+            exec_module(module)
+            redirect_adapter(module, server)
+
+        spec.loader.exec_module = patched_exec_module
+        return spec
+
+
+def main():
+    module_name, args_file, server = sys.argv[1:4]
+    with open(args_file) as f:
+        args = json.load(f)
+
+    if 'requests.adapters' in sys.modules:
+        redirect_adapter(sys.modules['requests.adapters'], server)
+    else:
+        sys.meta_path.insert(0, AdapterHook(server))
+
+    from ansible.module_utils import basic
+    basic._ANSIBLE_ARGS = json.dumps({'ANSIBLE_MODULE_ARGS': args}).encode('utf-8')
+
+    output = io.StringIO()
+    rc = 0
+    imported = None
+    with contextlib.redirect_stdout(output):
+        try:
+            module = importlib.import_module('%s.plugins.modules.%s' % (COLLECTION, module_name))
+            imported = time.time()
+            module.main()
+        except SystemExit as e:
+            rc = e.code or 0
+        except Exception as e:  # noqa: B902 - report any module crash as a failed run
+            rc = 1
+            print(json.dumps({'failed': True, 'msg': 'Unhandled exception: %r' % e}))
+
+    try:
+        result = json.loads(output.getvalue().strip().splitlines()[-1])
+    except (ValueError, IndexError):
+        result = {'failed': True, 'msg': output.getvalue()}
+
+    print(json.dumps({
+        'rc': rc,
+        'result': result,
+        'start': START,
+        'imported': imported,
+        'end': time.time(),
+        'loaded': [name for name in WATCHED_LIBRARIES if name in sys.modules],
+        'peak_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,525 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright: Raphaël de Gail
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""Benchmark scenarios for every module of the collection.
+
+Each scenario function seeds the stand-in API for a given data size and
+returns the ordered steps to run, as (name, module arguments) pairs. Managed
+resources go through create, no-op converge, update and delete, info modules
+through a single read.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import os
+import tempfile
+
+from urllib.parse import quote
+
+RM_V1 = 'https://cloudresourcemanager.googleapis.com/v1'
+RM_V3 = 'https://cloudresourcemanager.googleapis.com/v3'
+IAM = 'https://iam.googleapis.com/v1'
+BILLING = 'https://cloudbilling.googleapis.com/v1'
+CLOUDIDENTITY = 'https://cloudidentity.googleapis.com/v1'
+
+ORG_ID = '1234'
+PROJECT_ID = 'demo'
+BILLING_ACCOUNT_ID = '0X0X0X-0X0X0X-0X0X0X'
+CUSTOMER = 'customers/C0demo'
+POOL = 'projects/%s/locations/global/workloadIdentityPools/ci' % PROJECT_ID
+DISCUSSION_FORUM = {'cloudidentity.googleapis.com/groups.discussion_forum': ''}
+
+# group_members sizes the Cloud Identity groups, policy_members the IAM policies
+# and siblings the number of resources sharing the parent of the managed one.
+SIZES = {
+    'small': {'group_members': 10, 'policy_members': 10, 'siblings': 10},
+    'medium': {'group_members': 1000, 'policy_members': 1000, 'siblings': 1000},
+    'large': {'group_members': 50000, 'policy_members': 10000, 'siblings': 10000},
+}
+
+
+def members(count, prefix='user'):
+    return ['user:%s%d@example.com' % (prefix, i) for i in range(count)]
+
+
+def managed(create, update=None, delete=True):
+    """Builds the create, no-op, update and delete steps of a managed resource."""
+    steps = [('create', create), ('noop', create)]
+    if update:
+        steps.append(('update', dict(create, **update)))
+    if delete:
+        steps.append(('delete', dict(create, state='absent')))
+    return steps
+
+
+def iam_policy(url, args):
+    """Builds the scenario of an IAM policy module."""
+    def scenario(api, size):
+        existing = members(size['policy_members'])
+        api.seed_policy(url, [{'role': 'roles/viewer', 'members': existing}])
+        create = dict(args, bindings=[{'role': 'roles/viewer', 'members': existing + ['user:new@example.com']}])
+        update = dict(args, bindings=[
+            {'role': 'roles/viewer', 'members': existing},
+            {'role': 'roles/editor', 'members': ['user:new@example.com']}
+        ])
+        delete = dict(args, bindings=[{'role': 'roles/viewer', 'members': ['user:new@example.com']}])
+        # The first journaled run records the policy, the second only probes its etag.
+        journaled = dict(create, journal_ttl=3600)
+        return [
+            ('create', create), ('noop', create), ('record', journaled), ('journaled', journaled),
+            ('update', update), ('delete', delete)
+        ]
+    return scenario
+
+
+def iam_policy_info(url, args):
+    """Builds the scenario of an IAM policy info module."""
+    def scenario(api, size):
+        api.seed_policy(url, [{'role': 'roles/viewer', 'members': members(size['policy_members'])}])
+        return [('read', args)]
+    return scenario
+
+
+def seed_folders(api, size):
+    for i in range(size['siblings']):
+        api.seed('%s/folders/%d' % (RM_V3, 1000 + i), {
+            'displayName': 'folder%d' % i, 'parent': 'organizations/%s' % ORG_ID, 'state': 'ACTIVE'
+        })
+
+
+def seed_groups(api, size):
+    for i in range(size['siblings']):
+        api.seed('%s/groups/g%d' % (CLOUDIDENTITY, i), {
+            'groupKey': {'id': 'group%d@example.com' % i}, 'parent': CUSTOMER, 'labels': DISCUSSION_FORUM
+        })
+
+
+def seed_memberships(api, size):
+    api.seed('%s/groups/g0' % CLOUDIDENTITY, {'groupKey': {'id': 'group0@example.com'}, 'parent': CUSTOMER})
+    for i in range(size['group_members']):
+        api.seed('%s/groups/g0/memberships/m%d' % (CLOUDIDENTITY, i), {
+            'preferredMemberKey': {'id': 'user%d@example.com' % i}, 'roles': [{'name': 'MEMBER'}]
+        })
+
+
+def seed_service_accounts(api, size):
+    for i in range(size['siblings']):
+        email = 'sa%d@%s.iam.gserviceaccount.com' % (i, PROJECT_ID)
+        api.seed('%s/projects/%s/serviceAccounts/%s' % (IAM, PROJECT_ID, email), {
+            'email': email, 'projectId': PROJECT_ID, 'displayName': 'sa%d' % i
+        })
+
+
+def seed_tag_keys(api, size):
+    for i in range(size['siblings']):
+        api.seed('%s/tagKeys/%d' % (RM_V3, 1000 + i), {
+            'shortName': 'key%d' % i, 'parent': 'organizations/%s' % ORG_ID,
+            'namespacedName': '%s/key%d' % (ORG_ID, i)
+        })
+
+
+def seed_tag_values(api, size):
+    for i in range(size['siblings']):
+        api.seed('%s/tagValues/%d' % (RM_V3, 2000 + i), {
+            'shortName': 'value%d' % i, 'parent': 'tagKeys/1000',
+            'namespacedName': '%s/key0/value%d' % (ORG_ID, i)
+        })
+
+
+def billing_account_iam(api, size):
+    return iam_policy('%s/billingAccounts/%s' % (BILLING, BILLING_ACCOUNT_ID), {'billing_account_id': BILLING_ACCOUNT_ID})(api, size)
+
+
+def billing_account_iam_info(api, size):
+    url = '%s/billingAccounts/%s' % (BILLING, BILLING_ACCOUNT_ID)
+    return iam_policy_info(url, {'billing_account_id': BILLING_ACCOUNT_ID})(api, size)
+
+
+def billing_accounts_info(api, size):
+    accounts = ['0X0X0X-0X0X0X-%06d' % i for i in range(max(10, size['siblings'] // 10))]
+    for i, account in enumerate(accounts):
+        api.seed('%s/billingAccounts/%s' % (BILLING, account), {
+            'displayName': 'Account %d' % i, 'open': True,
+            'masterBillingAccount': 'billingAccounts/%s' % accounts[0] if i % 2 else ''
+        })
+        api.seed_policy('%s/billingAccounts/%s' % (BILLING, account), [{'role': 'roles/billing.viewer', 'members': members(10)}])
+    for i in range(size['siblings']):
+        api.seed('%s/projects/%s%d/billingInfo' % (BILLING, PROJECT_ID, i), {
+            'projectId': '%s%d' % (PROJECT_ID, i), 'billingAccountName': 'billingAccounts/%s' % accounts[i % len(accounts)]
+        })
+    output_file = os.path.join(tempfile.gettempdir(), 'gcp_billing_accounts_info.jsonl')
+    return [('read', {}), ('stream', {'output_file': output_file})]
+
+
+def billing_association(api, size):
+    api.seed('%s/projects/%s/billingInfo' % (BILLING, PROJECT_ID), {
+        'projectId': PROJECT_ID, 'billingAccountName': '', 'billingEnabled': False
+    })
+    create = {'project_id': PROJECT_ID, 'billing_account_id': BILLING_ACCOUNT_ID}
+    return managed(create, update={'billing_account_id': '0Y0Y0Y-0Y0Y0Y-0Y0Y0Y'}, delete=False)
+
+
+def billing_associations(api, size):
+    projects = ['%s%d' % (PROJECT_ID, i) for i in range(size['siblings'])]
+    for i, project in enumerate(projects):
+        api.seed('%s/projects/%s/billingInfo' % (BILLING, project), {
+            'projectId': project, 'billingAccountName': 'billingAccounts/%s' % BILLING_ACCOUNT_ID if i % 2 else '',
+            'billingEnabled': bool(i % 2)
+        })
+    create = {'billing_account_id': BILLING_ACCOUNT_ID, 'projects': projects}
+    exclusive = dict(create, projects=projects[:len(projects) // 2], exclusive=True)
+    return [('create', create), ('noop', create), ('exclusive', exclusive), ('delete', dict(exclusive, state='absent'))]
+
+
+def billing_association_info(api, size):
+    api.seed('%s/projects/%s/billingInfo' % (BILLING, PROJECT_ID), {
+        'projectId': PROJECT_ID, 'billingAccountName': 'billingAccounts/%s' % BILLING_ACCOUNT_ID, 'billingEnabled': True
+    })
+    return [('read', {'project_id': PROJECT_ID})]
+
+
+def cloudidentity_group(api, size):
+    seed_groups(api, size)
+    create = {'group_key': {'id': 'new@example.com'}, 'parent': CUSTOMER, 'display_name': 'new', 'labels': DISCUSSION_FORUM}
+    return managed(create, update={'description': 'updated'})
+
+
+def cloudidentity_group_info(api, size):
+    seed_groups(api, size)
+    return [('read', {'group_key': {'id': 'group%d@example.com' % (size['siblings'] - 1)}, 'parent': CUSTOMER})]
+
+
+def cloudidentity_group_membership(api, size):
+    seed_memberships(api, size)
+    create = {'group_id': 'g0', 'preferred_member_key': {'id': 'new@example.com'}, 'roles': [{'name': 'MEMBER'}, {'name': 'MANAGER'}]}
+    return managed(create, update={'roles': [{'name': 'MEMBER'}, {'name': 'OWNER'}]})
+
+
+def cloudidentity_group_membership_info(api, size):
+    seed_memberships(api, size)
+    return [('read', {'group_id': 'g0', 'preferred_member_key': {'id': 'user%d@example.com' % (size['group_members'] - 1)}})]
+
+
+def cloudidentity_transitive_membership_info(api, size):
+    # The groups are nested in chains of 10, every group holding one user.
+    seed_groups(api, size)
+    for i in range(size['siblings']):
+        api.seed('%s/groups/g%d/memberships/user' % (CLOUDIDENTITY, i), {'preferredMemberKey': {'id': 'user%d@example.com' % i}, 'type': 'USER'})
+        if (i + 1) % 10:
+            api.seed('%s/groups/g%d/memberships/group' % (CLOUDIDENTITY, i), {'preferredMemberKey': {'id': 'group%d@example.com' % (i + 1)}, 'type': 'GROUP'})
+    queries = []
+    for i in range(0, min(size['siblings'], 100), 10):
+        queries.extend([
+            {'member': 'user%d@example.com' % (i + 9), 'group': 'group%d@example.com' % i},
+            {'member': 'user%d@example.com' % i, 'group': 'group%d@example.com' % (i + 1)},
+        ])
+    args = {'queries': queries, 'groups': ['group0@example.com'], 'members': ['user9@example.com'], 'customer': CUSTOMER}
+    # The first graph run lists the memberships of every group, the second one the cached memberships.
+    return [('api', args), ('graph', dict(args, mode='graph')), ('cached_graph', dict(args, mode='graph'))]
+
+
+def iam_custom_roles(api, size):
+    parents = [('organization_id', ORG_ID), ('organization_id', '5678'), ('project_id', PROJECT_ID)]
+    permissions = ['service%d.resources.get' % i for i in range(20)]
+    roles = []
+    for i in range(size['siblings']):
+        key, value = parents[i % len(parents)]
+        parent = '%ss/%s' % (key.split('_')[0], value)
+        api.seed('%s/%s/roles/role%d' % (IAM, parent, i), {
+            'title': 'Role %d' % i, 'includedPermissions': permissions, 'stage': 'GA', 'deleted': i == 1
+        })
+        roles.append({key: value, 'name': 'role%d' % i, 'title': 'Role %d' % i, 'included_permissions': list(reversed(permissions))})
+    new = [{key: value, 'name': 'newRole', 'title': 'New role', 'included_permissions': permissions[:5]} for key, value in parents]
+    create = {'roles': roles + new}
+    update = {'roles': roles + [dict(role, included_permissions=permissions[1:6]) for role in new]}
+    return managed(create, update=update)
+
+
+def iam_organization_role(api, size):
+    permissions = ['service%d.resources.get' % i for i in range(min(size['siblings'], 3000))]
+    api.permissions = [{'name': permission} for permission in permissions] + [
+        {'name': 'service%d.resources.list' % i, 'customRolesSupportLevel': 'NOT_SUPPORTED'} for i in range(size['siblings'])
+    ]
+    create = {'organization_id': ORG_ID, 'name': 'customRole', 'title': 'Custom role', 'included_permissions': permissions, 'stage': 'GA'}
+    # The first validated run reads the catalog of permissions, the second one the cached catalog.
+    validated = dict(create, included_permissions=list(reversed(permissions)), validate_permissions=True)
+    return managed(create, update={'title': 'Updated role', 'included_permissions': permissions[1:]}, delete=False) + [
+        ('catalog', validated), ('cached_catalog', validated), ('delete', dict(create, state='absent'))
+    ]
+
+
+def iam_organization_role_info(api, size):
+    api.seed('%s/organizations/%s/roles/customRole' % (IAM, ORG_ID), {
+        'title': 'Custom role', 'includedPermissions': ['service%d.resources.get' % i for i in range(min(size['siblings'], 3000))]
+    })
+    return [('read', {'organization_id': ORG_ID, 'name': 'customRole'})]
+
+
+def iam_service_account(api, size):
+    seed_service_accounts(api, size)
+    create = {'project_id': PROJECT_ID, 'name': 'newsa', 'display_name': 'New service account'}
+    return managed(create, update={'display_name': 'Updated service account', 'description': 'Deploys', 'disabled': True})
+
+
+def iam_service_accounts(api, size):
+    projects = ['%s%d' % (PROJECT_ID, i) for i in range(4)]
+    accounts = []
+    for i in range(size['siblings']):
+        project = projects[i % len(projects)]
+        email = 'sa%d@%s.iam.gserviceaccount.com' % (i, project)
+        api.seed('%s/projects/%s/serviceAccounts/%s' % (IAM, project, email), {
+            'email': email, 'projectId': project, 'displayName': 'sa%d' % i
+        })
+        accounts.append({'project_id': project, 'name': 'sa%d' % i, 'display_name': 'sa%d' % i})
+    new = [{'project_id': project, 'name': 'newsa', 'display_name': 'New service account'} for project in projects]
+    create = {'accounts': accounts + new}
+    update = {'accounts': accounts + [dict(account, description='Updated service account') for account in new]}
+    return managed(create, update=update)
+
+
+def iam_service_account_info(api, size):
+    seed_service_accounts(api, size)
+    listing = {'projects': [PROJECT_ID], 'name_regex': r'sa\d*1$', 'fields': ['displayName', 'disabled']}
+    return [('read', {'project_id': PROJECT_ID, 'name': 'sa0'}), ('list', listing)]
+
+
+def iam_service_account_iam(api, size):
+    seed_service_accounts(api, size)
+    email = 'sa0@%s.iam.gserviceaccount.com' % PROJECT_ID
+    url = '%s/projects/%s/serviceAccounts/%s' % (IAM, PROJECT_ID, email)
+    return iam_policy(url, {'project_id': PROJECT_ID, 'service_account_id': email})(api, size)
+
+
+def iam_service_account_iam_info(api, size):
+    seed_service_accounts(api, size)
+    email = 'sa0@%s.iam.gserviceaccount.com' % PROJECT_ID
+    url = '%s/projects/%s/serviceAccounts/%s' % (IAM, PROJECT_ID, email)
+    return iam_policy_info(url, {'project_id': PROJECT_ID, 'service_account_id': email})(api, size)
+
+
+def iam_service_accounts_iam(api, size):
+    seed_service_accounts(api, size)
+    principals = 'principalSet://iam.googleapis.com/%s/*' % POOL
+    for i in range(0, size['siblings'], 2):
+        url = '%s/projects/%s/serviceAccounts/sa%d@%s.iam.gserviceaccount.com' % (IAM, PROJECT_ID, i, PROJECT_ID)
+        api.seed_policy(url, [{'role': 'roles/iam.workloadIdentityUser', 'members': [principals]}])
+    create = {'project_id': PROJECT_ID, 'name_prefix': 'sa', 'bindings': [
+        {'role': 'roles/iam.workloadIdentityUser', 'members': [principals]}
+    ]}
+    update = dict(create, bindings=create['bindings'] + [{'role': 'roles/iam.serviceAccountTokenCreator', 'members': ['user:ci@example.com']}])
+    return [('create', create), ('noop', create), ('update', update), ('delete', dict(update, state='absent'))]
+
+
+def iam_workload_identity_pool(api, size):
+    create = {'project_id': PROJECT_ID, 'name': 'ci', 'display_name': 'CI pool'}
+    return managed(create, update={'description': 'Pool for the CI systems'})
+
+
+def iam_workload_identity_pool_providers(api, size):
+    api.seed('%s/%s' % (IAM, POOL), {'displayName': 'CI pool', 'state': 'ACTIVE'})
+    for i in range(size['siblings']):
+        api.seed('%s/%s/providers/p%d' % (IAM, POOL, i), {
+            'state': 'DELETED' if i == 1 else 'ACTIVE', 'attributeMapping': {'google.subject': 'assertion.sub'},
+            'oidc': {'issuerUri': 'https://issuer%d.example.com' % i}
+        })
+    providers = [
+        {'name': 'p%d' % i, 'attribute_mapping': {'google.subject': 'assertion.sub'},
+         'oidc': {'issuer_uri': 'https://issuer%d.example.com' % i}}
+        for i in range(15)
+    ]
+    create = {'project_id': PROJECT_ID, 'name': 'ci', 'display_name': 'CI pool', 'providers': providers}
+    update = dict(create, providers=[dict(provider, description='CI system') for provider in providers])
+    return [('create', create), ('noop', create), ('update', update), ('delete', dict(update, state='absent'))]
+
+
+def iam_workload_identity_pool_info(api, size):
+    api.seed('%s/%s' % (IAM, POOL), {'displayName': 'CI pool', 'state': 'ACTIVE'})
+    return [('read', {'project_id': PROJECT_ID, 'name': 'ci'})]
+
+
+def iam_workload_identity_provider(api, size):
+    api.seed('%s/%s' % (IAM, POOL), {'displayName': 'CI pool', 'state': 'ACTIVE'})
+    create = {
+        'pool_name': POOL, 'name': 'github', 'display_name': 'GitHub',
+        'attribute_mapping': {'google.subject': 'assertion.sub'},
+        'oidc': {'issuer_uri': 'https://token.actions.githubusercontent.com'}
+    }
+    aws = {'pool_name': POOL, 'name': 'aws', 'aws': {'account_id': '123456789012'}}
+    return managed(create, update={'description': 'GitHub Actions'}) + [('create_aws', aws), ('noop_aws', aws)]
+
+
+def iam_workload_identity_provider_info(api, size):
+    api.seed('%s/%s/providers/github' % (IAM, POOL), {
+        'displayName': 'GitHub', 'state': 'ACTIVE', 'oidc': {'issuerUri': 'https://token.actions.githubusercontent.com'}
+    })
+    return [('read', {'pool_name': POOL, 'name': 'github'})]
+
+
+def resourcemanager_folder(api, size):
+    seed_folders(api, size)
+    path = {'path': 'organizations/%s/folder0/Platform/Prod/Data' % ORG_ID}
+    create = {'parent': 'organizations/%s' % ORG_ID, 'display_name': 'newfolder'}
+    # A deleted folder is only pending deletion and must not stand for the folder created again.
+    return managed(create) + [
+        ('recreate', create), ('create_path', path), ('noop_path', path), ('delete_path', dict(path, state='absent'))
+    ]
+
+
+def resourcemanager_folder_info(api, size):
+    seed_folders(api, size)
+    return [
+        ('read', {'parent': 'organizations/%s' % ORG_ID, 'display_name': 'folder%d' % (size['siblings'] - 1)}),
+        ('read_by_id', {'folder_id': '1000'}),
+    ]
+
+
+def resourcemanager_folder_tree(api, size):
+    seed_folders(api, size)
+    for i in range(3):
+        api.seed('%s/folders/%d' % (RM_V3, 900 + i), {'displayName': 'legacy%d' % i, 'parent': 'folders/1000', 'state': 'ACTIVE'})
+    tree = [
+        {'display_name': 'team%d' % i, 'folders': [
+            {'display_name': env, 'folders': [{'display_name': 'data'}, {'display_name': 'web'}]}
+            for env in ('prod', 'dev')
+        ]}
+        for i in range(5)
+    ]
+    create = {'parent': 'folders/1000', 'folders': tree}
+    return managed(create, update={'folders': tree + [{'display_name': 'sandbox'}], 'prune': True}, delete=False)
+
+
+def resourcemanager_effective_iam_info(api, size):
+    projects = ['project%d' % i for i in range(10)]
+    for i, project in enumerate(projects):
+        folder = 1000 + i % 2
+        api.seed('%s/folders/%d' % (RM_V3, folder), {'displayName': 'folder%d' % folder, 'parent': 'folders/900', 'state': 'ACTIVE'})
+        api.seed('%s/projects/%s' % (RM_V1, project), {'projectId': project, 'parent': {'type': 'folder', 'id': str(folder)}})
+        api.seed_policy('%s/projects/%s' % (RM_V1, project), [{'role': 'roles/editor', 'members': ['user:jane@example.com']}])
+    api.seed('%s/folders/900' % RM_V3, {'displayName': 'root', 'parent': 'organizations/%s' % ORG_ID, 'state': 'ACTIVE'})
+    api.seed_policy('%s/folders/1000' % RM_V3, [{'role': 'roles/viewer', 'members': members(size['policy_members'])}])
+    api.seed_policy('%s/organizations/%s' % (RM_V1, ORG_ID), [
+        {'role': 'roles/browser', 'members': ['domain:example.com']},
+        {'role': 'roles/owner', 'members': members(size['policy_members'], 'admin')}
+    ])
+    read = {'projects': projects, 'members': ['user:user0@example.com', 'user:jane@example.com', 'user:admin1@example.com']}
+    return [('read', read)]
+
+
+def resourcemanager_iam_export_info(api, size):
+    api.seed_policy('%s/organizations/%s' % (RM_V1, ORG_ID), [{'role': 'roles/viewer', 'members': members(size['policy_members'])}])
+    for i in range(max(10, size['siblings'] // 10)):
+        folder, number, project = 1000 + i, 5000 + i, 'project%d' % i
+        api.seed('%s/folders/%d' % (RM_V3, folder), {'displayName': 'folder%d' % i, 'parent': 'organizations/%s' % ORG_ID, 'state': 'ACTIVE'})
+        api.seed('%s/projects/%d' % (RM_V3, number), {'projectId': project, 'parent': 'folders/%d' % folder, 'state': 'ACTIVE'})
+        api.seed_policy('%s/projects/%s' % (RM_V1, number), [{'role': 'roles/editor', 'members': ['user:jane@example.com']}])
+        email = 'ci@%s.iam.gserviceaccount.com' % project
+        api.seed('%s/projects/%s/serviceAccounts/%s' % (IAM, project, email), {'email': email, 'projectId': project})
+    seed_tag_keys(api, {'siblings': 10})
+    database = os.path.join(tempfile.gettempdir(), 'gcp_resourcemanager_iam_export_info.db')
+    if os.path.exists(database):
+        os.unlink(database)
+    read = {'organization_id': ORG_ID, 'database': database}
+    return [('read', read), ('refresh', read)]
+
+
+def resourcemanager_organization_info(api, size):
+    api.seed('%s/organizations/%s' % (RM_V1, ORG_ID), {'displayName': 'example.com', 'owner': {'directoryCustomerId': 'C0demo'}})
+    api.seed('%s/organizations/5678' % RM_V1, {'displayName': 'example.org', 'owner': {'directoryCustomerId': 'C0other'}})
+    read = {'domain': ['example.com', 'example.org', 'example.net']}
+    return [('read', read), ('cached', read)]
+
+
+def resourcemanager_project_info(api, size):
+    for i in range(size['siblings']):
+        api.seed('%s/projects/%d' % (RM_V3, 5000 + i), {
+            'projectId': 'project%d' % i, 'displayName': 'Project %d' % i, 'parent': 'folders/1000',
+            'labels': {'env': 'prod' if i % 2 else 'dev', 'team': 'team%d' % (i % 5)}, 'state': 'ACTIVE'
+        })
+    read = {'parent': 'folders/1000', 'labels': {'env': 'prod'}, 'state': 'ACTIVE', 'fields': ['name', 'projectId']}
+    output_file = os.path.join(tempfile.gettempdir(), 'gcp_resourcemanager_project_info.jsonl')
+    return [('read', read), ('stream', {'parent': 'folders/1000', 'output_file': output_file})]
+
+
+def resourcemanager_tagkey(api, size):
+    seed_tag_keys(api, size)
+    create = {'parent': 'organizations/%s' % ORG_ID, 'short_name': 'env'}
+    return managed(create, update={'description': 'Environment of the resource'})
+
+
+def resourcemanager_tagkey_info(api, size):
+    seed_tag_keys(api, size)
+    return [('read', {'parent': 'organizations/%s' % ORG_ID, 'short_name': 'key%d' % (size['siblings'] - 1)})]
+
+
+def resourcemanager_tagvalue(api, size):
+    seed_tag_keys(api, size)
+    seed_tag_values(api, size)
+    create = {'parent': '%s/key0' % ORG_ID, 'short_name': 'prod'}
+    return managed(create, update={'description': 'Production resources'})
+
+
+def resourcemanager_tagbindings(api, size):
+    seed_tag_keys(api, size)
+    seed_tag_values(api, size)
+    projects = ['//cloudresourcemanager.googleapis.com/projects/%d' % (5000 + i) for i in range(max(10, size['siblings'] // 10))]
+    for project in projects[::2]:
+        api.seed('%s/tagBindings/%s/tagValues/2000' % (RM_V3, quote(project, safe='')), {
+            'parent': project, 'tagValue': 'tagValues/2000'
+        })
+    create = {'bindings': [{'resource': project, 'tag_value': '%s/key0/value0' % ORG_ID} for project in projects]}
+    # The values of the same tag key are replaced without exclusive.
+    update = {'bindings': [{'resource': project, 'tag_value': 'tagValues/2001'} for project in projects]}
+    return [('create', create), ('noop', create), ('update', update), ('exclusive', dict(update, exclusive=True)),
+            ('delete', dict(update, state='absent'))]
+
+
+SCENARIOS = {
+    'gcp_billing_account_iam': billing_account_iam,
+    'gcp_billing_account_iam_info': billing_account_iam_info,
+    'gcp_billing_accounts_info': billing_accounts_info,
+    'gcp_billing_association': billing_association,
+    'gcp_billing_association_info': billing_association_info,
+    'gcp_billing_associations': billing_associations,
+    'gcp_cloudidentity_group': cloudidentity_group,
+    'gcp_cloudidentity_group_info': cloudidentity_group_info,
+    'gcp_cloudidentity_group_membership': cloudidentity_group_membership,
+    'gcp_cloudidentity_group_membership_info': cloudidentity_group_membership_info,
+    'gcp_cloudidentity_transitive_membership_info': cloudidentity_transitive_membership_info,
+    'gcp_iam_custom_roles': iam_custom_roles,
+    'gcp_iam_organization_role': iam_organization_role,
+    'gcp_iam_organization_role_info': iam_organization_role_info,
+    'gcp_iam_service_account': iam_service_account,
+    'gcp_iam_service_account_iam': iam_service_account_iam,
+    'gcp_iam_service_account_iam_info': iam_service_account_iam_info,
+    'gcp_iam_service_account_info': iam_service_account_info,
+    'gcp_iam_service_accounts': iam_service_accounts,
+    'gcp_iam_service_accounts_iam': iam_service_accounts_iam,
+    'gcp_iam_workload_identity_pool': iam_workload_identity_pool,
+    'gcp_iam_workload_identity_pool_info': iam_workload_identity_pool_info,
+    'gcp_iam_workload_identity_pool_providers': iam_workload_identity_pool_providers,
+    'gcp_iam_workload_identity_provider': iam_workload_identity_provider,
+    'gcp_iam_workload_identity_provider_info': iam_workload_identity_provider_info,
+    'gcp_resourcemanager_effective_iam_info': resourcemanager_effective_iam_info,
+    'gcp_resourcemanager_folder': resourcemanager_folder,
+    'gcp_resourcemanager_folder_iam': iam_policy('%s/folders/%s' % (RM_V3, ORG_ID), {'folder_id': ORG_ID}),
+    'gcp_resourcemanager_folder_iam_info': iam_policy_info('%s/folders/%s' % (RM_V3, ORG_ID), {'folder_id': ORG_ID}),
+    'gcp_resourcemanager_folder_info': resourcemanager_folder_info,
+    'gcp_resourcemanager_folder_tree': resourcemanager_folder_tree,
+    'gcp_resourcemanager_iam_export_info': resourcemanager_iam_export_info,
+    'gcp_resourcemanager_organization_iam': iam_policy('%s/organizations/%s' % (RM_V1, ORG_ID), {'organization_id': ORG_ID}),
+    'gcp_resourcemanager_organization_iam_info': iam_policy_info('%s/organizations/%s' % (RM_V1, ORG_ID), {'organization_id': ORG_ID}),
+    'gcp_resourcemanager_organization_info': resourcemanager_organization_info,
+    'gcp_resourcemanager_project_iam': iam_policy('%s/projects/%s' % (RM_V1, PROJECT_ID), {'project_id': PROJECT_ID}),
+    'gcp_resourcemanager_project_iam_info': iam_policy_info('%s/projects/%s' % (RM_V1, PROJECT_ID), {'project_id': PROJECT_ID}),
+    'gcp_resourcemanager_project_info': resourcemanager_project_info,
+    'gcp_resourcemanager_tagkey': resourcemanager_tagkey,
+    'gcp_resourcemanager_tagkey_iam': iam_policy('%s/tagKeys/1000' % RM_V3, {'tagkey_id': '1000'}),
+    'gcp_resourcemanager_tagkey_iam_info': iam_policy_info('%s/tagKeys/1000' % RM_V3, {'tagkey_id': '1000'}),
+    'gcp_resourcemanager_tagkey_info': resourcemanager_tagkey_info,
+    'gcp_resourcemanager_tagbindings': resourcemanager_tagbindings,
+    'gcp_resourcemanager_tagvalue': resourcemanager_tagvalue,
+}
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright: Raphaël de Gail
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""Measures the startup cost of the collection modules.
+
+For every module, the idempotent step of its scenario (no-op converge or
+read) is run several times in a fresh interpreter against the stand-in API,
+and the median of the following is reported:
+- import_time: from interpreter start to the module being imported
+- time_to_first_request: from interpreter start to the first API request
+- failed_validation_time: the whole module run when its arguments are invalid
+
+The heavy libraries loaded by each kind of run are listed as well, so that a
+regression on deferred imports shows up directly.
+
+Example:
+    python tests/performance/startup.py --repeat 5 --output /tmp/startup.json
+"""
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import argparse
+import json
+import os
+import statistics
+import sys
+
+# The script directory is inserted unresolved, so that the benchmark module
+# finds the collection through a symlinked ansible_collections tree as well.
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from benchmark import collections_path, list_modules, run_step  # noqa: E402
+from fake_api import FakeGcpApi, start_server  # noqa: E402
+from scenarios import SCENARIOS, SIZES  # noqa: E402
+
+
+def median(measures, key):
+    values = [measure[key] for measure in measures if measure.get(key) is not None]
+    return round(statistics.median(values), 4) if values else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--modules', help='comma-separated module names, all modules by default')
+    parser.add_argument('--repeat', type=int, default=5, help='number of runs per measure')
+    parser.add_argument('--output', default='startup-results.json', help='path of the JSON results')
+    options = parser.parse_args()
+
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [collections_path(), env.get('PYTHONPATH')]))
+    modules = options.modules.split(',') if options.modules else list_modules()
+
+    server = start_server(FakeGcpApi())
+    results = {}
+    try:
+        for module_name in modules:
+            server.api = FakeGcpApi()
+            steps = SCENARIOS[module_name](server.api, SIZES['small'])
+            for step, args in steps:
+                if step in ('noop', 'read'):
+                    break
+                run_step(server, module_name, args, env, 300)
+            runs = [run_step(server, module_name, args, env, 300) for i in range(options.repeat)]
+            invalid = [run_step(server, module_name, {}, env, 300) for i in range(options.repeat)]
+            results[module_name] = {
+                'import_time': median(runs, 'import_time'),
+                'time_to_first_request': median(runs, 'time_to_first_request'),
+                'failed_validation_time': median(invalid, 'module_time'),
+                'loaded': runs[-1]['loaded'],
+                'loaded_on_failed_validation': invalid[-1]['loaded'],
+            }
+            print('%-45s import %.3fs  first request %.3fs  failed validation %.3fs' % (
+                module_name,
+                results[module_name]['import_time'],
+                results[module_name]['time_to_first_request'],
+                results[module_name]['failed_validation_time'],
+            ))
+    finally:
+        server.shutdown()
+
+    with open(options.output, 'w') as f:
+        json.dump({'python': sys.version.split()[0], 'results': results}, f, indent=2, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main()
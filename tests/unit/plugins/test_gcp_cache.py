@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright: Raphaël de Gail
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+import shutil
+import tempfile
+import time
+import unittest
+
+from ansible_collections.raphaeldegail.googlecloudy.plugins.module_utils.gcp_cache import DiskCache, PolicyJournal
+
+__metaclass__ = type
+
+
+class DiskCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_stores_entries(self):
+        DiskCache('demo', 60, self.directory).store({'a': {'name': 'organizations/1'}})
+        DiskCache('demo', 60, self.directory).store({'b': {'name': 'organizations/2'}})
+        self.assertEqual(
+            DiskCache('demo', 60, self.directory).lookup(['a', 'b', 'c']),
+            {'a': {'name': 'organizations/1'}, 'b': {'name': 'organizations/2'}}
+        )
+
+    def test_expires_entries(self):
+        cache = DiskCache('demo', 60, self.directory)
+        cache.store({'a': 1})
+        cache.ttl = 0.001
+        time.sleep(0.01)
+        self.assertEqual(cache.lookup(['a']), {})
+
+    def test_disabled(self):
+        cache = DiskCache('demo', 0, self.directory)
+        cache.store({'a': 1})
+        self.assertEqual(DiskCache('demo', 60, self.directory).lookup(['a']), {})
+
+
+class PolicyJournalTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.policy = {'policy': {'bindings': [{'role': 'roles/viewer', 'members': ['user:a@example.com']}]}}
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_unchanged(self):
+        PolicyJournal('projects/demo', self.policy, 60, self.directory).record('BwX1')
+        journal = PolicyJournal('projects/demo', self.policy, 60, self.directory)
+        self.assertEqual(journal.unchanged(lambda: 'BwX1'), 'BwX1')
+        self.assertIsNone(journal.unchanged(lambda: 'BwX2'))
+
+    def test_declaration_changed(self):
+        PolicyJournal('projects/demo', self.policy, 60, self.directory).record('BwX1')
+        journal = PolicyJournal('projects/demo', {'policy': {'bindings': []}}, 60, self.directory)
+        self.assertIsNone(journal.unchanged(lambda: self.fail('The etag should not be probed')))
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright: Raphaël de Gail
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+import unittest
+
+from ansible_collections.raphaeldegail.googlecloudy.plugins.module_utils.gcp_cloudidentity import (
+    parent_groups,
+    transitive_groups,
+    transitive_members
+)
+
+__metaclass__ = type
+
+# all@ holds eng@ and jane@; eng@ holds jane@, john@ and ops@; ops@ holds eng@ back.
+MEMBERSHIPS = {
+    'groups/all': [['eng@example.com', 'GROUP'], ['jane@example.com', 'USER']],
+    'groups/eng': [['jane@example.com', 'USER'], ['john@example.com', 'USER'], ['ops@example.com', 'GROUP']],
+    'groups/ops': [['eng@example.com', 'GROUP'], ['bob@example.com', 'USER']],
+}
+NAMES = {'all@example.com': 'groups/all', 'eng@example.com': 'groups/eng', 'ops@example.com': 'groups/ops'}
+
+
+class TransitiveMembersTestCase(unittest.TestCase):
+    def test_relations(self):
+        self.assertEqual(transitive_members(MEMBERSHIPS, NAMES, 'groups/all'), {
+            'eng@example.com': 'DIRECT_AND_INDIRECT',
+            'jane@example.com': 'DIRECT_AND_INDIRECT',
+            'john@example.com': 'INDIRECT',
+            'ops@example.com': 'INDIRECT',
+            'bob@example.com': 'INDIRECT',
+        })
+
+    def test_unknown_group(self):
+        self.assertEqual(transitive_members(MEMBERSHIPS, NAMES, 'groups/none'), {})
+
+
+class TransitiveGroupsTestCase(unittest.TestCase):
+    def test_relations(self):
+        emails = dict((name, email) for email, name in NAMES.items())
+        self.assertEqual(transitive_groups(parent_groups(MEMBERSHIPS), emails, 'john@example.com'), {
+            'groups/eng': 'DIRECT_AND_INDIRECT',
+            'groups/ops': 'INDIRECT',
+            'groups/all': 'INDIRECT',
+        })
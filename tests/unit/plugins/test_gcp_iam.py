@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright: Raphaël de Gail
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from ansible_collections.raphaeldegail.googlecloudy.plugins.module_utils.gcp_cache import DiskCache
+from ansible_collections.raphaeldegail.googlecloudy.plugins.module_utils.gcp_iam import (
+    full_resource_name,
+    permission_catalog,
+    permission_changes,
+    PERMISSIONS_NAMESPACE
+)
+
+__metaclass__ = type
+
+
+class PermissionChangesTestCase(unittest.TestCase):
+    def test_ignores_order_and_duplicates(self):
+        self.assertEqual(permission_changes(['b.c.get', 'a.b.get', 'a.b.get'], ['a.b.get', 'b.c.get']), ([], []))
+
+    def test_added_and_removed(self):
+        self.assertEqual(
+            permission_changes(['a.b.get', 'a.b.list'], ['a.b.get', 'a.b.delete', 'a.b.create']),
+            (['a.b.list'], ['a.b.create', 'a.b.delete'])
+        )
+
+
+class PermissionCatalogTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        os.environ['GCP_CACHE_DIR'] = self.directory
+
+    def tearDown(self):
+        del os.environ['GCP_CACHE_DIR']
+        shutil.rmtree(self.directory)
+
+    def test_serves_cached_catalog(self):
+        DiskCache(PERMISSIONS_NAMESPACE, 60).store({full_resource_name('organizations/1234'): ['a.b.get']})
+        # A cached catalog is served without any request, hence without module.
+        self.assertEqual(permission_catalog(None, 'organizations/1234', 60), set(['a.b.get']))
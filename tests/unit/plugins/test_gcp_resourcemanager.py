@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright: Raphaël de Gail
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+import time
+import unittest
+
+from ansible_collections.raphaeldegail.googlecloudy.plugins.module_utils.gcp_resourcemanager import (
+    find_folder,
+    index_folder,
+    list_folders,
+    split_folder_path,
+    _FOLDER_INDEX
+)
+
+__metaclass__ = type
+
+
+class FolderPathTestCase(unittest.TestCase):
+    def test_split(self):
+        self.assertEqual(
+            split_folder_path('organizations/1234/Platform/Prod/Data'),
+            ('organizations/1234', ['Platform', 'Prod', 'Data'])
+        )
+
+    def test_split_root(self):
+        self.assertEqual(split_folder_path('folders/5678/'), ('folders/5678', []))
+
+    def test_split_invalid(self):
+        with self.assertRaises(ValueError):
+            split_folder_path('projects/demo/Data')
+
+
+class FolderIndexTestCase(unittest.TestCase):
+    def setUp(self):
+        _FOLDER_INDEX['folders/1'] = (time.time(), {
+            'Data': {'name': 'folders/2', 'parent': 'folders/1', 'displayName': 'Data', 'state': 'ACTIVE'},
+            'Web': {'name': 'folders/3', 'parent': 'folders/1', 'displayName': 'Web', 'state': 'DELETE_REQUESTED'},
+        })
+
+    def tearDown(self):
+        _FOLDER_INDEX.clear()
+
+    def test_lists_active_folders(self):
+        self.assertEqual([folder['name'] for folder in list_folders(None, 'folders/1')], ['folders/2'])
+
+    def test_indexes_renamed_folder(self):
+        index_folder({'name': 'folders/2', 'parent': 'folders/1', 'displayName': 'Lake', 'state': 'ACTIVE'})
+        self.assertEqual(sorted(_FOLDER_INDEX['folders/1'][1]), ['Lake', 'Web'])
+
+    def test_ignores_deleted_folder(self):
+        self.assertIsNone(find_folder(None, 'folders/1', 'Web'))
+
+    def test_recreates_deleted_folder(self):
+        # Created, deleted then created again: only the new folder is found.
+        index_folder({'name': 'folders/4', 'parent': 'folders/1', 'displayName': 'Lake', 'state': 'ACTIVE'})
+        index_folder({'name': 'folders/4', 'parent': 'folders/1', 'displayName': 'Lake', 'state': 'DELETE_REQUESTED'})
+        self.assertIsNone(find_folder(None, 'folders/1', 'Lake'))
+        index_folder({'name': 'folders/5', 'parent': 'folders/1', 'displayName': 'Lake', 'state': 'ACTIVE'})
+        self.assertEqual(find_folder(None, 'folders/1', 'Lake')['name'], 'folders/5')
+
+    def test_indexes_created_folder(self):
+        index_folder({'name': 'folders/4', 'parent': 'folders/1', 'displayName': 'Web', 'state': 'ACTIVE'})
+        self.assertEqual(_FOLDER_INDEX['folders/1'][1]['Web']['name'], 'folders/4')
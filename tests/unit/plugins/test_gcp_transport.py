@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright: Raphaël de Gail
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import requests
+
+from ansible_collections.raphaeldegail.googlecloudy.plugins.module_utils.gcp_transport import (
+    RecordingSession,
+    ReplaySession,
+    replay_session
+)
+
+__metaclass__ = type
+
+
+class FakeSession(object):
+    """Answers every request with a counter, to tell responses apart."""
+    def __init__(self):
+        self.calls = 0
+
+    def request(self, method, url, **kwargs):
+        self.calls += 1
+        response = requests.Response()
+        response.status_code = 200
+        response.url = url
+        response.headers['Content-Type'] = 'application/json'
+        response._content = json.dumps({'call': self.calls, 'method': method}).encode('utf-8')
+        return response
+
+
+class FakeModule(object):
+    """Stands for a module run, failing like AnsibleModule."""
+    def fail_json(self, msg):
+        raise SystemExit(msg)
+
+
+class RecordReplayTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def record(self, cassette, calls):
+        session = RecordingSession(FakeSession(), cassette)
+        for method, url, kwargs in calls:
+            session.request(method, url, **kwargs)
+
+    def test_replay_serves_recorded_responses(self):
+        cassette = os.path.join(self.directory, 'cassette.jsonl')
+        self.record(cassette, [
+            ('GET', 'https://iam.googleapis.com/v1/projects/p/serviceAccounts', {'params': {'pageSize': 10}}),
+            ('POST', 'https://iam.googleapis.com/v1/projects/p/serviceAccounts', {'json': {'accountId': 'a'}}),
+        ])
+        session = ReplaySession(cassette, scale=0)
+        response = session.request('POST', 'https://iam.googleapis.com/v1/projects/p/serviceAccounts', json={'accountId': 'a'})
+        self.assertEqual(response.json(), {'call': 2, 'method': 'POST'})
+        response = session.request('GET', 'https://iam.googleapis.com/v1/projects/p/serviceAccounts', params={'pageSize': 10})
+        self.assertEqual(response.json(), {'call': 1, 'method': 'GET'})
+        self.assertEqual(response.request.method, 'GET')
+
+    def test_replay_keeps_recorded_order(self):
+        cassette = os.path.join(self.directory, 'cassette.jsonl.gz')
+        operation = ('GET', 'https://cloudresourcemanager.googleapis.com/v3/operations/op1', {})
+        self.record(cassette, [operation, operation, operation])
+        session = ReplaySession(cassette, scale=0)
+        calls = [session.request('GET', operation[1]).json()['call'] for i in range(4)]
+        self.assertEqual(calls, [1, 2, 3, 3])
+
+    def test_replay_falls_back_on_url(self):
+        cassette = os.path.join(self.directory, 'cassette.jsonl')
+        self.record(cassette, [('POST', 'https://iam.googleapis.com/v1/roles:search', {'json': {'etag': 'a'}})])
+        session = ReplaySession(cassette, scale=0)
+        response = session.request('POST', 'https://iam.googleapis.com/v1/roles:search', json={'etag': 'b'})
+        self.assertEqual(response.json()['call'], 1)
+
+    def test_replay_fails_on_unknown_request(self):
+        cassette = os.path.join(self.directory, 'cassette.jsonl')
+        self.record(cassette, [('GET', 'https://iam.googleapis.com/v1/projects/p', {})])
+        session = ReplaySession(cassette, scale=0)
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            session.request('GET', 'https://iam.googleapis.com/v1/projects/q')
+
+    def test_replay_starts_over_every_run(self):
+        cassette = os.path.join(self.directory, 'cassette.jsonl')
+        operation = ('GET', 'https://cloudresourcemanager.googleapis.com/v3/operations/op1', {})
+        self.record(cassette, [operation, operation])
+        for module in (FakeModule(), FakeModule()):
+            session = replay_session(module, cassette, 0)
+            self.assertIs(replay_session(module, cassette, 0), session)
+            self.assertEqual([session.request('GET', operation[1]).json()['call'] for i in range(2)], [1, 2])
+
+    def test_replay_fails_on_missing_cassette(self):
+        cassette = os.path.join(self.directory, 'missing.jsonl')
+        with self.assertRaisesRegex(SystemExit, 'missing.jsonl'):
+            replay_session(FakeModule(), cassette, 0)
+
+    def test_recording_skips_headers(self):
+        cassette = os.path.join(self.directory, 'cassette.jsonl')
+        self.record(cassette, [('GET', 'https://iam.googleapis.com/v1/projects/p', {'headers': {'Authorization': 'Bearer secret'}})])
+        with open(cassette) as f:
+            self.assertNotIn('secret', f.read())
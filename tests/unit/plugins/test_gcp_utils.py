@@ -18,11 +18,20 @@
 
 from __future__ import absolute_import, division, print_function
 
+import json
+import os
+import shutil
+import tempfile
+import time
 import unittest
 from ansible_collections.raphaeldegail.googlecloudy.plugins.module_utils.gcp_utils import (
     GcpRequest,
     navigate_hash,
-    remove_nones
+    remove_nones,
+    run_concurrently,
+    update_mask,
+    write_lines,
+    RateLimiter
 )
 
 __metaclass__ = type
@@ -43,6 +52,61 @@ class NavigateHashTestCase(unittest.TestCase):
         self.assertEqual(navigate_hash(value, ["key", "key2"], default), default)
 
 
+class RunConcurrentlyTestCase(unittest.TestCase):
+    def test_keeps_order(self):
+        def delayed(value):
+            time.sleep(0.01 * (5 - value))
+            return value * 2
+        self.assertEqual(run_concurrently(delayed, range(5)), [0, 2, 4, 6, 8])
+
+    def test_raises_first_error(self):
+        def failing(value):
+            if value == 3:
+                raise SystemExit(1)
+            return value
+        with self.assertRaises(SystemExit):
+            run_concurrently(failing, range(5), max_workers=2)
+
+    def test_rate_limit(self):
+        limiter = RateLimiter(100)
+        start = time.monotonic()
+        run_concurrently(lambda value: limiter.wait(), range(6), max_workers=6)
+        self.assertGreaterEqual(time.monotonic() - start, 0.05)
+
+
+class UpdateMaskTestCase(unittest.TestCase):
+    def test_nested_paths(self):
+        request = {'description': 'CI', 'disabled': False, 'oidc': {'issuerUri': 'https://a', 'allowedAudiences': ['b']}}
+        response = {'oidc': {'issuerUri': 'https://a'}}
+        self.assertEqual(update_mask(request, response), ['description', 'oidc.allowedAudiences'])
+
+    def test_maps_and_missing_messages(self):
+        request = {'attributeMapping': {'google.subject': 'assertion.sub'}, 'aws': {'accountId': '123'}}
+        response = {'attributeMapping': {'google.subject': 'assertion.sub', 'attribute.repo': 'assertion.repo'}}
+        self.assertEqual(update_mask(request, response, maps=('attributeMapping',)), ['attributeMapping', 'aws'])
+
+
+class WriteLinesTestCase(unittest.TestCase):
+    class Module(object):
+        def atomic_move(self, src, dest):
+            os.rename(src, dest)
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_replaces_file(self):
+        path = os.path.join(self.directory, 'items.jsonl')
+        with open(path, 'w') as f:
+            f.write('stale\n')
+        self.assertEqual(write_lines(self.Module(), iter([{'b': 2, 'a': 1}, {'c': 3}]), path), 2)
+        with open(path) as f:
+            self.assertEqual([json.loads(line) for line in f], [{'a': 1, 'b': 2}, {'c': 3}])
+        self.assertEqual(os.listdir(self.directory), ['items.jsonl'])
+
+
 class RemoveNonesFromDictTestCase(unittest.TestCase):
     def test_remove_empty_list(self):
         value = []
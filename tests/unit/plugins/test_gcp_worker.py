@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright: Raphaël de Gail
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+import json
+import sys
+import threading
+import unittest
+
+from ansible.module_utils import basic
+from ansible.module_utils.common import warnings
+from ansible_collections.raphaeldegail.googlecloudy.plugins.module_utils import gcp_worker
+
+__metaclass__ = type
+
+
+class RunModuleTestCase(unittest.TestCase):
+    def setUp(self):
+        self.state = (
+            basic._ANSIBLE_ARGS, sys.stdout, warnings._global_warnings, warnings._global_deprecations,
+            basic.AnsibleModule._set_cwd
+        )
+        gcp_worker.isolate()
+
+    def tearDown(self):
+        (basic._ANSIBLE_ARGS, sys.stdout, warnings._global_warnings, warnings._global_deprecations,
+         basic.AnsibleModule._set_cwd) = self.state
+
+    def run_module(self, args):
+        response = gcp_worker.run_module('gcp_resourcemanager_tagkey_info', args)
+        return response['rc'], json.loads(response['stdout'])
+
+    def test_captures_result(self):
+        rc, result = self.run_module({'auth_kind': 'accesstoken', 'parent': 'organizations/1234'})
+        self.assertEqual(rc, 1)
+        self.assertEqual(result['msg'], 'missing required arguments: short_name')
+
+    def test_isolates_threads(self):
+        results = {}
+
+        def run(name):
+            results[name] = self.run_module({'auth_kind': 'accesstoken', name: 'value'})
+
+        threads = [threading.Thread(target=run, args=(name,)) for name in ('parent', 'short_name')]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results['parent'][1]['msg'], 'missing required arguments: short_name')
+        self.assertEqual(results['short_name'][1]['msg'], 'missing required arguments: parent')
+
+    def test_isolates_warnings(self):
+        warnings.warn('warning from task 1')
+        rc, result = self.run_module({'auth_kind': 'accesstoken', 'parent': 'organizations/1234'})
+        self.assertNotIn('warnings', result)
+
+    def test_rejects_foreign_modules(self):
+        response = gcp_worker.run_module('os.path', {})
+        self.assertEqual(response['rc'], 1)
+
+
+class FingerprintTestCase(unittest.TestCase):
+    def test_depends_on_gcp_environment(self):
+        base = gcp_worker.fingerprint({'HOME': '/root'})
+        self.assertEqual(base, gcp_worker.fingerprint({'HOME': '/home/other'}))
+        self.assertNotEqual(base, gcp_worker.fingerprint({'HOME': '/root', 'GCP_PROJECT': 'demo'}))